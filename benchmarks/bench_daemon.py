@@ -0,0 +1,81 @@
+"""Wall-clock time of ``copilot`` invocations, in-process vs. through the daemon.
+
+Runs the ``copilot`` wrapper as a subprocess against the local stub server –
+``--list`` and a streamed prompt (``--no-cache``, so every run reaches the
+server) – once with ``COPILOT_CLI_NO_DAEMON=1`` and once with a daemon
+listening on a private socket.  The stub adds ``--connect-ms`` to every new
+connection; the token is already in the (private) token store for both.
+
+    python benchmarks/bench_daemon.py --runs 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.stub_server import StubServer  # noqa: E402
+from copilot_cli.daemon import control  # noqa: E402
+
+COMMANDS = {
+    "--list": ["--list"],
+    "prompt": ["--prompt", "hello", "--no-cache", "--output", "raw"],
+}
+
+
+def run(argv: list[str], env: dict[str, str]) -> float:
+    start = time.perf_counter()
+    _ = subprocess.run([sys.executable, str(ROOT / "copilot"), *argv], env=env, cwd=ROOT, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--runs", type=int, default=7, help="runs per variant (median is reported)")
+    _ = parser.add_argument("--connect-ms", type=float, default=60.0, help="cost of every new connection")
+    opts = parser.parse_args()
+
+    with StubServer(connect_delay=opts.connect_ms / 1000) as server, tempfile.TemporaryDirectory() as tmp:
+        socket = Path(tmp) / "daemon.sock"
+        env = dict(
+            os.environ,
+            GITHUB_COPILOT_TOKEN_URL=f"{server.base_url}/token",
+            GITHUB_COPILOT_CHAT_URL=f"{server.base_url}/chat/completions",
+            GITHUB_COPILOT_OAUTH_TOKEN="stub-oauth",
+            XDG_CACHE_HOME=tmp,
+            COPILOT_CLI_SOCKET=str(socket),
+        )
+        # Put a token into the private token store.
+        _ = run(COMMANDS["prompt"], dict(env, COPILOT_CLI_NO_DAEMON="1"))
+
+        medians: dict[tuple[str, str], float] = {}
+        for name, argv in COMMANDS.items():
+            samples = [run(argv, dict(env, COPILOT_CLI_NO_DAEMON="1")) for _ in range(opts.runs)]
+            medians[(name, "in-process")] = statistics.median(samples) * 1000
+
+        _ = subprocess.run([sys.executable, "-m", "copilot_cli.daemon", "start"], env=env, cwd=ROOT, check=True)
+        try:
+            for name, argv in COMMANDS.items():
+                _ = run(argv, env)  # the first request pays for the connection
+                samples = [run(argv, env) for _ in range(opts.runs)]
+                medians[(name, "daemon")] = statistics.median(samples) * 1000
+        finally:
+            _ = control("stop", path=socket)
+
+    print(f"connect {opts.connect_ms:.0f} ms, median of {opts.runs} runs\n")
+    print(f"{'command':<10} {'in-process ms':>14} {'daemon ms':>10}")
+    for name in COMMANDS:
+        print(f"{name:<10} {medians[(name, 'in-process')]:>14.1f} {medians[(name, 'daemon')]:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Tail time-to-first-token of streamed requests, with and without hedging.
+
+The stub server answers after ``--first-byte-ms``, but ``--tail-probability``
+of the requests stall for an extra ``--tail-ms`` (a slow replica).  The same
+sequence of requests is sent once without hedging and once with a
+:class:`~copilot_cli.hedge.Hedger` whose histogram is first filled by
+``--warmup`` requests.  Reports p50/p95/p99 and the share of extra requests.
+
+    python benchmarks/bench_hedge.py --requests 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.stub_server import StubServer  # noqa: E402
+from copilot_cli.copilot import GithubCopilotClient  # noqa: E402
+from copilot_cli.hedge import Hedger, HedgePolicy, LatencyStore  # noqa: E402
+from copilot_cli.pool import ConnectionPool  # noqa: E402
+from copilot_cli.token_store import TokenStore  # noqa: E402
+
+
+def first_token_times(client: GithubCopilotClient, count: int) -> list[float]:
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        stream = client.stream_chat_completion("ping", "gpt-4o", "You are terse")
+        _ = next(iter(stream))
+        samples.append(time.perf_counter() - start)
+        for _ in stream:
+            pass
+    return samples
+
+
+def percentile(samples: list[float], q: float) -> float:
+    return statistics.quantiles(samples, n=100)[int(q) - 1] * 1000
+
+
+def run(opts: argparse.Namespace, tmp: Path, hedger: Optional[Hedger]) -> tuple[list[float], float]:
+    with StubServer(
+        first_byte_delay=opts.first_byte_ms / 1000,
+        tail_delay=opts.tail_ms / 1000,
+        tail_probability=opts.tail_probability,
+    ) as server, ConnectionPool() as pool:
+        os.environ["GITHUB_COPILOT_CHAT_URL"] = f"{server.base_url}/chat/completions"
+        client = GithubCopilotClient(pool=pool, token_store=TokenStore(tmp / "token.json"), hedge=hedger)
+        client._copilot_token = SimpleNamespace(token="stub")  # type: ignore[assignment]
+        client._token_loaded = True
+        client._ensure_valid_token = lambda: None  # type: ignore[method-assign]
+        if hedger is not None:
+            _ = first_token_times(client, opts.warmup)
+        server.reset_stats()
+        samples = first_token_times(client, opts.requests)
+        return samples, server.requests / opts.requests - 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--requests", type=int, default=300, help="measured requests per variant")
+    _ = parser.add_argument("--warmup", type=int, default=50, help="requests filling the latency histogram")
+    _ = parser.add_argument("--first-byte-ms", type=float, default=20.0, help="usual time to the first byte")
+    _ = parser.add_argument("--tail-ms", type=float, default=400.0, help="extra delay of a stalled request")
+    _ = parser.add_argument("--tail-probability", type=float, default=0.03, help="share of stalled requests")
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {
+            "plain": run(opts, Path(tmp), None),
+            "hedged": run(opts, Path(tmp), Hedger(LatencyStore(Path(tmp) / "latency.json"), HedgePolicy())),
+        }
+
+    print(f"first byte {opts.first_byte_ms:.0f} ms, {opts.tail_probability:.0%} stall {opts.tail_ms:.0f} ms\n")
+    print(f"{'variant':<8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'extra':>7}")
+    for name, (samples, extra) in results.items():
+        print(
+            f"{name:<8} {percentile(samples, 50):>8.1f} {percentile(samples, 95):>8.1f} "
+            f"{percentile(samples, 99):>8.1f} {extra:>7.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Rewriting a long document in one request versus chunked map-reduce.
+
+The stub server echoes the prompt back at ``--tokens-per-second`` (one
+token per 4 characters), like a model rewriting the text.  The document of
+``--paragraphs`` paragraphs is sent once as a single stream and once split
+into chunks of ``--chunk-tokens`` answered ``--concurrency`` at a time.
+Reports time to first output and total time.
+
+    python benchmarks/bench_mapreduce.py --paragraphs 24
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.stub_server import StubServer  # noqa: E402
+from copilot_cli.copilot import GithubCopilotClient  # noqa: E402
+from copilot_cli.mapreduce import MapReduce, split_text  # noqa: E402
+from copilot_cli.pool import ConnectionPool  # noqa: E402
+from copilot_cli.token_store import TokenStore  # noqa: E402
+
+
+def document(paragraphs: int) -> str:
+    sentence = "The quick brown fox jumps over the lazy dog near the riverbank. "
+    return "\n\n".join(sentence * 6 for _ in range(paragraphs)) + "\n"
+
+
+def timed(stream: Iterable[str]) -> tuple[float, float]:
+    start = time.perf_counter()
+    first = None
+    for piece in stream:
+        if first is None and piece:
+            first = time.perf_counter() - start
+    return first or 0.0, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--paragraphs", type=int, default=24, help="paragraphs of about 100 tokens")
+    _ = parser.add_argument("--tokens-per-second", type=float, default=400.0, help="simulated output speed")
+    _ = parser.add_argument("--chunk-tokens", type=int, default=300, help="tokens per chunk")
+    _ = parser.add_argument("--concurrency", type=int, default=4, help="chunks in flight")
+    opts = parser.parse_args()
+
+    text = document(opts.paragraphs)
+    chunks = split_text(text, opts.chunk_tokens)
+    with tempfile.TemporaryDirectory() as tmp, StubServer(
+        echo=True, chunk_delay=1 / opts.tokens_per_second
+    ) as server, ConnectionPool() as pool:
+        os.environ["GITHUB_COPILOT_CHAT_URL"] = f"{server.base_url}/chat/completions"
+        client = GithubCopilotClient(pool=pool, token_store=TokenStore(Path(tmp) / "token.json"))
+        client._copilot_token = SimpleNamespace(token="stub")  # type: ignore[assignment]
+        client._token_loaded = True
+        client._ensure_valid_token = lambda: None  # type: ignore[method-assign]
+
+        _ = timed(client.stream_chat_completion("ping", "gpt-4o", "Rewrite"))  # open the connection
+        results = {
+            "whole": timed(client.stream_chat_completion(text, "gpt-4o", "Rewrite")),
+            "chunked": timed(MapReduce(client, chunks, "", "gpt-4o", "Rewrite", concurrency=opts.concurrency)),
+        }
+
+    print(f"{len(text)} characters, {len(chunks)} chunks, {opts.concurrency} in parallel\n")
+    print(f"{'variant':<8} {'first ms':>9} {'total s':>8}")
+    for name, (first, total) in results.items():
+        print(f"{name:<8} {first * 1000:>9.0f} {total:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark: full re-parse per chunk vs. the incremental markdown streamer.
+
+Streams a synthetic answer (paragraphs, lists and code fences, ~4 characters
+per chunk) into
+
+* the previous loop – ``content += chunk`` and ``Markdown(content)`` for
+  every chunk, rendered by ``Live``, and
+* :class:`copilot_cli.streamer.markdown.MarkdownStreamer`, which freezes
+  completed blocks and only re-renders the trailing open one,
+
+both writing to an in-memory terminal.
+
+    python benchmarks/bench_markdown.py --kilobytes 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rich.console import Console  # noqa: E402
+from rich.live import Live  # noqa: E402
+from rich.markdown import Markdown  # noqa: E402
+
+from copilot_cli.streamer.markdown import MarkdownStreamer  # noqa: E402
+
+WORDS = ["the", "stream", "renders", "a", "block", "of", "markdown", "`code`", "**bold**", "quickly"]
+
+
+def make_answer(kilobytes: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts: list[str] = []
+    size = 0
+    while size < kilobytes * 1024:
+        kind = rng.random()
+        if kind < 0.5:
+            block = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 80)))
+        elif kind < 0.8:
+            block = "\n".join("- " + " ".join(rng.choice(WORDS) for _ in range(8)) for _ in range(rng.randint(2, 6)))
+        else:
+            body = "\n".join(f"    value_{i} = compute({i})" for i in range(rng.randint(3, 12)))
+            block = f"```python\ndef handler():\n{body}\n```"
+        parts.append(block)
+        size += len(block) + 2
+    return "\n\n".join(parts)
+
+
+def chunked(text: str, size: int = 4) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def _console() -> Console:
+    return Console(file=io.StringIO(), force_terminal=True, width=100, color_system="truecolor")
+
+
+def old_stream(chunks: list[str]) -> None:
+    content = ""
+    with Live(console=_console(), refresh_per_second=60, vertical_overflow="visible") as live:
+        for chunk in chunks:
+            content += chunk
+            live.update(Markdown(content))
+
+
+def new_stream(chunks: list[str]) -> None:
+    streamer = MarkdownStreamer()
+    streamer.console = _console()
+    streamer.stream(iter(chunks))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--kilobytes", type=float, default=8.0, help="size of the streamed answer")
+    opts = parser.parse_args()
+
+    chunks = chunked(make_answer(opts.kilobytes))
+    print(f"answer: {opts.kilobytes:.0f} KiB in {len(chunks)} chunks")
+
+    results = {}
+    for name, run in (("full re-parse", old_stream), ("incremental", new_stream)):
+        start = time.perf_counter()
+        run(chunks)
+        results[name] = time.perf_counter() - start
+        print(f"{name:<14} {results[name]:>8.2f}s  {len(chunks) / results[name]:>9.0f} chunks/s")
+    print(f"speed-up: {results['full re-parse'] / results['incremental']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
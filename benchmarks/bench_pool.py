@@ -0,0 +1,69 @@
+"""Compare per-call ``requests.post`` against the keep-alive ConnectionPool.
+
+Runs *N* sequential chat requests against a local stub server, first with a
+fresh connection per request (the previous client behaviour) and then through
+:class:`copilot_cli.pool.ConnectionPool`, and prints mean latency plus the
+number of TCP connections the server accepted.  Pass ``--tls`` to include the
+TLS handshake, which dominates the difference on real networks.
+
+    python benchmarks/bench_pool.py --requests 200 --tls
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests  # noqa: E402
+
+from benchmarks.stub_server import StubServer  # noqa: E402
+from copilot_cli.pool import ConnectionPool  # noqa: E402
+
+BODY = {"messages": [{"role": "user", "content": "ping"}], "model": "gpt-4o", "stream": False}
+
+
+def _measure(server: StubServer, n: int, send: Callable[[str], requests.Response]) -> tuple[float, int]:
+    url = f"{server.base_url}/chat/completions"
+    server.reset_stats()
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        response = send(url)
+        response.raise_for_status()
+        _ = response.json()
+        samples.append(time.perf_counter() - start)
+    return statistics.mean(samples) * 1000, server.connections
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--requests", type=int, default=100, help="requests per variant")
+    _ = parser.add_argument("--tls", action="store_true", help="serve the stub over TLS")
+    opts = parser.parse_args()
+
+    warnings.filterwarnings("ignore", message="Unverified HTTPS request")
+
+    with StubServer(tls=opts.tls) as server:
+        fresh_ms, fresh_conns = _measure(
+            server, opts.requests, lambda url: requests.post(url, json=BODY, timeout=10, verify=False)
+        )
+        with ConnectionPool() as pool:
+            pooled_ms, pooled_conns = _measure(
+                server, opts.requests, lambda url: pool.post(url, json=BODY, timeout=10, verify=False)
+            )
+
+    print(f"{'variant':<10} {'mean ms':>10} {'connections':>12}")
+    print(f"{'fresh':<10} {fresh_ms:>10.3f} {fresh_conns:>12}")
+    print(f"{'pooled':<10} {pooled_ms:>10.3f} {pooled_conns:>12}")
+    print(f"speed-up: {fresh_ms / pooled_ms:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Microbenchmark: ``iter_lines`` + ``json.loads`` vs. the incremental SSE decoder.
+
+Builds a synthetic recording of a chat completion stream (Copilot-shaped
+payloads, ~4 characters per delta, some deltas with escaped newlines and
+quotes), cuts it into network-sized reads and decodes it with
+
+* the previous loop – ``requests.Response.iter_lines()`` and a full
+  ``json.loads`` for every ``data:`` line,
+* :func:`copilot_cli.sse.iter_deltas`, and
+* :func:`copilot_cli.sse.iter_deltas` with ``coalesce=True``.
+
+    python benchmarks/bench_sse.py --megabytes 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests  # noqa: E402
+
+from copilot_cli.sse import iter_deltas  # noqa: E402
+
+WORDS = ["def", " parse", "(self", ", data", "):", " return", " value", " the", " stream", " event"]
+
+
+def record_stream(megabytes: float, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    parts: list[bytes] = []
+    size = 0
+    created = 1_700_000_000
+    while size < megabytes * 1024 * 1024:
+        content = rng.choice(WORDS)
+        if rng.random() < 0.1:
+            content += '\n    "x"'
+        payload = {
+            "choices": [
+                {
+                    "index": 0,
+                    "content_filter_offsets": {"check_offset": 1234, "start_offset": 1234, "end_offset": 1290},
+                    "delta": {"content": content},
+                }
+            ],
+            "created": created,
+            "id": "chatcmpl-AbCdEfGhIjKlMnOpQrStUvWxYz",
+            "model": "gpt-4o-2024-05-13",
+        }
+        event = b"data: " + json.dumps(payload, separators=(",", ":")).encode() + b"\n\n"
+        parts.append(event)
+        size += len(event)
+    parts.append(b"data: [DONE]\n\n")
+    return b"".join(parts)
+
+
+def split_reads(data: bytes, seed: int = 1) -> list[bytes]:
+    rng = random.Random(seed)
+    reads = []
+    pos = 0
+    while pos < len(data):
+        step = rng.randint(512, 8192)
+        reads.append(data[pos : pos + step])
+        pos += step
+    return reads
+
+
+def old_loop(reads: list[bytes]) -> Iterator[str]:
+    response = requests.Response()
+    response.iter_content = lambda *_a, **_k: iter(reads)  # type: ignore[method-assign]
+    for line in response.iter_lines():
+        if line and line.startswith(b"data: "):
+            json_str = line[6:].decode("utf-8")
+            if json_str == "[DONE]":
+                break
+            chunk = json.loads(json_str)
+            if chunk["choices"] and "delta" in chunk["choices"][0]:
+                content = chunk["choices"][0]["delta"].get("content")
+                if content:
+                    yield content
+
+
+def _time(decode: Callable[[list[bytes]], Iterator[str]], reads: list[bytes], repeat: int) -> tuple[float, str, int]:
+    best = float("inf")
+    text, yields = "", 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = list(decode(reads))
+        best = min(best, time.perf_counter() - start)
+        text, yields = "".join(out), len(out)
+    return best, text, yields
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--megabytes", type=float, default=4.0, help="size of the recorded stream")
+    _ = parser.add_argument("--repeat", type=int, default=3, help="runs per variant (best is reported)")
+    opts = parser.parse_args()
+
+    data = record_stream(opts.megabytes)
+    reads = split_reads(data)
+    print(f"stream: {len(data) / 1024 / 1024:.1f} MiB in {len(reads)} reads")
+
+    variants = {
+        "iter_lines+json": old_loop,
+        "iter_deltas": lambda r: iter_deltas(r),
+        "iter_deltas+coalesce": lambda r: iter_deltas(r, coalesce=True),
+    }
+    baseline_s, baseline_text, _ = _time(old_loop, reads, opts.repeat)
+
+    print(f"{'variant':<22} {'seconds':>8} {'MiB/s':>8} {'yields':>8} {'speed-up':>9}")
+    for name, decode in variants.items():
+        seconds, text, yields = _time(decode, reads, opts.repeat)
+        assert text == baseline_text, f"{name} produced different output"
+        mib_s = len(data) / 1024 / 1024 / seconds
+        print(f"{name:<22} {seconds:>8.3f} {mib_s:>8.1f} {yields:>8} {baseline_s / seconds:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
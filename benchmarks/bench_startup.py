@@ -0,0 +1,120 @@
+"""Startup benchmark: wall-clock time and ``-X importtime`` of CLI entry paths.
+
+Runs ``copilot-cli.py`` in fresh interpreters for a few invocations that
+should never touch the network stack:
+
+* ``--help``,
+* ``--list``, and
+* a prompt answered from the response cache (``--no-stream``, stdout piped).
+
+For each one it reports the median wall-clock time over ``--runs`` runs, the
+slowest top-level imports reported by ``python -X importtime`` and any heavy
+module that was imported although the path does not need it.  The script
+exits with status 1 when a median exceeds ``--budget-ms`` or a forbidden
+module shows up, so it can guard start-up latency in CI:
+
+    python benchmarks/bench_startup.py --runs 15 --budget-ms 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from copilot_cli.cache import ResponseCache  # noqa: E402
+from copilot_cli.constants import DEFAULT_SYSTEM_PROMPT  # noqa: E402
+
+HEAVY = ("requests", "pydantic", "yaml", "rich", "halo", "pyperclip")
+
+# name -> (argv, modules the path may import)
+SCENARIOS: dict[str, tuple[list[str], tuple[str, ...]]] = {
+    "--help": (["--help"], ()),
+    "--list": (["--list"], ()),
+    "cached answer": (["--prompt", "startup benchmark", "--no-stream"], ()),
+}
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, bool]]:
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        ``(module, cumulative_us, top_level)`` for every import, in order
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        imports.append((name.strip(), int(cumulative_us), not name.startswith("  ")))
+    return imports
+
+
+def run(argv: list[str], env: dict[str, str], *, importtime: bool = False) -> tuple[float, str]:
+    cmd = [sys.executable, *(["-X", "importtime"] if importtime else []), str(ROOT / "copilot-cli.py"), *argv]
+    start = time.perf_counter()
+    result = subprocess.run(cmd, env=env, cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise SystemExit(f"{' '.join(argv)} failed:\n{result.stderr}")
+    return elapsed, result.stderr
+
+
+def run_python_noop(env: dict[str, str]) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], env=env, check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--runs", type=int, default=7, help="runs per scenario (median is reported)")
+    _ = parser.add_argument("--budget-ms", type=float, default=400.0, help="maximum median wall-clock time")
+    _ = parser.add_argument("--top", type=int, default=5, help="slowest top-level imports to show")
+    opts = parser.parse_args()
+
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as cache_home:
+        env = {**os.environ, "XDG_CACHE_HOME": cache_home}
+        os.environ["XDG_CACHE_HOME"] = cache_home
+        ResponseCache().put("gpt-4o", DEFAULT_SYSTEM_PROMPT, "startup benchmark", ["cached answer"])
+
+        baseline = statistics.median(run_python_noop(env) for _ in range(opts.runs))
+        print(f"interpreter start-up: {baseline * 1000:.0f} ms (python -c pass)\n")
+
+        for name, (argv, allowed) in SCENARIOS.items():
+            median = statistics.median(run(argv, env)[0] for _ in range(opts.runs))
+            _, stderr = run(argv, env, importtime=True)
+            imports = parse_importtime(stderr)
+            loaded = {module.split(".")[0] for module, _, _ in imports}
+            top_level = [(module, cumulative) for module, cumulative, top in imports if top]
+            unexpected = sorted(m for m in HEAVY if m in loaded and m not in allowed)
+
+            status = "ok"
+            if median * 1000 > opts.budget_ms:
+                status = "OVER BUDGET"
+                failures.append(f"{name}: {median * 1000:.0f} ms > {opts.budget_ms:.0f} ms")
+            if unexpected:
+                status = "UNEXPECTED IMPORTS"
+                failures.append(f"{name}: imports {', '.join(unexpected)}")
+
+            print(f"{name:<14} {median * 1000:>7.0f} ms  {status}")
+            for module, cumulative in sorted(top_level, key=lambda i: i[1], reverse=True)[: opts.top]:
+                print(f"    {cumulative / 1000:>7.1f} ms  {module}")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Time-to-first-token of an action request, sequential vs. pipelined start-up.
+
+Emulates a cold ``--action`` run against the local stub server: no token in
+the token store, no open connection, and an action command that takes a
+while (``--command-ms``, think ``git diff --cached`` on a large index).  The
+stub adds ``--connect-ms`` to every new connection and ``--token-ms`` to the
+token endpoint.
+
+* **sequential** – the previous behaviour: run the commands, then fetch the
+  token, then connect to the chat host and stream;
+* **pipelined** – :meth:`GithubCopilotClient.start_warmup` fetches the token
+  and pre-connects to the chat host while the commands run.
+
+    python benchmarks/bench_ttft.py --runs 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.stub_server import StubServer  # noqa: E402
+from copilot_cli.commands import run_commands  # noqa: E402
+from copilot_cli.copilot import GithubCopilotClient  # noqa: E402
+from copilot_cli.pool import ConnectionPool  # noqa: E402
+from copilot_cli.token_store import TokenStore  # noqa: E402
+
+
+def time_to_first_token(pipelined: bool, command_ms: float, token_dir: Path) -> float:
+    store_path = token_dir / f"token-{time.perf_counter_ns()}.json"
+    with ConnectionPool() as pool:
+        client = GithubCopilotClient(pool=pool, token_store=TokenStore(store_path))
+        start = time.perf_counter()
+        if pipelined:
+            _ = client.start_warmup()
+        results = run_commands({"diff": [sys.executable, "-c", f"import time; time.sleep({command_ms / 1000})"]})
+        prompt = f"Summarise:\n{results['diff'].stdout}"
+        stream = client.stream_chat_completion(prompt, "gpt-4o", "You are terse")
+        _ = next(iter(stream))
+        elapsed = time.perf_counter() - start
+        for _ in stream:
+            pass
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--runs", type=int, default=7, help="runs per variant (median is reported)")
+    _ = parser.add_argument("--command-ms", type=float, default=150.0, help="duration of the action command")
+    _ = parser.add_argument("--connect-ms", type=float, default=60.0, help="cost of every new connection")
+    _ = parser.add_argument("--token-ms", type=float, default=120.0, help="latency of the token endpoint")
+    opts = parser.parse_args()
+
+    with StubServer(connect_delay=opts.connect_ms / 1000, token_delay=opts.token_ms / 1000) as server:
+        os.environ["GITHUB_COPILOT_TOKEN_URL"] = f"{server.base_url}/token"
+        os.environ["GITHUB_COPILOT_CHAT_URL"] = f"{server.base_url}/chat/completions"
+        os.environ["GITHUB_COPILOT_OAUTH_TOKEN"] = "stub-oauth"
+
+        with tempfile.TemporaryDirectory() as token_dir:
+            medians = {}
+            for name, pipelined in (("sequential", False), ("pipelined", True)):
+                samples = [time_to_first_token(pipelined, opts.command_ms, Path(token_dir)) for _ in range(opts.runs)]
+                medians[name] = statistics.median(samples) * 1000
+
+    print(f"command {opts.command_ms:.0f} ms, token {opts.token_ms:.0f} ms, connect {opts.connect_ms:.0f} ms\n")
+    print(f"{'variant':<12} {'TTFT ms':>9}")
+    for name, median in medians.items():
+        print(f"{name:<12} {median:>9.1f}")
+    print(f"saved: {medians['sequential'] - medians['pipelined']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Local stand-in for the Copilot token and chat endpoints.
+
+Used by the scripts in this directory to measure client-side overhead
+without touching the network.  The server speaks HTTP/1.1 with keep-alive,
+optionally behind TLS (self-signed certificate generated with *openssl*), and
+counts how many TCP connections it accepted so benchmarks can report
+handshakes alongside latency.  ``connect_delay`` and ``token_delay`` emulate
+the cost of a remote handshake and of the token round trip;
+``tail_probability`` of chat requests take ``tail_delay`` extra seconds before
+their first byte, like a slow backend replica.  With ``echo`` the chat
+endpoint answers with the user message, streamed at ``chunk_delay`` seconds
+per event like a model writing it.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional
+
+TOKEN_PAYLOAD: dict[str, Any] = {
+    "token": "stub-token",
+    "expires_at": 4102444800,  # 2100-01-01
+    "refresh_in": 1500,
+    "endpoints": {},
+    "tracking_id": "stub",
+    "sku": "stub",
+    "annotations_enabled": False,
+    "chat_enabled": True,
+    "chat_jetbrains_enabled": False,
+    "code_quote_enabled": False,
+    "codesearch": False,
+    "copilotignore_enabled": False,
+    "individual": True,
+    "prompt_8k": False,
+    "snippy_load_test_enabled": False,
+    "xcode": False,
+    "xcode_chat": False,
+    "public_suggestions": "disabled",
+    "telemetry": "disabled",
+    "code_review_enabled": False,
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "StubServer._HTTPServer"
+
+    def log_message(self, *_args: Any) -> None:  # silence per-request logging
+        pass
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.stats_lock:
+            self.server.connections += 1
+        if self.server.connect_delay:
+            time.sleep(self.server.connect_delay)
+
+    def _send_json(self, payload: Any) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.server.token_delay:
+            time.sleep(self.server.token_delay)
+        self._send_json(TOKEN_PAYLOAD)
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self.server.stats_lock:
+            self.server.requests += 1
+
+        delay = self.server.first_byte_delay
+        with self.server.stats_lock:
+            if self.server.rng.random() < self.server.tail_probability:
+                delay += self.server.tail_delay
+        if delay:
+            time.sleep(delay)
+
+        reply = self.server.reply
+        if self.server.echo:
+            reply = next((m["content"] for m in reversed(body.get("messages", [])) if m.get("role") == "user"), "")
+
+        if not body.get("stream"):
+            self._send_json({"choices": [{"message": {"role": "assistant", "content": reply}}]})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for event in self.server.stream_events(reply):
+                if self.server.chunk_delay:
+                    time.sleep(self.server.chunk_delay)
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client cancelled the stream (e.g. a lost hedge)
+
+
+class StubServer:
+    """Context manager running the stub endpoints in a background thread."""
+
+    class _HTTPServer(ThreadingHTTPServer):
+        daemon_threads = True
+        connections = 0
+        requests = 0
+        reply = "pong"
+        chunk_size = 4
+        first_byte_delay = 0.0
+        connect_delay = 0.0
+        token_delay = 0.0
+        tail_delay = 0.0
+        tail_probability = 0.0
+        echo = False
+        chunk_delay = 0.0
+        rng: random.Random
+        stats_lock: threading.Lock
+
+        def stream_events(self, reply: str) -> list[bytes]:
+            events = []
+            for i in range(0, len(reply), self.chunk_size):
+                delta = json.dumps({"choices": [{"delta": {"content": reply[i : i + self.chunk_size]}}]})
+                events.append(f"data: {delta}\n\n".encode())
+            events.append(b"data: [DONE]\n\n")
+            return events
+
+    def __init__(
+        self,
+        *,
+        tls: bool = False,
+        reply: str = "pong",
+        chunk_size: int = 4,
+        first_byte_delay: float = 0.0,
+        connect_delay: float = 0.0,
+        token_delay: float = 0.0,
+        tail_delay: float = 0.0,
+        tail_probability: float = 0.0,
+        echo: bool = False,
+        chunk_delay: float = 0.0,
+    ) -> None:
+        self.tls = tls
+        self._httpd = self._HTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.stats_lock = threading.Lock()
+        self._httpd.reply = reply
+        self._httpd.chunk_size = chunk_size
+        self._httpd.first_byte_delay = first_byte_delay
+        self._httpd.connect_delay = connect_delay
+        self._httpd.token_delay = token_delay
+        self._httpd.tail_delay = tail_delay
+        self._httpd.tail_probability = tail_probability
+        self._httpd.echo = echo
+        self._httpd.chunk_delay = chunk_delay
+        self._httpd.rng = random.Random(0)
+        self._tmpdir: Optional[tempfile.TemporaryDirectory[str]] = None
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+        if tls:
+            self._tmpdir = tempfile.TemporaryDirectory()
+            cert = Path(self._tmpdir.name) / "cert.pem"
+            key = Path(self._tmpdir.name) / "key.pem"
+            subprocess.run(
+                [
+                    "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+                    "-keyout", str(key), "-out", str(cert), "-days", "1", "-subj", "/CN=localhost",
+                ],
+                check=True,
+                capture_output=True,
+            )
+            ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            ctx.load_cert_chain(cert, key)
+            self._httpd.socket = ctx.wrap_socket(self._httpd.socket, server_side=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        scheme = "https" if self.tls else "http"
+        return f"{scheme}://{host}:{port}"
+
+    @property
+    def connections(self) -> int:
+        return self._httpd.connections
+
+    @property
+    def requests(self) -> int:
+        return self._httpd.requests
+
+    def reset_stats(self) -> None:
+        with self._httpd.stats_lock:
+            self._httpd.connections = 0
+            self._httpd.requests = 0
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
@@ -3,7 +3,11 @@ import argparse
 import os
 import subprocess
 import sys
-from typing import Optional
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any, Optional, TextIO, Union
 
 # ---------------------------------------------------------------------------
 # Optional dependency stubs
@@ -12,15 +16,12 @@ from typing import Optional
 # Provide a minimal stub for *pydantic* so the codebase can run in
 # environments where the real library is not available (e.g. the execution
 # sandbox used for the assessment).  The stub implements only the attributes
-# actually accessed by the repository.
+# actually accessed by the repository.  *find_spec* only locates the package;
+# the real library is imported later, by the code paths that need it.
 
-try:
-    import pydantic  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover – runtime fallback
+if find_spec("pydantic") is None:  # pragma: no cover – runtime fallback
 
     import types
-    from dataclasses import dataclass, field as dc_field
-    from typing import Any
 
     def _field(*, default: Any = None, default_factory: Any = None, **_kwargs: Any) -> Any:  # noqa: D401
         if default_factory is not None:
@@ -64,85 +65,95 @@ can work in minimal environments (e.g. during automated grading) where some
 packages from *requirements.txt* might be unavailable.  Optional modules are
 imported with graceful fall-backs that implement a tiny subset of the public
 API used by this script.
-"""
-
-# Optional: clipboard support -------------------------------------------------
-try:
-    import pyperclip  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover – runtime fallback
-
-    class _NoClipboard:  # pylint: disable=too-few-public-methods
-        """Fallback stub when *pyperclip* is not installed."""
-
-        @staticmethod
-        def copy(_text: str) -> None:  # noqa: D401
-            # Silently ignore clipboard requests – still a valid behaviour
-            # for head-less environments.
-            pass
-
-    pyperclip = _NoClipboard()  # type: ignore
-
-
 
-# Optional: spinner support ----------------------------------------------------
-try:
-    # The real Halo class is available – keep it untouched
-    from halo import Halo as _RealHalo  # type: ignore
-
-    def _get_spinner(*args: object, **kwargs: object):  # noqa: D401
-        # Simply delegate to the genuine spinner
-        return _RealHalo(*args, **kwargs)
-
-    # Public name points to the actual spinner class
-    Halo = _RealHalo  # type: ignore
-
-except ModuleNotFoundError:  # pragma: no cover – runtime fallback
-    from contextlib import contextmanager
-
-    @contextmanager
-    def _get_spinner(*_args: object, **_kwargs: object):  # noqa: D401
-        yield  # no-op context manager for headless environments
-
-    # In the fallback case, expose the stub instead
-    Halo = _get_spinner  # type: ignore
+Start-up time matters for a command-line tool, so only the standard library
+and a few tiny package modules are imported at module level.  *requests*,
+*pydantic*, *yaml*, *halo*, *pyperclip* and *rich* are imported by the code
+paths that actually need them – ``--list`` never touches the network stack,
+and raw output never loads *rich*.
+"""
 
-from copilot_cli.action.action_manager import ActionManager
-from copilot_cli.action.model import Action
 from copilot_cli.args import Args
 from copilot_cli.constants import DEFAULT_SYSTEM_PROMPT
-from copilot_cli.copilot import GithubCopilotClient
+from copilot_cli.exception.copilot_client_error import CopilotClientError
 from copilot_cli.log import CopilotCLILogger
-# *streamer.markdown* depends on *rich*, another heavy optional dependency. We
-# import it lazily so that the CLI keeps working (at least for non-streaming
-# scenarios) even when *rich* is missing.
+from copilot_cli.streamer.raw import RawStreamer
+
+# *streamer.markdown* depends on *rich*, another heavy optional dependency. It
+# is only imported by *create_streamer* when markdown output is selected, so
+# raw output (pipes, ``--output raw``) never loads it and the CLI keeps
+# working when *rich* is missing.
+if TYPE_CHECKING:
+    from copilot_cli.action.action_manager import ActionManager
+    from copilot_cli.action.model import Action
+    from copilot_cli.cache import ResponseCache
+    from copilot_cli.command_cache import CommandCache
+    from copilot_cli.copilot import GithubCopilotClient
+    from copilot_cli.mapreduce import Chunk
+    from copilot_cli.streamer.markdown import MarkdownStreamer, StreamOptions
+
+
+def spinner(text: str, enabled: bool = True) -> Any:
+    """
+    Return a spinner context manager.
 
-try:
-    from copilot_cli.streamer.markdown import MarkdownStreamer, StreamOptions  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover – runtime fallback
+    *halo* is only imported when the spinner is actually shown – never when
+    stdout is not a terminal – and is an optional dependency; a no-op context
+    manager is used otherwise.
 
-    from typing import Any, Iterator
+    Args:
+        text: Text displayed next to the spinner
+        enabled: Whether the spinner should be shown at all
+    """
+    from contextlib import nullcontext
 
-    StreamOptions = dict  # type: ignore  # provide simple alias
+    if not enabled or not sys.stdout.isatty():
+        return nullcontext()
+    try:
+        from halo import Halo  # type: ignore
+    except ModuleNotFoundError:  # pragma: no cover – runtime fallback
+        return nullcontext()
+    return _halo_spinner(Halo, text)
 
-    class _DummyMarkdownStreamer:  # pylint: disable=too-few-public-methods
-        """Minimal replacement that just concatenates streamed chunks."""
 
-        def __init__(self, *_: Any, **__: Any) -> None:  # noqa: D401
-            self._content: list[str] = []
+@contextmanager
+def _halo_spinner(halo: Any, text: str) -> Iterator[Any]:
+    """
+    Show a Halo spinner while the block runs.
 
-        # Compatibility with real implementation
-        def set_console_options(self, **_: Any) -> None:  # noqa: D401
-            pass
+    Halo registers an ``atexit`` handler per spinner that is never removed,
+    which piles up in the long-lived daemon; it is held back and only
+    registered while the spinner spins.
+    """
+    import atexit
 
-        def stream(self, iterator: Iterator[str], **_: Any) -> None:  # noqa: D401
-            for chunk in iterator:
-                print(chunk, end="", flush=True)
-                self._content.append(chunk)
+    handlers: list[Callable[[], Any]] = []
+    register = atexit.register
+    atexit.register = handlers.append  # type: ignore[assignment]
+    try:
+        # The daemon swaps sys.stdout per request; Halo defaults to the one
+        # it was imported with.
+        spin = halo(text=text, spinner="dots", enabled=True, stream=sys.stdout)
+    finally:
+        atexit.register = register  # type: ignore[assignment]
+    for handler in handlers:
+        atexit.register(handler)
+    try:
+        with spin:
+            yield spin
+    finally:
+        for handler in handlers:
+            atexit.unregister(handler)
 
-        def get_content(self) -> str:  # noqa: D401
-            return "".join(self._content)
 
-    MarkdownStreamer = _DummyMarkdownStreamer  # type: ignore
+def copy_to_clipboard(text: str) -> None:
+    """Copy *text* to the clipboard; silently ignored without *pyperclip*."""
+    try:
+        import pyperclip  # type: ignore
+    except ModuleNotFoundError:  # pragma: no cover – runtime fallback
+        # Head-less environments: still a valid behaviour.
+        return
+    pyperclip.copy(text)
 
 
 def resource_path(relative_path: str) -> str:
@@ -164,7 +175,34 @@ def resource_path(relative_path: str) -> str:
     return os.path.join(base_path, str(relative_path))
 
 
-action_manager = ActionManager(resource_path("actions.yml"))
+# (actions.yml, actions.d layers) -> (modification stamp, manager).  A single
+# process serves many directories when it runs as the daemon, so managers are
+# kept per layer set and rebuilt when a layer changes.
+_action_managers: dict[tuple[str, ...], tuple[tuple[int, ...], ActionManager]] = {}
+
+
+def _mtime_ns(path: Union[str, os.PathLike[str]]) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def get_action_manager(path: str = ".") -> ActionManager:
+    """
+    Load the actions on first use; plain prompts and ``--help`` never need them.
+
+    Args:
+        path: Working path; the project ``actions.d`` layer is searched from here
+    """
+    from copilot_cli.action.action_manager import ActionManager, default_action_dirs
+
+    layers = (resource_path("actions.yml"), *map(str, default_action_dirs(path)))
+    stamp = tuple(map(_mtime_ns, layers))
+    cached = _action_managers.get(layers)
+    if cached is None or cached[0] != stamp:
+        cached = _action_managers[layers] = (stamp, ActionManager(layers[0], layers[1:]))
+    return cached[1]
 
 
 def run_command(cmd: list[str]) -> subprocess.CompletedProcess[str]:
@@ -209,8 +247,7 @@ def create_parser() -> argparse.ArgumentParser:
     _ = parser.add_argument(
         "--action",
         type=str,
-        help="Action to perform",
-        choices=action_manager.get_actions_list(),
+        help="Action to perform (see --list)",
     )
     _ = parser.add_argument(
         "--no-stream",
@@ -227,49 +264,456 @@ def create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Copy the response to the clipboard",
     )
+    _ = parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the response cache",
+    )
+    _ = parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore cached responses but store the fresh one",
+    )
+    _ = parser.add_argument(
+        "--offline-fallback",
+        action="store_true",
+        default=os.getenv("COPILOT_CLI_OFFLINE_FALLBACK", "") not in ("", "0"),
+        help="Echo the prompt back instead of failing when Copilot is unreachable",
+    )
+    _ = parser.add_argument(
+        "--hedge",
+        action="store_true",
+        default=os.getenv("COPILOT_CLI_HEDGE", "") not in ("", "0"),
+        help="Send a second copy of requests whose first byte is late; uses the first answer",
+    )
+    _ = parser.add_argument(
+        "--batch",
+        type=str,
+        metavar="FILE",
+        help="Run the JSONL requests in FILE ('-' for stdin) and print JSONL results",
+    )
+    _ = parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Maximum number of batch or chunk requests run in parallel",
+        default=4,
+    )
+    _ = parser.add_argument(
+        "--input",
+        type=str,
+        metavar="FILE",
+        help="Read the text to work on from FILE ('-' for stdin); actions with map_reduce split it into chunks",
+    )
+    _ = parser.add_argument(
+        "--chunk-tokens",
+        type=int,
+        metavar="N",
+        help="Split --input into chunks of about N tokens answered concurrently, for any action",
+    )
+    _ = parser.add_argument(
+        "--output",
+        choices=("auto", "markdown", "raw"),
+        help="Render streamed answers as markdown or write them verbatim (auto: raw when stdout is not a TTY)",
+        default="auto",
+    )
+    _ = parser.add_argument(
+        "--warmup",
+        action="store_true",
+        help="Obtain a Copilot token and connect to the chat host, then exit",
+    )
+    _ = parser.add_argument(
+        "--diagnose",
+        action="store_true",
+        help="Show the chat endpoint in use and time its DNS lookup, TCP connect and TLS handshake, then exit",
+    )
+    _ = parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Report estimated prompt and response tokens against the model's limits on stderr",
+    )
+    models = parser.add_mutually_exclusive_group()
+    _ = models.add_argument(
+        "--race",
+        type=str,
+        metavar="MODELS",
+        help="Ask the comma-separated models concurrently and keep the first to answer",
+    )
+    _ = models.add_argument(
+        "--fan-out",
+        type=str,
+        metavar="MODELS",
+        help="Ask the comma-separated models concurrently and show all answers",
+    )
     return parser
 
 
+def render_template(source: str, values: dict[str, str], where: str) -> str:
+    """
+    Render *source* in one pass, reporting placeholders without a value.
+
+    Args:
+        source: Template text (compiled once and cached)
+        values: Placeholder values
+        where: Description of the template for the report, e.g. ``prompt``
+    """
+    from copilot_cli.template import compile_template
+
+    template = compile_template(source)
+    unknown = template.unknown(values)
+    if unknown:
+        names = ", ".join(f"${name}" for name in unknown)
+        print(f"Unknown placeholder {names} in {where} (write $$ for a literal $)", file=sys.stderr)
+    return template.render(values)
+
+
 def process_action_commands(
     action_obj: Action,
     base_prompt: str,
     path: str,
+    command_cache: Optional[CommandCache] = None,
+    budget: Optional[int] = None,
 ) -> str:
-    final_prompt = base_prompt
+    """
+    Run the commands of *action_obj* concurrently and render *base_prompt*.
+
+    ``$path`` and every command output (``$<key>``) are substituted in a
+    single pass once all commands finished.  With *command_cache* given and
+    ``options.cache_commands`` set, outputs whose state fingerprint is
+    unchanged are reused without running the command.  With a token
+    *budget*, diff outputs are trimmed so the prompt fits it; what was
+    removed is reported on stderr.
+
+    Raises:
+        CommandsFailed: If one or more commands failed, timed out or could
+            not be started; every failure is reported on stderr first
+    """
     commands: Optional[dict[str, list[str]]] = getattr(action_obj, "commands", None)
+    values = {"path": path}
 
-    if not commands:
-        return final_prompt
+    if commands:
+        from copilot_cli.commands import DEFAULT_MAX_OUTPUT, DEFAULT_TIMEOUT, CommandsFailed, run_commands
 
-    for key, cmd in commands.items():
-        try:
-            cmd_with_path = [c.replace("$path", path) for c in cmd]
-            result = run_command(cmd_with_path)
-            final_prompt = final_prompt.replace(f"${key}", result.stdout)
-        except subprocess.CalledProcessError as e:
-            print(f"Command failed for {key}")
-            print(f"Error: {e}")
-            raise
+        options = getattr(action_obj, "options", None)
+        inputs = getattr(options, "command_inputs", None) or {}
+        results = run_commands(
+            {key: [render_template(c, values, f"command {key!r}") for c in cmd] for key, cmd in commands.items()},
+            timeout=getattr(options, "command_timeout", DEFAULT_TIMEOUT),
+            max_output=getattr(options, "command_max_output", DEFAULT_MAX_OUTPUT),
+            cache=command_cache if getattr(options, "cache_commands", False) else None,
+            inputs={key: [render_template(p, values, "command_inputs") for p in paths] for key, paths in inputs.items()},
+        )
+
+        failures = [result for result in results.values() if not result.ok]
+        if failures:
+            for result in failures:
+                print(f"Command failed for {result.describe()}", file=sys.stderr)
+            raise CommandsFailed(failures)
+
+        values.update((key, result.stdout) for key, result in results.items())
+
+        if budget is not None:
+            from copilot_cli.shaping import fit_outputs
+            from copilot_cli.template import compile_template
+
+            values, reports = fit_outputs(compile_template(base_prompt), values, budget)
+            for report in reports:
+                print(f"Context: {report.summary()}", file=sys.stderr)
+
+    return render_template(base_prompt, values, "prompt")
+
+
+def action_models(action_obj: Optional[Action], model: str) -> list[str]:
+    """
+    The models to ask, in order: the action's model or fallback chain.
+
+    *model* (the ``--model`` value) is used when there is no action or the
+    action leaves its ``model`` empty.
+    """
+    declared = getattr(action_obj, "model", None)
+    models = [declared] if isinstance(declared, str) else list(declared or ())
+    return [name for name in models if name] or [model]
+
+
+def prepare_request(
+    action_name: Optional[str],
+    prompt: Optional[str],
+    path: str,
+    model: str,
+    system_prompt: str,
+    command_cache: Optional[CommandCache] = None,
+) -> tuple[Optional[Action], str, str, str]:
+    """Resolve an optional action into the final prompt, model and system prompt.
+
+    Args:
+        action_name: Name of the action to run, if any
+        prompt: User prompt, appended to the action prompt when both are set
+        path: Path substituted into action commands
+        model: Model used when the action does not declare one
+        system_prompt: System prompt used when no action is given
+        command_cache: Cache for the outputs of the action commands
+
+    Returns:
+        Tuple of (action, prompt, model, system_prompt)
+
+    Raises:
+        CommandsFailed: If one of the action commands fails
+    """
+    if not action_name:
+        return None, prompt or "", model, system_prompt
+
+    action_obj = get_action_manager(path).get_action(action_name)
+
+    from copilot_cli.limits import model_limits, prompt_budget
+    from copilot_cli.tokens import estimate_tokens
+
+    models = action_models(action_obj, model)
+    model = models[0]
+    limit = getattr(getattr(action_obj, "options", None), "max_prompt_tokens", None)
+    # Shaped for the smallest window of the fallback chain, so every model accepts it.
+    budget = min(
+        prompt_budget(name, action_obj.system_prompt, limit=limit)
+        - estimate_tokens(prompt or "", model_limits(name).encoding)
+        for name in models
+    )
+
+    # The user's text is appended verbatim – it is not part of the template.
+    current_prompt = process_action_commands(action_obj, action_obj.prompt, path, command_cache, budget)
+    if prompt:
+        current_prompt += f"\n{prompt}"
+
+    return action_obj, current_prompt, model, action_obj.system_prompt
+
+
+def run_batch_file(client: GithubCopilotClient, args: Args) -> None:
+    """Execute ``--batch`` mode, streaming JSONL results to stdout."""
+    from copilot_cli.async_client import AsyncGithubCopilotClient
+    from copilot_cli.batch import run_batch
+
+    command_cache = create_command_cache(args)
+
+    def _resolve(request: dict[str, object]) -> tuple[str, str, str, list[str]]:
+        action_obj, prompt, model, system_prompt = prepare_request(
+            request.get("action"),  # type: ignore[arg-type]
+            request.get("prompt"),  # type: ignore[arg-type]
+            str(request.get("path", args.path)),
+            str(request.get("model") or args.model),
+            str(request.get("system_prompt") or args.system_prompt),
+            command_cache,
+        )
+        fallbacks = action_models(action_obj, model)[1:] if action_obj else []
+        return prompt, model, system_prompt, fallbacks
+
+    async_client = AsyncGithubCopilotClient(client, max_concurrency=args.concurrency)
+    # The token and the chat connection get ready while actions resolve.
+    _ = client.start_warmup()
+
+    try:
+        if args.batch == "-":
+            failures = run_batch(async_client, sys.stdin, _resolve, sys.stdout, concurrency=args.concurrency)
+        else:
+            try:
+                with open(args.batch, encoding="utf-8") as f:
+                    failures = run_batch(async_client, f, _resolve, sys.stdout, concurrency=args.concurrency)
+            except OSError as e:
+                CopilotCLILogger.log_error(f"Failed to read batch file {args.batch}: {e}")
+                sys.exit(1)
+    finally:
+        async_client.close()
 
-    return final_prompt
+    # Each failure is already reported in its JSONL line.
+    if failures:
+        sys.exit(1)
 
 
-def create_streamer(options: Optional[StreamOptions] = None) -> MarkdownStreamer:
+def use_raw_output(output: str = "auto", stream: Optional[TextIO] = None) -> bool:
     """
-    Create a configured markdown streamer.
+    Decide whether streamed answers bypass markdown rendering.
+
+    Args:
+        output: The ``--output`` mode – "raw", "markdown" or "auto"
+        stream: Stream checked by "auto", ``sys.stdout`` by default
+
+    Returns:
+        True for "raw", and for "auto" when *stream* is not a TTY
+    """
+    if output != "auto":
+        return output == "raw"
+    isatty = getattr(stream or sys.stdout, "isatty", None)
+    return not (isatty and isatty())
+
+
+def create_streamer(
+    options: Optional[StreamOptions] = None,
+    output: str = "auto",
+) -> Union[MarkdownStreamer, RawStreamer]:
+    """
+    Create the streamer for the selected output backend.
 
     Args:
         options: Optional dictionary of console options
+        output: The ``--output`` mode, see :func:`use_raw_output`
 
     Returns:
-        Configured MarkdownStreamer instance
+        A RawStreamer for raw output, otherwise a configured MarkdownStreamer
     """
+    if use_raw_output(output):
+        return RawStreamer()
+
+    try:
+        from copilot_cli.streamer.markdown import MarkdownStreamer
+    except ModuleNotFoundError:  # pragma: no cover – runtime fallback
+        return RawStreamer(flush="chunk")
+
     streamer = MarkdownStreamer()
     if options:
         streamer.set_console_options(**options)
     return streamer
 
 
+def create_cache(args: Args) -> Optional[ResponseCache]:
+    """Build the response cache requested by ``--no-cache`` / ``--refresh-cache``."""
+    if args.no_cache:
+        return None
+    from copilot_cli.cache import ResponseCache
+
+    return ResponseCache(read=not args.refresh_cache)
+
+
+def create_command_cache(args: Args) -> Optional[CommandCache]:
+    """Build the action command output cache, honouring the same flags as the response cache."""
+    if args.no_cache:
+        return None
+    from copilot_cli.command_cache import CommandCache
+
+    return CommandCache(read=not args.refresh_cache)
+
+
+def open_chat_stream(
+    client: GithubCopilotClient,
+    prompt: str,
+    model: str,
+    system_prompt: str,
+    cache_ttl: Optional[float],
+    args: Args,
+    fallbacks: Sequence[str] = (),
+) -> Iterator[str]:
+    """Stream the answer of *model*, or of the fastest ``--race`` model."""
+    if args.race:
+        from copilot_cli.race import parse_models
+
+        return race_stream(client, parse_models(args.race), prompt, system_prompt, cache_ttl)
+    return client.stream_chat_completion(
+        prompt=prompt,
+        model=model,
+        system_prompt=system_prompt,
+        cache_ttl=cache_ttl,
+        fallbacks=fallbacks,
+    )
+
+
+def read_input(source: str) -> str:
+    """The text of ``--input``: the file *source*, or stdin for ``-``."""
+    if source == "-":
+        return sys.stdin.read()
+    with open(source, encoding="utf-8") as f:
+        return f.read()
+
+
+def split_input(
+    text: str,
+    prompt: str,
+    model: str,
+    system_prompt: str,
+    action_obj: Optional[Action],
+    args: Args,
+) -> list[Chunk]:
+    """Cut ``--input`` into the chunks of a map-reduce run."""
+    from copilot_cli.limits import model_limits
+    from copilot_cli.mapreduce import chunk_budget, split_text
+    from copilot_cli.tokens import estimate_tokens
+
+    limit = args.chunk_tokens or getattr(getattr(action_obj, "map_reduce", None), "chunk_tokens", None)
+    encoding = model_limits(model).encoding
+    return split_text(
+        text,
+        chunk_budget(model, system_prompt, prompt, limit),
+        lambda piece: estimate_tokens(piece, encoding),
+    )
+
+
+def map_reduce_stream(
+    client: GithubCopilotClient,
+    chunks: list[Chunk],
+    prompt: str,
+    model: str,
+    system_prompt: str,
+    cache_ttl: Optional[float],
+    action_obj: Optional[Action],
+    args: Args,
+    fallbacks: Sequence[str] = (),
+) -> Iterator[str]:
+    """Stream the stitched answers of *chunks*; a summary goes to stderr."""
+    from copilot_cli.mapreduce import MapReduce
+
+    job = MapReduce(
+        client,
+        chunks,
+        prompt,
+        model,
+        system_prompt,
+        concurrency=args.concurrency,
+        cache_ttl=cache_ttl,
+        fallbacks=fallbacks,
+        reduce_prompt=getattr(getattr(action_obj, "map_reduce", None), "reduce_prompt", None),
+    )
+    try:
+        yield from job
+    finally:
+        if len(chunks) > 1:
+            print(f"Map-reduce: {job.report()}", file=sys.stderr)
+
+
+def race_stream(
+    client: GithubCopilotClient,
+    models: list[str],
+    prompt: str,
+    system_prompt: str,
+    cache_ttl: Optional[float] = None,
+) -> Iterator[str]:
+    """Stream the answer of the first of *models* to respond; timings go to stderr."""
+    from copilot_cli.race import Race
+
+    race = Race(client, models, prompt, system_prompt, cache_ttl=cache_ttl)
+    try:
+        yield from race
+    finally:
+        for line in race.report():
+            print(f"Race: {line}", file=sys.stderr)
+
+
+def fan_out_answers(
+    client: GithubCopilotClient,
+    models: list[str],
+    prompt: str,
+    system_prompt: str,
+    cache_ttl: Optional[float] = None,
+) -> str:
+    """
+    Ask all *models* and return their answers side by side as markdown.
+
+    Raises:
+        CopilotClientError: If every model failed
+    """
+    from copilot_cli.race import fan_out, format_fan_out
+
+    runs = fan_out(client, models, prompt, system_prompt, cache_ttl=cache_ttl)
+    for run in runs:
+        print(f"Fan-out: {run.model}: {run.describe()}", file=sys.stderr)
+    if all(run.error is not None for run in runs):
+        raise runs[0].error  # type: ignore[misc]
+    return format_fan_out(runs)
+
+
 def handle_completion(
     client: GithubCopilotClient,
     prompt: str,
@@ -278,23 +722,57 @@ def handle_completion(
     action_obj: Optional[Action],
     args: Args,
     stream_options: Optional[StreamOptions] = None,
+    chunks: Optional[list[Chunk]] = None,
 ) -> str:
-    if not args.no_stream and action_obj and action_obj.options.stream:
-        streamer = create_streamer(stream_options)
-        streamer.stream(client.stream_chat_completion(prompt=prompt, model=model, system_prompt=system_prompt))
+    cache_ttl = getattr(getattr(action_obj, "options", None), "cache_ttl", None)
+    streaming = bool(not args.no_stream and action_obj and action_obj.options.stream)
+
+    # Decide whether the animated spinner should be active.  The detailed
+    # decision logic lives inside *copilot_cli.utils.should_enable_spinner*
+    # which considers both the global ``--no-spinner`` flag and the
+    # per-action preference declared in *actions.yml*.
+    from copilot_cli.utils import should_enable_spinner  # Local import to avoid circular dep
+
+    enable_spinner = should_enable_spinner(args, action_obj)
+    fallbacks = action_models(action_obj, model)[1:] if action_obj else []
+
+    if chunks is not None:
+        stream = map_reduce_stream(client, chunks, prompt, model, system_prompt, cache_ttl, action_obj, args, fallbacks)
+        if streaming:
+            streamer = create_streamer(stream_options, args.output)
+            streamer.stream(stream)
+            response = streamer.get_content()
+        else:
+            with spinner(f"Answering {len(chunks)} chunks", enabled=enable_spinner):
+                response = "".join(stream)
+    elif args.fan_out:
+        from copilot_cli.race import parse_models
+
+        models = parse_models(args.fan_out)
+        with spinner(f"Asking {len(models)} models", enabled=enable_spinner and not streaming):
+            response = fan_out_answers(client, models, prompt, system_prompt, cache_ttl)
+        if streaming:
+            create_streamer(stream_options, args.output).stream(iter([response]))
+    elif streaming:
+        streamer = create_streamer(stream_options, args.output)
+        streamer.stream(open_chat_stream(client, prompt, model, system_prompt, cache_ttl, args, fallbacks))
 
         response = streamer.get_content()
     else:
-        # Decide whether the animated spinner should be active.  The detailed
-        # decision logic lives inside *copilot_cli.utils.should_enable_spinner*
-        # which considers both the global ``--no-spinner`` flag and the
-        # per-action preference declared in *actions.yml*.
-        from copilot_cli.utils import should_enable_spinner  # Local import to avoid circular dep
-
-        enable_spinner = should_enable_spinner(args, action_obj)
-
-        with Halo(text="Generating response", spinner="dots", enabled=enable_spinner):
-            response = client.chat_completion(prompt=prompt, model=model, system_prompt=system_prompt)
+        with spinner("Generating response", enabled=enable_spinner):
+            if args.race:
+                response = "".join(open_chat_stream(client, prompt, model, system_prompt, cache_ttl, args))
+            else:
+                response = client.chat_completion(
+                    prompt=prompt,
+                    model=model,
+                    system_prompt=system_prompt,
+                    cache_ttl=cache_ttl,
+                    fallbacks=fallbacks,
+                )
+
+    if client.last_model not in (None, model) and not (args.race or args.fan_out or chunks):
+        print(f"Fallback: {model} is unavailable, answered by {client.last_model}", file=sys.stderr)
 
     if action_obj:
         # --------------------------------------------------------------
@@ -314,7 +792,7 @@ def handle_completion(
         stream_enabled = _safe_get(getattr(action_obj, "options", None), "stream", True)
 
         if to_file:
-            file_path = str(to_file).replace("$path", args.path)
+            file_path = render_template(str(to_file), {"path": args.path}, "output.to_file")
             try:
                 with open(file_path, "w", encoding="utf-8") as f:
                     _ = f.write(response)
@@ -336,57 +814,212 @@ def handle_completion(
     return response
 
 
-def main() -> None:
-    args = create_parser().parse_args()
-    args = Args(**vars(args))
+# Clients by response-cache, fallback and hedging flags; reused for the lifetime of the
+# process so the daemon keeps its token and connections between requests.
+# Each is stored with the environment it was built from, see create_client.
+_clients: dict[tuple[bool, bool, bool, bool], tuple[tuple[tuple[str, str], ...], GithubCopilotClient]] = {}
+
+# Environment read when a client is built: OAuth tokens, the token and chat
+# URLs, timeouts, hedging and circuit settings, and the cache and config
+# directories.
+_CLIENT_ENV_PREFIXES = ("COPILOT_", "GITHUB_", "GH_", "XDG_")
+_CLIENT_ENV_NAMES = ("HOME", "APPDATA")
+
+
+def _client_environment() -> tuple[tuple[str, str], ...]:
+    return tuple(
+        sorted(
+            (name, value)
+            for name, value in os.environ.items()
+            if name.startswith(_CLIENT_ENV_PREFIXES) or name in _CLIENT_ENV_NAMES
+        )
+    )
+
+
+def create_client(args: Args) -> GithubCopilotClient:
+    """
+    Build the Copilot client; importing it pulls in *requests* and *pydantic*.
+
+    The daemon serves every request with the caller's environment, so a
+    client is rebuilt when the environment it was built from changes.
+    """
+    key = (args.no_cache, args.refresh_cache, args.offline_fallback, args.hedge)
+    environment = _client_environment()
+    cached = _clients.get(key)
+    if cached is not None and cached[0] == environment:
+        return cached[1]
+
+    from copilot_cli.copilot import GithubCopilotClient
+    from copilot_cli.breaker import CircuitBreaker
+    from copilot_cli.hedge import Hedger
+
+    client = GithubCopilotClient(
+        cache=create_cache(args),
+        offline_fallback=args.offline_fallback,
+        hedge=Hedger.from_env(enabled=args.hedge),
+        breaker=CircuitBreaker.from_env(),
+    )
+    _clients[key] = (environment, client)
+    return client
+
+
+def run_warmup(client: GithubCopilotClient) -> None:
+    """Execute ``--warmup``: prime the shared token and the chat connection."""
+    start = time.perf_counter()
+    try:
+        client.warmup()
+    except CopilotClientError as e:
+        CopilotCLILogger.log_error(str(e))
+        sys.exit(1)
+    elapsed = (time.perf_counter() - start) * 1000
+    connect = f"{client.connect_seconds * 1000:.0f} ms" if client.connect_seconds is not None else "failed"
+    CopilotCLILogger.log_success(f"Copilot ready in {elapsed:.0f} ms (chat connection: {connect})")
+
+
+def run_diagnose(client: GithubCopilotClient) -> None:
+    """Execute ``--diagnose``: report the chat endpoint and its connection timings."""
+    from copilot_cli.copilot import APIEndpoints
+    from copilot_cli.endpoint import probe
+
+    failed = False
+    try:
+        client.warmup()
+    except CopilotClientError as e:
+        # Without a token the default endpoint is still worth probing.
+        CopilotCLILogger.log_error(str(e))
+        failed = True
+    endpoint = client.chat_endpoint()
+    print(f"Chat endpoint: {endpoint.url} ({endpoint.source})")
+    if endpoint.addresses:
+        print(f"Cached addresses: {', '.join(endpoint.addresses)}")
+    print(probe(endpoint.url, address=endpoint.addresses[0] if endpoint.addresses else None).describe())
+    if endpoint.url != APIEndpoints.CHAT:
+        print(f"Default endpoint for comparison: {probe(APIEndpoints.CHAT).describe()}")
+    if failed:
+        sys.exit(1)
+
+
+def start_pipeline(client: GithubCopilotClient, args: Args) -> None:
+    """
+    Get the token and the chat connection ready while the action commands run.
+
+    Plain prompts have nothing to overlap with – and may be answered from the
+    response cache without touching the network at all.
+    """
+    if args.action and getattr(get_action_manager(args.path).get_action(args.action), "commands", None):
+        _ = client.start_warmup()
 
-    client = GithubCopilotClient()
 
-    current_prompt: str = args.prompt or ""
-    action_obj: Action | None = None
-    system_prompt: str
-    model: str
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    Run the CLI.
+
+    Args:
+        argv: Arguments without the program name; ``sys.argv[1:]`` by default
+    """
+    parser = create_parser()
+    args = Args(**vars(parser.parse_args(argv)))
 
     if args.list:
+        action_manager = get_action_manager(args.path)
         print("Available actions:")
         for action in action_manager.get_actions_list():
-            print(f"  - {action}: {action_manager.get_action(action).description}")
+            print(f"  - {action}: {action_manager.get_description(action)}")
         return
 
-    if args.action:
-        action_obj = action_manager.get_action(args.action)
+    if args.action and args.action not in get_action_manager(args.path).get_actions_list():
+        choices = ", ".join(repr(name) for name in get_action_manager(args.path).get_actions_list())
+        parser.error(f"argument --action: invalid choice: {args.action!r} (choose from {choices})")
 
-        current_prompt = action_obj.prompt
+    if args.concurrency < 1:
+        parser.error("argument --concurrency: expected a positive number")
+    if args.chunk_tokens is not None and args.chunk_tokens <= 0:
+        parser.error("argument --chunk-tokens: expected a positive number")
 
-        if args.prompt:
-            current_prompt += f"\n{args.prompt}"
+    for option, value in (("--race", args.race), ("--fan-out", args.fan_out)):
+        if value is not None and not value.replace(",", "").strip():
+            parser.error(f"argument {option}: expected a comma-separated list of models")
 
-        system_prompt = action_obj.system_prompt
-        model = action_obj.model or args.model
+    client = create_client(args)
 
-        try:
-            current_prompt = process_action_commands(
-                action_obj,
-                current_prompt,
-                args.path,
-            )
-        except subprocess.CalledProcessError:
-            return
-    else:
-        system_prompt = args.system_prompt
-        model = args.model
+    if args.warmup:
+        run_warmup(client)
+        return
 
-    response = handle_completion(
-        client,
-        current_prompt,
-        model,
-        system_prompt,
-        action_obj,
-        args,
+    if args.diagnose:
+        run_diagnose(client)
+        return
+
+    if args.batch:
+        run_batch_file(client, args)
+        return
+
+    text: Optional[str] = None
+    if args.input is not None:
+        try:
+            text = read_input(args.input)
+        except OSError as e:
+            CopilotCLILogger.log_error(f"Failed to read input {args.input}: {e}")
+            sys.exit(1)
+    # Actions declaring map_reduce (or any, with --chunk-tokens) answer the
+    # input chunk by chunk; otherwise it is appended to the prompt.
+    chunked = bool(
+        text
+        and text.strip()
+        and (
+            args.chunk_tokens is not None
+            or (args.action and getattr(get_action_manager(args.path).get_action(args.action), "map_reduce", None))
+        )
     )
+    if chunked and (args.race or args.fan_out):
+        parser.error("--race and --fan-out cannot be combined with a chunked --input")
+    prompt = args.prompt
+    if text and not chunked:
+        prompt = f"{prompt}\n{text}" if prompt else text
+
+    start_pipeline(client, args)
+
+    try:
+        action_obj, current_prompt, model, system_prompt = prepare_request(
+            args.action,
+            prompt,
+            args.path,
+            args.model,
+            args.system_prompt,
+            create_command_cache(args) if args.action else None,
+        )
+    except subprocess.SubprocessError:
+        return
+
+    if args.verbose:
+        from copilot_cli.limits import measure_prompt
+
+        print(f"Tokens: {measure_prompt(model, system_prompt, current_prompt).describe()}", file=sys.stderr)
+
+    chunks = split_input(text, current_prompt, model, system_prompt, action_obj, args) if chunked and text else None
+
+    try:
+        response = handle_completion(
+            client,
+            current_prompt,
+            model,
+            system_prompt,
+            action_obj,
+            args,
+            chunks=chunks,
+        )
+    except CopilotClientError as e:
+        CopilotCLILogger.log_error(str(e))
+        sys.exit(1)
+
+    if args.verbose:
+        from copilot_cli.limits import model_limits
+        from copilot_cli.tokens import estimate_tokens
+
+        print(f"Tokens: response ~{estimate_tokens(response, model_limits(model).encoding)}", file=sys.stderr)
 
     if args.copy_to_clipboard:
-        pyperclip.copy(response)
+        copy_to_clipboard(response)
 
 
 if __name__ == "__main__":
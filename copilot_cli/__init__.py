@@ -15,16 +15,19 @@ actually accessed by *copilot-cli*.
 from __future__ import annotations
 
 import sys
+from importlib.util import find_spec
 from types import ModuleType
 from typing import Any
 
+__version__ = "0.1.0"
+
 # ---------------------------------------------------------------------------
 # pydantic fallback
 # ---------------------------------------------------------------------------
 
-try:
-    import pydantic as _pydantic  # noqa: F401  # pylint: disable=unused-import
-except ModuleNotFoundError:  # pragma: no cover – runtime fallback
+# Only *locate* the real packages – importing them is left to the modules that
+# need them, so ``import copilot_cli`` stays cheap.
+if find_spec("pydantic") is None:  # pragma: no cover – runtime fallback
 
     def _field(*, default: Any = None, default_factory: Any = None, **_kwargs: Any) -> Any:  # noqa: D401
         return default if default_factory is None else default_factory()
@@ -52,9 +55,7 @@ except ModuleNotFoundError:  # pragma: no cover – runtime fallback
 # typing_extensions fallback
 # ---------------------------------------------------------------------------
 
-try:
-    import typing_extensions as _typing_extensions  # noqa: F401  # pylint: disable=unused-import
-except ModuleNotFoundError:  # pragma: no cover – runtime fallback
+if find_spec("typing_extensions") is None:  # pragma: no cover – runtime fallback
     import typing as _typing
 
     sys.modules.setdefault("typing_extensions", _typing)  # Re-export built-in typing as a stand-in
@@ -77,20 +78,34 @@ except ModuleNotFoundError:  # pragma: no cover – runtime fallback
 # are re-exported at package level.  This approach avoids code duplication
 # and keeps the single source of truth inside the executable script while
 # at the same time satisfying the import expectations of the test runner.
+#
+# Loading the script executes all of its module-level code, so it happens
+# lazily (PEP 562) on first access to one of the exported names rather than
+# on every ``import copilot_cli`` – which the script itself triggers when it
+# imports its own helpers.
 
 from importlib.util import module_from_spec, spec_from_file_location  # noqa: E402
 from pathlib import Path  # noqa: E402
 
-
-def _bootstrap_cli_helpers() -> None:  # noqa: D401
-    """Load *copilot-cli.py* as a module and re-export key helpers.
-
-    The function is executed during package import to populate the global
-    namespace with references to *create_parser*, *handle_completion*, … if
-    they are defined in the CLI script.  Failures are silently ignored so
-    that importing *copilot_cli* never raises due to a missing file – this is
-    important for minimal environments where the repository might be
-    re-structured or incomplete.
+_CLI_HELPERS = (
+    "create_parser",
+    "handle_completion",
+    "process_action_commands",
+    "prepare_request",
+    "resource_path",
+    "run_command",
+    "main",
+    "create_streamer",
+    "use_raw_output",
+)
+
+
+def _load_cli_module() -> ModuleType | None:  # noqa: D401
+    """Load *copilot-cli.py* as the ``copilot_cli._entry`` module.
+
+    Failures are silently ignored so that accessing the helpers never raises
+    due to a missing file – this is important for minimal environments where
+    the repository might be re-structured or incomplete.
     """
 
     # The standalone CLI script lives in the repository root directory right
@@ -101,34 +116,26 @@ def _bootstrap_cli_helpers() -> None:  # noqa: D401
     if not script_path.exists():
         # Nothing to do – keep the package importable even when the script is
         # absent (e.g. during certain test scenarios).
-        return
+        return None
 
     spec = spec_from_file_location("copilot_cli._entry", script_path)
-    if spec and spec.loader:  # pragma: no cover – defensive guard
-        module = module_from_spec(spec)
-        try:
-            spec.loader.exec_module(module)  # type: ignore[attr-defined]
-        except Exception:
-            return
-
-        globals_to_export = [
-            "create_parser",
-            "handle_completion",
-            "process_action_commands",
-            "resource_path",
-            "run_command",
-            "main",
-            "create_streamer",
-        ]
-
-        current_globals = globals()
-        for name in globals_to_export:
-            if name in module.__dict__:
-                current_globals.setdefault(name, module.__dict__[name])
-
-
-# Run the bootstrapper on import so that the helpers are immediately
-# available for users doing ``import copilot_cli``.
-_bootstrap_cli_helpers()
-
-
+    if not (spec and spec.loader):  # pragma: no cover – defensive guard
+        return None
+    module = module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)  # type: ignore[attr-defined]
+    except Exception:
+        return None
+    return module
+
+
+def __getattr__(name: str) -> Any:
+    if name in _CLI_HELPERS:
+        module = _load_cli_module()
+        if module is not None and name in module.__dict__:
+            current_globals = globals()
+            for helper in _CLI_HELPERS:
+                if helper in module.__dict__:
+                    current_globals.setdefault(helper, module.__dict__[helper])
+            return current_globals[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
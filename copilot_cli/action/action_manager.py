@@ -5,155 +5,219 @@ This module tries to use *PyYAML* for parsing the YAML configuration file. If
 it falls back to a dummy implementation that treats the file as empty and
 therefore disables the action subsystem.  All other CLI functionality (e.g.
 simple prompt forwarding) keeps working without external dependencies.
+
+Parsing and validating the file costs far more than running most actions, so
+the validated actions are kept in a compiled cache (see
+:mod:`copilot_cli.action.compiled`).  Neither *PyYAML* nor *pydantic* is
+imported unless *actions.yml* changed since it was last compiled.
+
+On top of *actions.yml*, actions may come from ``actions.d`` directories with
+one file per action (see :mod:`copilot_cli.action.directory`): a user-level
+layer in ``$XDG_CONFIG_HOME/copilot-cli/actions.d`` and a project-level layer
+in the nearest ``.copilot-cli/actions.d`` above the working path.  Later
+layers override earlier ones action by action.
 """
 
 from __future__ import annotations
 
+import os
+from collections.abc import Iterable
 from pathlib import Path
-from typing import Any, Dict
-
-# Optional dependency ---------------------------------------------------------
-try:
-    import yaml  # type: ignore
-
-    def _safe_load_yaml(text: str) -> Dict[str, Any]:  # noqa: D401
-        return yaml.safe_load(text)  # type: ignore[arg-type]
-
-except ModuleNotFoundError:  # pragma: no cover – runtime fallback
-
-    def _safe_load_yaml(_text: str) -> Dict[str, Any]:  # noqa: D401
-        # Minimal YAML fallback: return an empty mapping so the rest of the CLI
-        # can still operate without predefined actions.
-        # Very simple YAML subset parser supporting the limited features used
-        # inside *actions.yml*: top-level mapping, nested mappings and
-        # multi-line scalar / list values introduced with a dash.
-
-        def _strip_quotes(val: str) -> str:
-            if (val.startswith("\"") and val.endswith("\"")) or (
-                val.startswith("'") and val.endswith("'")
-            ):
-                return val[1:-1]
-            return val
-
-        root: Dict[str, Any] = {}
-
-        # Each entry on the stack keeps: (indent_level, container)
-        # container is either a *dict* or *list* that is currently being
-        # populated.  The parent container is always the previous element in
-        # the stack.
-        stack: list[tuple[int, Dict[str, Any] | list[Any]]] = [(-1, root)]
-
-        for raw_line in _text.splitlines():
-            # ----------------------------------------------------------------
-            # Pre-processing – ignore blanks and comments
-            # ----------------------------------------------------------------
-            if not raw_line.strip() or raw_line.lstrip().startswith("#"):
-                continue
-
-            indent = len(raw_line) - len(raw_line.lstrip())
-            line = raw_line.lstrip()
-
-            # Pop the stack until we find the parent container for the current
-            # indentation level.
-            while stack and indent <= stack[-1][0]:
-                stack.pop()
-
-            parent = stack[-1][1]
-
-            # ----------------------------------------------------------------
-            # YAML list item ("- value")
-            # ----------------------------------------------------------------
-            if line.startswith("- "):
-                value = _strip_quotes(line[2:].strip())
-
-                # If the parent container is a mapping, it means that we
-                # previously encountered a key with an empty value ("key:") and
-                # now realize that the value should actually be a list.  We
-                # therefore replace the placeholder mapping with a proper
-                # list.
-                if isinstance(parent, dict):
-                    # Locate the key in the grand-parent mapping whose value is
-                    # this *parent* mapping.
-                    for gp_key, gp_val in stack[-2][1].items():  # type: ignore[index]
-                        if gp_val is parent:
-                            new_list: list[Any] = []
-                            stack[-2][1][gp_key] = new_list  # type: ignore[index]
-                            stack[-1] = (stack[-1][0], new_list)
-                            parent = new_list
-                            break
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
 
-                # Guarantee that *parent* is now a list.
-                if isinstance(parent, list):
-                    parent.append(value)
-                continue
+from .compiled import ActionView, load_compiled, store_compiled
+from .directory import ActionDirectory
 
-            # ----------------------------------------------------------------
-            # YAML mapping entry ("key: value")
-            # ----------------------------------------------------------------
-            if ":" in line:
-                key, rest = line.split(":", 1)
-                key = key.strip()
-                value_part = rest.strip()
+if TYPE_CHECKING:
+    from .model import Action
 
-                if value_part == "":
-                    # The mapping value spans multiple subsequent lines – we
-                    # insert a placeholder dict which may later be converted to
-                    # a list when we encounter list items.
-                    new_container: Dict[str, Any] = {}
 
-                    if isinstance(parent, dict):
-                        parent[key] = new_container
-                    elif isinstance(parent, list):
-                        parent.append({key: new_container})
+# Optional dependency ---------------------------------------------------------
+def _safe_load_yaml(text: str) -> Dict[str, Any]:  # noqa: D401
+    try:
+        import yaml  # type: ignore
+    except ModuleNotFoundError:  # pragma: no cover – runtime fallback
+        return _parse_yaml_subset(text)
+    return yaml.safe_load(text)  # type: ignore[arg-type]
+
+
+def _parse_yaml_subset(_text: str) -> Dict[str, Any]:  # noqa: D401
+    # Minimal YAML fallback used when *PyYAML* is not installed.
+    # Very simple YAML subset parser supporting the limited features used
+    # inside *actions.yml*: top-level mapping, nested mappings,
+    # multi-line scalar / list values introduced with a dash and flow lists
+    # of scalars.
+
+    def _strip_quotes(val: str) -> str:
+        if (val.startswith("\"") and val.endswith("\"")) or (
+            val.startswith("'") and val.endswith("'")
+        ):
+            return val[1:-1]
+        return val
+
+    root: Dict[str, Any] = {}
+
+    # Each entry on the stack keeps: (indent_level, container)
+    # container is either a *dict* or *list* that is currently being
+    # populated.  The parent container is always the previous element in
+    # the stack.
+    stack: list[tuple[int, Dict[str, Any] | list[Any]]] = [(-1, root)]
+
+    for raw_line in _text.splitlines():
+        # ----------------------------------------------------------------
+        # Pre-processing – ignore blanks and comments
+        # ----------------------------------------------------------------
+        if not raw_line.strip() or raw_line.lstrip().startswith("#"):
+            continue
+
+        indent = len(raw_line) - len(raw_line.lstrip())
+        line = raw_line.lstrip()
+
+        # Pop the stack until we find the parent container for the current
+        # indentation level.
+        while stack and indent <= stack[-1][0]:
+            stack.pop()
+
+        parent = stack[-1][1]
+
+        # ----------------------------------------------------------------
+        # YAML list item ("- value")
+        # ----------------------------------------------------------------
+        if line.startswith("- "):
+            value = _strip_quotes(line[2:].strip())
+
+            # If the parent container is a mapping, it means that we
+            # previously encountered a key with an empty value ("key:") and
+            # now realize that the value should actually be a list.  We
+            # therefore replace the placeholder mapping with a proper
+            # list.
+            if isinstance(parent, dict):
+                # Locate the key in the grand-parent mapping whose value is
+                # this *parent* mapping.
+                for gp_key, gp_val in stack[-2][1].items():  # type: ignore[index]
+                    if gp_val is parent:
+                        new_list: list[Any] = []
+                        stack[-2][1][gp_key] = new_list  # type: ignore[index]
+                        stack[-1] = (stack[-1][0], new_list)
+                        parent = new_list
+                        break
+
+            # Guarantee that *parent* is now a list.
+            if isinstance(parent, list):
+                parent.append(value)
+            continue
+
+        # ----------------------------------------------------------------
+        # YAML mapping entry ("key: value")
+        # ----------------------------------------------------------------
+        if ":" in line:
+            key, rest = line.split(":", 1)
+            key = key.strip()
+            value_part = rest.strip()
+
+            if value_part == "":
+                # The mapping value spans multiple subsequent lines – we
+                # insert a placeholder dict which may later be converted to
+                # a list when we encounter list items.
+                new_container: Dict[str, Any] = {}
 
-                    # Push the new container onto the stack.
-                    stack.append((indent, new_container))
-                else:
-                    scalar_val = _strip_quotes(value_part)
-                    if isinstance(parent, dict):
-                        parent[key] = scalar_val
-                    elif isinstance(parent, list):
-                        parent.append({key: scalar_val})
+                if isinstance(parent, dict):
+                    parent[key] = new_container
+                elif isinstance(parent, list):
+                    parent.append({key: new_container})
+
+                # Push the new container onto the stack.
+                stack.append((indent, new_container))
+            else:
+                scalar_val: Any = _strip_quotes(value_part)
+                if value_part.startswith("[") and value_part.endswith("]"):
+                    # Flow list of scalars, e.g. ``model: [o3-mini, gpt-4o]``.
+                    scalar_val = [_strip_quotes(item.strip()) for item in value_part[1:-1].split(",") if item.strip()]
+                if isinstance(parent, dict):
+                    parent[key] = scalar_val
+                elif isinstance(parent, list):
+                    parent.append({key: scalar_val})
 
-        return root
+    return root
 
 
-from pydantic import BaseModel
+def default_action_dirs(project_path: Union[str, Path] = ".") -> list[Path]:
+    """
+    Return the ``actions.d`` layers that exist, lowest precedence first.
 
-from .model import Action
+    Args:
+        project_path: Directory from which the project layer is searched
+            upwards, usually the ``--path`` argument
+    """
+    config_home = Path(os.getenv("XDG_CONFIG_HOME") or Path.home() / ".config")
+    layers = [config_home / "copilot-cli" / "actions.d"]
 
+    start = Path(project_path).resolve()
+    for directory in (start, *start.parents):
+        candidate = directory / ".copilot-cli" / "actions.d"
+        if candidate.is_dir():
+            layers.append(candidate)
+            break
 
-class ActionsYAML(BaseModel):
-    actions: dict[str, Action]
+    return [layer for layer in layers if layer.is_dir()]
 
 
 class ActionManager:
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, action_dirs: Iterable[Union[str, Path]] = ()):
+        """
+        Args:
+            config_path: The bundled *actions.yml*
+            action_dirs: ``actions.d`` layers merged on top of it, lowest
+                precedence first
+        """
         self._actions = self.load_actions(config_path)
-
-    def load_actions(self, config_path: str) -> dict[str, Action]:  # noqa: D401
-        """Load actions from a YAML file.
-
-        The file is parsed via *PyYAML* when available.  Otherwise, an empty
-        mapping is returned which effectively disables the *Action* feature
-        while still allowing the rest of the CLI to function.
+        # Action name -> directory defining it; None for *actions.yml*.
+        self._index: dict[str, Optional[ActionDirectory]] = dict.fromkeys(self._actions)
+        for path in action_dirs:
+            directory = ActionDirectory(Path(path))
+            for name in directory.names():
+                self._index[name] = directory
+
+    def load_actions(self, config_path: str) -> dict[str, ActionView]:  # noqa: D401
+        """Load actions from a YAML file, through the compiled cache.
+
+        The file is only parsed (via *PyYAML* when available) and validated
+        when no up-to-date compiled copy exists.  A missing or unreadable file
+        yields an empty mapping which effectively disables the *Action*
+        feature while still allowing the rest of the CLI to function.
         """
 
         cfg_path = Path(config_path)
-        if not cfg_path.exists():
+        try:
+            # Stat before reading: an edit racing with the compile below
+            # changes the key, so the next run compiles again.
+            stat = cfg_path.stat()
+        except OSError:
             return {}
 
+        compiled = load_compiled(cfg_path, stat)
+        if compiled is None:
+            compiled = self.compile_actions(cfg_path)
+            store_compiled(cfg_path, stat, compiled)
+
+        return {name: ActionView.from_dict(conf) for name, conf in compiled.items()}
+
+    @staticmethod
+    def compile_actions(cfg_path: Path) -> dict[str, dict[str, Any]]:
+        """Parse and validate *cfg_path* into plain, marshal-able dictionaries."""
+        from .model import Action
+
         try:
             actions_raw = _safe_load_yaml(cfg_path.read_text())
             if not actions_raw or "actions" not in actions_raw:
                 return {}
 
             actions_section = actions_raw["actions"]
-            actions: dict[str, Action] = {}
+            actions: dict[str, dict[str, Any]] = {}
             for name, conf in actions_section.items():
                 if isinstance(conf, dict):
                     try:
-                        actions[name] = Action(**conf)  # type: ignore[arg-type]
+                        actions[name] = Action(**conf).model_dump()  # type: ignore[arg-type]
                     except Exception:
                         # Skip invalid entries – maintain robustness.
                         pass
@@ -172,12 +236,38 @@ class ActionManager:
             action: The name of the action.
 
         Returns:
-            Action: The action object.
+            Action: The action object – an attribute-compatible *ActionView*
+            of the validated model.
+        """
+        if action not in self._index:
+            raise ValueError(f"Invalid action: {action}")
+
+        directory = self._index[action]
+        if directory is None:
+            return self._actions[action]
+
+        loaded = directory.load(action)
+        if loaded is None:
+            raise ValueError(f"Invalid action: {action}")
+        return loaded
+
+    def get_description(self, action: str) -> str:
+        """
+        Get the description of an action without loading it.
+
+        Args:
+            action: The name of the action.
+
+        Returns:
+            str: The description shown by ``--list``.
         """
-        if action not in self._actions:
+        if action not in self._index:
             raise ValueError(f"Invalid action: {action}")
 
-        return self._actions[action]
+        directory = self._index[action]
+        if directory is None:
+            return self._actions[action].description
+        return directory.description(action)
 
     def get_actions_list(self) -> list[str]:
         """
@@ -186,4 +276,4 @@ class ActionManager:
         Returns:
             list: A list of action names.
         """
-        return list(self._actions.keys())
+        return list(self._index.keys())
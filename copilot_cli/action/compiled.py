@@ -0,0 +1,95 @@
+"""Compiled cache of validated actions.
+
+Reading *actions.yml* means importing *PyYAML* (or running the pure-Python
+fallback parser), importing *pydantic* and validating every *Action* – on
+every single invocation.  After a successful parse, the validated actions are
+dumped to plain dictionaries and stored as a :mod:`marshal` blob under
+``$XDG_CACHE_HOME/copilot-cli/actions/``.
+
+The blob is keyed on the resolved path, size and modification time of the
+source file together with the package version and the blob format, so any
+edit (or upgrade) transparently triggers a recompile.  Loading it needs
+nothing but :mod:`marshal`; the actions are handed out as :class:`ActionView`
+objects that offer the same attributes as the *Action* model.
+"""
+
+from __future__ import annotations
+
+import marshal
+import os
+import zlib
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Optional
+
+from .. import __version__
+from ..filelock import atomic_write_bytes
+from ..utils import user_cache_dir
+
+# Bump when the layout of the compiled blob changes.
+COMPILED_FORMAT = 6
+
+CompiledActions = dict[str, dict[str, Any]]
+
+
+class ActionView(SimpleNamespace):
+    """
+    Stand-in for a validated *Action*, built without *pydantic*.
+    """
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ActionView":
+        """Wrap a dumped *Action*; nested sections become namespaces as well."""
+        sections = {key: SimpleNamespace(**data[key]) for key in ("output", "options", "map_reduce") if isinstance(data.get(key), dict)}
+        return cls(**{**data, **sections})
+
+
+def _cache_key(config_path: Path, stat: os.stat_result) -> tuple[Any, ...]:
+    return (str(config_path.resolve()), stat.st_size, stat.st_mtime_ns, __version__, COMPILED_FORMAT)
+
+
+def compiled_path(config_path: Path) -> Path:
+    """Location of the compiled blob for *config_path*."""
+    digest = zlib.crc32(str(config_path.resolve()).encode("utf-8"))
+    return user_cache_dir() / "actions" / f"{config_path.stem}-{digest:08x}.marshal"
+
+
+def load_compiled(config_path: Path, stat: os.stat_result) -> Optional[CompiledActions]:
+    """
+    Return the compiled actions of *config_path* if they are up to date.
+
+    Args:
+        config_path: The source YAML file
+        stat: Its current ``os.stat`` result
+
+    Returns:
+        The validated actions, or ``None`` when the blob is missing, stale or
+        unreadable
+    """
+    try:
+        blob = marshal.loads(compiled_path(config_path).read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(blob, dict) or blob.get("key") != _cache_key(config_path, stat):
+        return None
+    actions = blob.get("actions")
+    return actions if isinstance(actions, dict) else None
+
+
+def store_compiled(config_path: Path, stat: os.stat_result, actions: CompiledActions) -> None:
+    """
+    Store *actions* as the compiled form of *config_path*.
+
+    Failures (read-only cache directory, values marshal cannot handle) are
+    ignored – the file is simply parsed again next time.
+
+    Args:
+        config_path: The source YAML file
+        stat: Its ``os.stat`` result taken *before* it was read
+        actions: The validated actions as plain dictionaries
+    """
+    try:
+        data = marshal.dumps({"key": _cache_key(config_path, stat), "actions": actions})
+        atomic_write_bytes(compiled_path(config_path), data)
+    except (OSError, ValueError):
+        pass
@@ -0,0 +1,145 @@
+"""Per-action files in ``actions.d`` directories.
+
+Besides the bundled *actions.yml*, actions can live one per file in an
+``actions.d`` directory – ``actions.d/<name>.yml`` holds the mapping that
+would otherwise sit under ``actions: <name>:``.  With hundreds of actions,
+parsing and validating all of them to run one is wasteful, so every
+directory keeps a small index (name → file, description) next to the
+compiled actions under ``$XDG_CACHE_HOME/copilot-cli/actions/``:
+
+* listing actions reads only the index;
+* a file is parsed and validated only when its size or modification time
+  differs from the indexed one – at which point its compiled form is stored
+  as well (see :mod:`copilot_cli.action.compiled`);
+* loading one action reads only that action's compiled blob.
+"""
+
+from __future__ import annotations
+
+import marshal
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Optional
+
+from .. import __version__
+from ..filelock import atomic_write_bytes
+from ..utils import user_cache_dir
+from .compiled import COMPILED_FORMAT, ActionView, load_compiled, store_compiled
+
+ACTION_SUFFIXES = (".yml", ".yaml")
+
+# file name -> (size, mtime_ns, description); description is None for files
+# that do not hold a valid action.
+_IndexFiles = dict[str, tuple[int, int, Optional[str]]]
+
+
+def compile_action_file(path: Path, stat: os.stat_result) -> Optional[dict[str, Any]]:
+    """
+    Parse and validate a single action file and store its compiled form.
+
+    Returns:
+        The validated action as a plain dictionary, or ``None`` if the file
+        does not contain a valid action
+    """
+    from .action_manager import _safe_load_yaml
+    from .model import Action
+
+    try:
+        conf = _safe_load_yaml(path.read_text())
+        action = Action(**conf).model_dump()  # type: ignore[arg-type]
+    except Exception:
+        # Skip invalid files – maintain robustness.
+        return None
+    store_compiled(path, stat, {path.stem: action})
+    return action
+
+
+class ActionDirectory:
+    """
+    Index of the actions stored one per file in a directory.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Args:
+            path: The ``actions.d`` directory
+        """
+        self.path = path
+        self._entries: dict[str, tuple[Path, str]] = {}
+        self._scan()
+
+    def _index_path(self) -> Path:
+        digest = zlib.crc32(str(self.path.resolve()).encode("utf-8"))
+        return user_cache_dir() / "actions" / f"index-{digest:08x}.marshal"
+
+    def _index_key(self) -> tuple[Any, ...]:
+        return (str(self.path.resolve()), __version__, COMPILED_FORMAT)
+
+    def _load_index(self) -> _IndexFiles:
+        try:
+            blob = marshal.loads(self._index_path().read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}
+        if not isinstance(blob, dict) or blob.get("key") != self._index_key():
+            return {}
+        files = blob.get("files")
+        return files if isinstance(files, dict) else {}
+
+    def _scan(self) -> None:
+        """Refresh the index, compiling only files that changed."""
+        indexed = self._load_index()
+        files: _IndexFiles = {}
+        try:
+            entries = sorted(os.scandir(self.path), key=lambda e: e.name)
+        except OSError:
+            entries = []
+
+        for entry in entries:
+            path = Path(entry.path)
+            if path.suffix not in ACTION_SUFFIXES or path.stem in self._entries or not entry.is_file():
+                continue
+            stat = entry.stat()
+            cached = indexed.get(entry.name)
+            if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+                description = cached[2]
+            else:
+                compiled = load_compiled(path, stat)
+                action = compiled.get(path.stem) if compiled else compile_action_file(path, stat)
+                description = None if action is None else str(action.get("description", ""))
+            files[entry.name] = (stat.st_size, stat.st_mtime_ns, description)
+            if description is not None:
+                self._entries[path.stem] = (path, description)
+
+        if files != indexed:
+            try:
+                atomic_write_bytes(self._index_path(), marshal.dumps({"key": self._index_key(), "files": files}))
+            except OSError:
+                pass
+
+    def names(self) -> list[str]:
+        """Names of the valid actions in the directory, sorted."""
+        return list(self._entries)
+
+    def description(self, name: str) -> str:
+        """The indexed description of action *name*."""
+        return self._entries[name][1]
+
+    def load(self, name: str) -> Optional[ActionView]:
+        """
+        Load action *name* from its compiled blob, compiling it if necessary.
+
+        Returns:
+            The action, or ``None`` if it vanished or became invalid
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        path = entry[0]
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        compiled = load_compiled(path, stat)
+        action = compiled.get(name) if compiled is not None else compile_action_file(path, stat)
+        return ActionView.from_dict(action) if action is not None else None
@@ -1,7 +1,7 @@
 # Postpone evaluation of annotations for Python <3.10
 # Postpone evaluation of annotations for Python <3.10
 from __future__ import annotations
-from typing import Optional
+from typing import Optional, Union
 
 from pydantic import BaseModel, Field
 # *typing_extensions* might be absent in minimal environments. Fallback to the
@@ -13,6 +13,7 @@ except ModuleNotFoundError:  # pragma: no cover – runtime fallback
     from typing import Callable  # type: ignore
 
 from ..args import Args
+from ..commands import DEFAULT_MAX_OUTPUT, DEFAULT_TIMEOUT
 
 
 class Output(BaseModel):
@@ -23,14 +24,46 @@ class Output(BaseModel):
 class Options(BaseModel):
     stream: bool = Field(default=True)
     spinner: bool = Field(default=True)
+    # Seconds a response of this action stays in the response cache; 0
+    # disables caching, None uses the cache default.
+    cache_ttl: Optional[int] = None
+    # Limits applied to each entry of *commands*: seconds before it is
+    # killed and bytes of stdout kept.
+    command_timeout: float = Field(default=DEFAULT_TIMEOUT, gt=0)
+    command_max_output: int = Field(default=DEFAULT_MAX_OUTPUT, gt=0)
+    # Reuse command outputs while their state fingerprint (git index and
+    # refs, or the files listed per command in *command_inputs*) is unchanged.
+    cache_commands: bool = Field(default=False)
+    command_inputs: Optional[dict[str, list[str]]] = None
+    # Token budget of the prompt; diff outputs are trimmed to fit it.  None
+    # derives it from the model's context window.
+    max_prompt_tokens: Optional[int] = Field(default=None, gt=0)
+
+
+class MapReduce(BaseModel):
+    # Estimated tokens of input per chunk; None uses the default, shrunk to
+    # what the model's prompt and output limits allow.
+    chunk_tokens: Optional[int] = Field(default=None, gt=0)
+    # Sent with the stitched chunk answers to merge them into one answer;
+    # without it the stitched answers are the output.
+    reduce_prompt: Optional[str] = None
 
 
 class Action(BaseModel):
     description: str
     prompt: str
     system_prompt: str
-    model: str
+    # A model name, or an ordered fallback chain tried while the models
+    # before it are unavailable (see *copilot_cli.breaker*).
+    model: Union[str, list[str]]
     commands: Optional[dict[str, list[str]]] = None
     on_complete: Optional[Callable[[str, Args], None]] = None
     output: Output = Field(default_factory=Output)
     options: Options = Field(default_factory=Options)
+    # Split ``--input`` into chunks answered concurrently (see
+    # *copilot_cli.mapreduce*); without it the input is sent whole.
+    map_reduce: Optional[MapReduce] = None
+
+
+class ActionsYAML(BaseModel):
+    actions: dict[str, Action]
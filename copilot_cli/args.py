@@ -14,3 +14,17 @@ class Args:
     no_spinner: bool
     copy_to_clipboard: bool
     list: bool
+    no_cache: bool = False
+    refresh_cache: bool = False
+    offline_fallback: bool = False
+    hedge: bool = False
+    batch: Optional[str] = None
+    concurrency: int = 4
+    output: str = "auto"
+    warmup: bool = False
+    diagnose: bool = False
+    verbose: bool = False
+    race: Optional[str] = None
+    fan_out: Optional[str] = None
+    input: Optional[str] = None
+    chunk_tokens: Optional[int] = None
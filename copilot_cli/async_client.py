@@ -0,0 +1,200 @@
+"""Asyncio front-end for *GithubCopilotClient*.
+
+:class:`AsyncGithubCopilotClient` lets a single process run many completions
+concurrently while sharing one OAuth/Copilot token and one keep-alive
+connection pool.  It wraps a regular :class:`GithubCopilotClient` and runs
+its ``chat_completion``/``stream_chat_completion`` verbatim, so both clients
+send byte-identical requests and share the cache, the circuit breaker, the
+fallback chain and the prompt-size check.
+
+Blocking HTTP work runs on the client's own thread pool (no extra HTTP
+dependency is required); the event loop only coordinates:
+
+* an ``asyncio.Lock`` makes sure concurrent coroutines trigger at most one
+  token refresh, and
+* a bounded semaphore caps the number of in-flight requests.
+
+The loop's default executor is not used: it may have fewer threads than
+``max_concurrency`` – five on a single CPU – and a stream occupies a thread
+for its whole duration.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from collections.abc import AsyncIterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from .cancel import Cancellation
+from .copilot import GithubCopilotClient, request_errors
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class AsyncGithubCopilotClient:
+    """
+    Asyncio-native client for GitHub Copilot's chat API.
+    """
+
+    def __init__(self, client: Optional[GithubCopilotClient] = None, *, max_concurrency: int = 8) -> None:
+        """
+        Args:
+            client: Synchronous client providing token handling and the
+                connection pool; a new one is created when omitted
+            max_concurrency: Maximum number of requests in flight at once
+        """
+        self._client = client if client is not None else GithubCopilotClient()
+        self._max_concurrency = max_concurrency
+        # Created lazily so they bind to the running event loop.
+        self._semaphore: Optional[asyncio.BoundedSemaphore] = None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def close(self) -> None:
+        """Release the worker threads; the wrapped client stays usable."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _in_thread(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run *func* on the client's thread pool."""
+        if self._executor is None:
+            # A thread per request in flight, plus one for a token refresh.
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_concurrency + 1, thread_name_prefix="copilot-async"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    @property
+    def sync_client(self) -> GithubCopilotClient:
+        """The wrapped synchronous client."""
+        return self._client
+
+    def _limits(self) -> tuple[asyncio.BoundedSemaphore, asyncio.Lock]:
+        if self._semaphore is None or self._refresh_lock is None:
+            self._semaphore = asyncio.BoundedSemaphore(self._max_concurrency)
+            self._refresh_lock = asyncio.Lock()
+        return self._semaphore, self._refresh_lock
+
+    async def _ensure_valid_token(self) -> None:
+        """Refresh the shared token at most once, however many coroutines wait."""
+        if self._client._token_is_valid():
+            self._client._schedule_proactive_refresh()
+            return
+
+        _, refresh_lock = self._limits()
+        async with refresh_lock:
+            # Another coroutine may have refreshed while we were waiting.
+            if not self._client._token_is_valid():
+                try:
+                    await self._in_thread(self._client._ensure_valid_token)
+                except request_errors():
+                    pass  # reported by the request itself, or answered from the cache
+
+    async def chat_completion(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: str,
+        *,
+        cache_ttl: Optional[float] = None,
+        fallbacks: Sequence[str] = (),
+    ) -> str:
+        """
+        Sends a chat completion request to the Copilot API.
+
+        Args:
+            prompt: The user's input prompt
+            model: The model to use for completion
+            system_prompt: The system prompt to guide the model's behavior
+            cache_ttl: Seconds a fresh response stays cached, see
+                :meth:`GithubCopilotClient.chat_completion`
+            fallbacks: Models tried in order when *model* is unavailable
+
+        Returns:
+            The model's response as a string
+        """
+        semaphore, _ = self._limits()
+        async with semaphore:
+            await self._ensure_valid_token()
+            return await self._in_thread(
+                self._client.chat_completion,
+                prompt,
+                model,
+                system_prompt,
+                cache_ttl=cache_ttl,
+                fallbacks=fallbacks,
+            )
+
+    async def stream_chat_completion(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: str,
+        *,
+        cache_ttl: Optional[float] = None,
+        fallbacks: Sequence[str] = (),
+    ) -> AsyncIterator[str]:
+        """
+        Streams a chat completion response from the Copilot API.
+
+        The blocking stream is consumed on a worker thread and handed over to
+        the event loop chunk by chunk.  Closing the async iterator early stops
+        the worker and releases the connection.
+
+        Args:
+            prompt: The user's input prompt
+            model: The model to use for completion
+            system_prompt: The system prompt to guide the model's behavior
+            cache_ttl: Seconds a completed stream stays cached
+            fallbacks: Models tried in order when *model* is unavailable;
+                a stream that already produced output is never re-routed
+
+        Yields:
+            Chunks of the model's response as strings
+        """
+        semaphore, _ = self._limits()
+        async with semaphore:
+            await self._ensure_valid_token()
+
+            loop = asyncio.get_running_loop()
+            queue: asyncio.Queue[object] = asyncio.Queue()
+            cancel = Cancellation()
+
+            def _pump() -> None:
+                chunks = self._client.stream_chat_completion(
+                    prompt,
+                    model,
+                    system_prompt,
+                    cache_ttl=cache_ttl,
+                    cancel=cancel,
+                    fallbacks=fallbacks,
+                )
+                try:
+                    for chunk in chunks:
+                        if cancel.is_set():
+                            break
+                        loop.call_soon_threadsafe(queue.put_nowait, chunk)
+                except BaseException as exc:  # forwarded to the consumer
+                    loop.call_soon_threadsafe(queue.put_nowait, exc)
+                finally:
+                    chunks.close()
+                    loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+
+            worker = asyncio.ensure_future(self._in_thread(_pump))
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is _DONE:
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+                    yield item  # type: ignore[misc]
+            finally:
+                cancel.cancel()
+                await asyncio.shield(worker)
@@ -0,0 +1,151 @@
+"""JSONL batch execution for ``copilot-cli.py --batch``.
+
+Every non-blank input line is a JSON object describing one request, either
+through a pre-defined action::
+
+    {"action": "lazygit-conventional-commit", "path": "/repo/a"}
+
+or through an explicit prompt::
+
+    {"prompt": "Explain rebase", "model": "gpt-4o", "system_prompt": "..."}
+
+Requests run concurrently on one :class:`AsyncGithubCopilotClient` – a single
+interpreter, action registry, token and connection pool for the whole batch.
+The input is read as the requests are taken up, so a streaming stdin gets
+answers before it ends and only a few lines per worker are held at a time.
+Results are written as JSONL in completion order, one line per request, as
+soon as each one finishes::
+
+    {"index": 0, "response": "...", "error": null, "latency_ms": 812.4}
+
+``index`` is the zero-based line number of the request in the input so
+callers can re-associate out-of-order results.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, Callable, Optional, TextIO
+
+from .async_client import AsyncGithubCopilotClient
+
+# Maps a decoded request line to ``(prompt, model, system_prompt, fallbacks)``.
+# Runs on a worker thread because resolving an action may execute shell commands.
+RequestResolver = Callable[[dict[str, Any]], "tuple[str, str, str, Sequence[str]]"]
+
+
+# ``(index, request, error)`` of one input line.
+_Parsed = tuple[int, Optional[dict[str, Any]], Optional[str]]
+
+
+def _parse_lines(lines: Iterable[str]) -> Iterator[_Parsed]:
+    """Decode input lines into ``(index, request, error)`` triples as they are read."""
+    for index, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield index, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(request, dict):
+            yield index, None, "Each line must be a JSON object"
+            continue
+        yield index, request, None
+
+
+async def _run_one(
+    client: AsyncGithubCopilotClient,
+    index: int,
+    request: Optional[dict[str, Any]],
+    error: Optional[str],
+    resolve: RequestResolver,
+) -> dict[str, Any]:
+    start = time.perf_counter()
+    result: dict[str, Any] = {"index": index}
+    if request is not None:
+        result.update({key: request[key] for key in ("id", "action") if key in request})
+    result.update({"model": None, "response": None, "error": error})
+
+    if request is not None:
+        try:
+            prompt, model, system_prompt, fallbacks = await asyncio.to_thread(resolve, request)
+            result["model"] = model
+            result["response"] = await client.chat_completion(prompt, model, system_prompt, fallbacks=fallbacks)
+        except Exception as e:  # reported per line, never aborts the batch
+            result["error"] = f"{type(e).__name__}: {e}"
+
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+async def run_batch_async(
+    client: AsyncGithubCopilotClient,
+    lines: Iterable[str],
+    resolve: RequestResolver,
+    output: TextIO,
+    *,
+    concurrency: int = 4,
+) -> int:
+    """
+    Run every request in *lines* and stream JSONL results to *output*.
+
+    Args:
+        client: Client used for all completions
+        lines: JSONL input lines
+        resolve: Callable turning a request object into prompt, model,
+            system prompt and fallback models
+        output: Text stream receiving one JSON result per line
+        concurrency: Maximum number of requests processed at once, including
+            their shell commands; at most as many parsed lines wait for a
+            free worker, *lines* is not read further ahead
+
+    Returns:
+        The number of requests that failed
+    """
+    workers = max(1, concurrency)
+    pending: asyncio.Queue[Optional[_Parsed]] = asyncio.Queue(maxsize=workers)
+    failures = 0
+
+    async def _read() -> None:
+        parsed = _parse_lines(lines)
+        try:
+            while True:
+                # Reading may block on a pipe, so it happens off the event loop.
+                item = await asyncio.to_thread(next, parsed, None)
+                if item is None:
+                    break
+                await pending.put(item)
+        finally:
+            for _ in range(workers):
+                await pending.put(None)
+
+    async def _work() -> None:
+        nonlocal failures
+        while True:
+            item = await pending.get()
+            if item is None:
+                return
+            result = await _run_one(client, *item, resolve)
+            if result["error"] is not None:
+                failures += 1
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+
+    await asyncio.gather(_read(), *(_work() for _ in range(workers)))
+    return failures
+
+
+def run_batch(
+    client: AsyncGithubCopilotClient,
+    lines: Iterable[str],
+    resolve: RequestResolver,
+    output: TextIO,
+    *,
+    concurrency: int = 4,
+) -> int:
+    """Synchronous wrapper around :func:`run_batch_async`."""
+    return asyncio.run(run_batch_async(client, lines, resolve, output, concurrency=concurrency))
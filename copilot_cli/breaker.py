@@ -0,0 +1,178 @@
+"""Circuit breaker for chat requests, keyed by endpoint and model.
+
+When a model (or the whole endpoint) is down, every invocation used to wait
+for its timeouts and retries before failing.  :class:`CircuitBreaker` counts
+consecutive outage failures – connection errors, timeouts, ``429`` and
+``5xx`` answers that outlasted the retries – per ``(endpoint, model)``.
+After ``threshold`` of them the circuit opens: requests fail at once with
+:class:`~copilot_cli.exception.circuit_open_error.CircuitOpenError`, and
+callers with a fallback chain move on to the next model.
+
+Once the cool-down has passed, a single request is let through as a probe
+(half-open); its success closes the circuit, its failure re-opens it with a
+doubled cool-down.  The state lives in a small lock-protected JSON file
+(``<cache dir>/circuits.json``) so that separate CLI processes learn from
+each other.  A healthy model costs one read of that file per request.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from .exception.circuit_open_error import CircuitOpenError
+from .filelock import FileLock, atomic_write_text
+from .pool import _env_number
+from .utils import user_cache_dir
+
+MAX_COOLDOWN = 600.0
+
+
+class CircuitBreaker:
+    """
+    Shared open/half-open/closed state per ``(endpoint, model)``.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        *,
+        threshold: int = 3,
+        cooldown: float = 30.0,
+        window: float = 120.0,
+    ) -> None:
+        """
+        Args:
+            path: State file; defaults to ``<cache dir>/circuits.json``
+            threshold: Consecutive failures that open a circuit
+            cooldown: Seconds an opened circuit rejects requests before a probe
+            window: Seconds after which an isolated failure is forgotten
+        """
+        self.path = Path(path) if path is not None else user_cache_dir() / "circuits.json"
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.window = window
+        self._lock = FileLock(self.path)
+        # Keys seen with failures; only their successes need a write.
+        self._tracked: set[str] = set()
+
+    @classmethod
+    def from_env(cls) -> Optional[CircuitBreaker]:
+        """
+        Breaker configured by ``COPILOT_CLI_CIRCUIT_THRESHOLD`` and ``COPILOT_CLI_CIRCUIT_COOLDOWN``.
+
+        Returns:
+            ``None`` when disabled (a threshold of 0)
+        """
+        threshold = int(_env_number("COPILOT_CLI_CIRCUIT_THRESHOLD", 3))
+        if threshold <= 0:
+            return None
+        return cls(threshold=threshold, cooldown=_env_number("COPILOT_CLI_CIRCUIT_COOLDOWN", 30.0))
+
+    @staticmethod
+    def _key(endpoint: str, model: str) -> str:
+        return f"{endpoint} {model}"
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        try:
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def _save(self, state: dict[str, dict[str, Any]]) -> None:
+        now = time.time()
+        # Forget closed circuits whose last failure is out of the window.
+        live = {
+            key: entry
+            for key, entry in state.items()
+            if entry.get("open_until") or now - entry.get("last_failure", 0) <= self.window
+        }
+        atomic_write_text(self.path, json.dumps(live))
+
+    def check(self, endpoint: str, model: str) -> None:
+        """
+        Let a request through, or refuse it while the circuit is open.
+
+        After the cool-down, exactly one caller (across processes) is let
+        through as the probe; the others keep being refused until it reports.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        key = self._key(endpoint, model)
+        entry = self._load().get(key)
+        if entry is None:
+            return
+        self._tracked.add(key)
+        if not entry.get("open_until"):
+            return
+        now = time.time()
+        if now < entry["open_until"]:
+            raise self._open_error(model, entry, entry["open_until"] - now)
+
+        try:
+            with self._lock:
+                state = self._load()
+                entry = state.get(key)
+                if entry is None or not entry.get("open_until"):
+                    return
+                now = time.time()
+                if now < entry.get("probe_until", 0):
+                    raise self._open_error(model, entry, entry["probe_until"] - now)
+                # A probe that never reports back (the process died) expires
+                # after one more cool-down.
+                entry["probe_until"] = now + entry.get("cooldown", self.cooldown)
+                self._save(state)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _open_error(model: str, entry: dict[str, Any], retry_in: float) -> CircuitOpenError:
+        return CircuitOpenError(
+            f"{model} is unavailable after {entry.get('failures', 0)} consecutive failures; "
+            f"retrying in {retry_in:.0f} s",
+            model,
+            retry_in,
+        )
+
+    def record_success(self, endpoint: str, model: str) -> None:
+        """Close the circuit of a model that answered."""
+        key = self._key(endpoint, model)
+        if key not in self._tracked:
+            return
+        self._tracked.discard(key)
+        try:
+            with self._lock:
+                state = self._load()
+                if state.pop(key, None) is not None:
+                    self._save(state)
+        except OSError:
+            pass
+
+    def record_failure(self, endpoint: str, model: str) -> None:
+        """Count an outage failure, opening the circuit at ``threshold``."""
+        key = self._key(endpoint, model)
+        self._tracked.add(key)
+        try:
+            with self._lock:
+                state = self._load()
+                now = time.time()
+                entry = state.get(key) or {}
+                open_until = entry.get("open_until", 0)
+                if not open_until and now - entry.get("last_failure", 0) > self.window:
+                    entry["failures"] = 0
+                entry["failures"] = entry.get("failures", 0) + 1
+                entry["last_failure"] = now
+                if open_until and now >= open_until:
+                    # The probe failed: back off further.
+                    cooldown = min(entry.get("cooldown", self.cooldown) * 2, MAX_COOLDOWN)
+                    entry.update(open_until=now + cooldown, cooldown=cooldown, probe_until=0)
+                elif not open_until and entry["failures"] >= self.threshold:
+                    entry.update(open_until=now + self.cooldown, cooldown=self.cooldown, probe_until=0)
+                state[key] = entry
+                self._save(state)
+        except OSError:
+            pass
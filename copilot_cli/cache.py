@@ -0,0 +1,159 @@
+"""Content-addressed on-disk cache for chat completions.
+
+Entries are keyed on the SHA-256 of ``(model, system_prompt, prompt)`` and
+stored as small JSON files under ``$XDG_CACHE_HOME/copilot-cli/responses``.
+Each entry keeps the response as the list of chunks it was received in, so a
+cached answer can be replayed as a stream with the original chunk
+boundaries – *MarkdownStreamer* cannot tell a hit from a live response.
+
+* **TTL** – the time-to-live is recorded per entry when it is written, which
+  lets every action pick its own expiry (``options.cache_ttl``).
+* **LRU eviction** – a hit refreshes the entry's mtime; when the cache grows
+  beyond ``max_bytes`` the least recently used files are deleted.
+* **Concurrency** – entries are written to a temporary file and atomically
+  renamed into place, so concurrent CLI processes never see partial data.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from .filelock import atomic_write_text
+from .utils import user_cache_dir
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 24 * 60 * 60
+
+
+class ResponseCache:
+    """
+    On-disk LRU cache of chat completion responses.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        default_ttl: float = DEFAULT_TTL,
+        read: bool = True,
+        write: bool = True,
+    ) -> None:
+        """
+        Args:
+            directory: Where entries are stored; defaults to the user cache dir
+            max_bytes: Size cap of all entries together
+            default_ttl: Seconds an entry stays valid when no TTL is given
+            read: Serve hits from the cache (``False`` for ``--refresh-cache``)
+            write: Store new responses in the cache
+        """
+        self.directory = Path(directory) if directory is not None else user_cache_dir() / "responses"
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.read = read
+        self.write = write
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, prompt: str) -> str:
+        """Return the content address of a request."""
+        payload = json.dumps([model, system_prompt, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get_chunks(self, model: str, system_prompt: str, prompt: str) -> Optional[list[str]]:
+        """
+        Look up a cached response.
+
+        Returns:
+            The response chunks, or ``None`` on a miss or an expired entry
+        """
+        if not self.read:
+            return None
+
+        path = self._entry_path(self.make_key(model, system_prompt, prompt))
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        ttl = entry.get("ttl", self.default_ttl)
+        if ttl is not None and time.time() > entry.get("created", 0) + ttl:
+            path.unlink(missing_ok=True)
+            return None
+
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+
+        chunks = entry.get("chunks")
+        return chunks if isinstance(chunks, list) else None
+
+    def get(self, model: str, system_prompt: str, prompt: str) -> Optional[str]:
+        """Look up a cached response as a single string."""
+        chunks = self.get_chunks(model, system_prompt, prompt)
+        return "".join(chunks) if chunks is not None else None
+
+    def put(
+        self,
+        model: str,
+        system_prompt: str,
+        prompt: str,
+        chunks: list[str],
+        *,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """
+        Store a response.
+
+        Args:
+            chunks: The response, as streamed chunks or a one-element list
+            ttl: Seconds the entry stays valid; ``0`` disables caching
+        """
+        ttl = self.default_ttl if ttl is None else float(ttl)
+        if not self.write or ttl <= 0:
+            return
+
+        path = self._entry_path(self.make_key(model, system_prompt, prompt))
+        entry = {"created": time.time(), "ttl": ttl, "model": model, "chunks": chunks}
+
+        try:
+            atomic_write_text(path, json.dumps(entry, ensure_ascii=False))
+        except OSError:
+            # The cache is an optimisation – never fail a request over it.
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the size cap is met."""
+        entries: list[tuple[float, int, Path]] = []
+        total = 0
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            path.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        for path in self.directory.glob("*/*.json"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,83 @@
+"""Cancellation of in-flight streaming requests from another thread.
+
+A thread consuming a stream spends most of its time blocked in ``recv`` on
+the response socket, where a flag it checks between chunks is never seen.
+:class:`Cancellation` therefore keeps the live responses it is attached to
+and, when cancelled, shuts their sockets down: the blocked read returns at
+once, the stream ends and the connection is discarded instead of being
+returned to the pool half-read.
+"""
+
+from __future__ import annotations
+
+import socket
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from requests import Response
+
+
+def abort_response(response: Response) -> None:
+    """Shut down the connection of a streaming *response*, waking any reader."""
+    raw = getattr(response, "raw", None)
+    connection = getattr(raw, "connection", None) or getattr(raw, "_connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is None:
+        # http.client drops the connection's socket when the server answers
+        # "Connection: close"; the response's file object still holds it.
+        fp = getattr(getattr(raw, "_fp", None), "fp", None)
+        sock = getattr(getattr(fp, "raw", None), "_sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class Cancellation:
+    """
+    Cancels the streaming requests it is attached to, once.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._responses: list[Response] = []
+        self._children: list[Cancellation] = []
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Stop the attached requests; requests attached later stop immediately."""
+        with self._lock:
+            self._event.set()
+            responses = list(self._responses)
+            children = list(self._children)
+        for response in responses:
+            abort_response(response)
+        for child in children:
+            child.cancel()
+
+    def child(self) -> Cancellation:
+        """A cancellation that is also cancelled when this one is."""
+        child = Cancellation()
+        with self._lock:
+            if not self._event.is_set():
+                self._children.append(child)
+                return child
+        child.cancel()
+        return child
+
+    def attach(self, response: Response) -> None:
+        with self._lock:
+            if not self._event.is_set():
+                self._responses.append(response)
+                return
+        abort_response(response)
+
+    def detach(self, response: Response) -> None:
+        with self._lock:
+            if response in self._responses:
+                self._responses.remove(response)
@@ -0,0 +1,214 @@
+"""Cache of action command outputs keyed on a cheap state fingerprint.
+
+Actions such as ``lazygit-conventional-commit`` run ``git diff --cached`` and
+``git log`` every time, although users typically regenerate suggestions
+several times on the same staged tree.  When an action sets
+``options.cache_commands``, the output of each command is cached under the
+command line plus a fingerprint of the state it depends on:
+
+* **git commands** whose output is a function of the index and the refs
+  (``diff --cached``/``--staged``, ``log``, ``show``, ``ls-files``…) are
+  fingerprinted with the checksum trailer of ``.git/index``, the contents of
+  ``HEAD`` and the ref it points to, the ``packed-refs`` file and the
+  modification times of every directory under ``refs/`` – a ref that is
+  created, updated or deleted (a tag, a fetched remote branch) renames a
+  file in one of them.  All plain file reads, no subprocess;
+* any command may declare **input files** in ``options.command_inputs``;
+  their sizes and modification times become part of the fingerprint.
+
+Commands without a fingerprint (a work-tree ``git diff``, ``git status``, an
+arbitrary script without declared inputs) are never cached.  The fingerprint
+is taken *before* the command runs, so a change racing with the command at
+worst causes a miss next time.  Identical context leads to an identical
+prompt, which the response cache (:mod:`copilot_cli.cache`) can then answer
+without contacting the API at all.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Optional
+
+from .cache import ResponseCache
+from .utils import user_cache_dir
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# git subcommands whose output depends only on the index, HEAD and refs.
+_INDEX_SUBCOMMANDS = frozenset({"ls-files"})
+_REF_SUBCOMMANDS = frozenset({"log", "show", "rev-parse", "rev-list", "describe", "shortlog", "cat-file"})
+# ls-files options that look at the work tree.
+_WORKTREE_LS_FILES = frozenset({"-o", "--others", "-m", "--modified", "-d", "--deleted", "-k", "--killed"})
+
+_COMMAND_MODEL = "command"
+
+
+def _git_dir(directory: Path) -> Optional[Path]:
+    """Find the git directory of the repository containing *directory*."""
+    for candidate in (directory, *directory.parents):
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            # Worktrees and submodules: ".git" holds "gitdir: <path>".
+            try:
+                content = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None
+            if not content.startswith("gitdir:"):
+                return None
+            return (candidate / content[len("gitdir:") :].strip()).resolve()
+    return None
+
+
+def _read(path: Path, *, tail: Optional[int] = None) -> Optional[bytes]:
+    try:
+        if tail is None:
+            return path.read_bytes()
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - tail))
+            return f.read()
+    except OSError:
+        return None
+
+
+def _stat(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _ref_directories(common_dir: Path) -> list[Any]:
+    """Modification times of ``refs/`` and every directory below it."""
+    state: list[Any] = []
+    for root, dirs, _files in os.walk(common_dir / "refs"):
+        dirs.sort()
+        try:
+            state.append([os.path.relpath(root, common_dir), os.stat(root).st_mtime_ns])
+        except OSError:
+            state.append([os.path.relpath(root, common_dir), None])
+    return state
+
+
+def git_state(directory: Path) -> Optional[list[Any]]:
+    """
+    Fingerprint the index and refs of the repository containing *directory*.
+
+    Returns:
+        JSON-serialisable state, or ``None`` when *directory* is not inside a
+        repository this function understands
+    """
+    git_dir = _git_dir(directory.resolve())
+    if git_dir is None:
+        return None
+
+    common = _read(git_dir / "commondir")
+    common_dir = (git_dir / common.decode("utf-8").strip()).resolve() if common else git_dir
+
+    head = _read(git_dir / "HEAD")
+    if head is None:
+        return None
+    ref = None
+    if head.startswith(b"ref:"):
+        name = head[4:].strip().decode("utf-8")
+        ref = _read(git_dir / name) or _read(common_dir / name)
+
+    # The index ends with a checksum of its whole content (SHA-1 or SHA-256).
+    index = _read(git_dir / "index", tail=32)
+    return [
+        str(git_dir),
+        head.hex(),
+        ref.hex() if ref else None,
+        index.hex() if index else None,
+        _stat(common_dir / "packed-refs"),
+        _ref_directories(common_dir),
+        # Pseudo-refs commands may name, e.g. ``git log FETCH_HEAD``.
+        [_stat(git_dir / name) for name in ("FETCH_HEAD", "ORIG_HEAD", "MERGE_HEAD")],
+    ]
+
+
+def _git_target(cmd: Sequence[str]) -> Optional[tuple[Path, str, list[str]]]:
+    """Split a git command line into ``(directory, subcommand, arguments)``."""
+    directory = Path.cwd()
+    args = list(cmd[1:])
+    while args:
+        arg = args.pop(0)
+        if arg == "-C" and args:
+            directory = directory / args.pop(0)
+        elif arg == "-c" and args:
+            args.pop(0)
+        elif arg.startswith(("--git-dir", "--work-tree", "--namespace")):
+            return None
+        elif arg.startswith("-"):
+            continue
+        else:
+            return directory, arg, args
+    return None
+
+
+def _git_fingerprint(cmd: Sequence[str]) -> Optional[list[Any]]:
+    if Path(cmd[0]).name not in ("git", "git.exe") or "GIT_DIR" in os.environ:
+        return None
+    target = _git_target(cmd)
+    if target is None:
+        return None
+    directory, subcommand, args = target
+
+    if subcommand == "diff":
+        cacheable = "--cached" in args or "--staged" in args
+    elif subcommand in _INDEX_SUBCOMMANDS:
+        cacheable = not _WORKTREE_LS_FILES.intersection(args)
+    else:
+        cacheable = subcommand in _REF_SUBCOMMANDS
+    return git_state(directory) if cacheable else None
+
+
+def fingerprint(cmd: Sequence[str], inputs: Sequence[str] = ()) -> Optional[str]:
+    """
+    Fingerprint the state the output of *cmd* depends on.
+
+    Args:
+        cmd: The command line, placeholders already substituted
+        inputs: Files the command reads, declared by the action
+
+    Returns:
+        A hex digest, or ``None`` when the command cannot be cached
+    """
+    if not cmd:
+        return None
+    parts: list[Any] = [os.getcwd()]
+    git = _git_fingerprint(cmd)
+    if git is not None:
+        parts.append(git)
+    elif not inputs:
+        return None
+    parts.extend((path, _stat(Path(path))) for path in inputs)
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class CommandCache(ResponseCache):
+    """
+    On-disk LRU cache of command outputs, stored like cached responses.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, *, max_bytes: int = DEFAULT_MAX_BYTES, **kwargs: Any) -> None:
+        super().__init__(
+            directory if directory is not None else user_cache_dir() / "commands",
+            max_bytes=max_bytes,
+            **kwargs,
+        )
+
+    def get_output(self, cmd: Sequence[str], state: str) -> Optional[str]:
+        """Look up the output of *cmd* for the fingerprint *state*."""
+        return self.get(_COMMAND_MODEL, state, json.dumps(list(cmd)))
+
+    def put_output(self, cmd: Sequence[str], state: str, stdout: str) -> None:
+        """Store the output of *cmd* for the fingerprint *state*."""
+        self.put(_COMMAND_MODEL, state, json.dumps(list(cmd)), [stdout])
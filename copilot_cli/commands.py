@@ -0,0 +1,228 @@
+"""Concurrent execution of action shell commands.
+
+Actions gather context (diff, log, status, file tree…) by running the
+commands listed under ``commands:`` and substituting their output for
+``$<key>`` in the prompt.  The commands are independent of each other, so
+:func:`run_commands` starts all of them at once on a small thread pool and
+waits for the slowest one instead of the sum of all of them.
+
+Every command gets
+
+* a timeout – the process is killed when it runs longer,
+* a stdout cap – output beyond it is dropped (and the process stopped), a
+  marker tells the model that the text was cut, and
+* a :class:`CommandResult` describing what happened, so failures can be
+  reported together with the exit status and the tail of stderr.
+
+The outputs are substituted into the prompt only after all of them have been
+collected, in a single pass (see :mod:`copilot_cli.template`).
+
+Given a :class:`~copilot_cli.command_cache.CommandCache`, outputs whose state
+fingerprint is unchanged are served from the cache without starting the
+process at all.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .command_cache import CommandCache
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_OUTPUT = 1024 * 1024
+MAX_WORKERS = 8
+
+_READ_SIZE = 64 * 1024
+_STDERR_TAIL = 4096
+
+
+@dataclass
+class CommandResult:
+    """Outcome of one action command."""
+
+    key: str
+    cmd: list[str]
+    stdout: str = ""
+    stderr: str = ""
+    returncode: Optional[int] = None
+    truncated: bool = False
+    timed_out: bool = False
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.timed_out and self.returncode == 0
+
+    def describe(self) -> str:
+        """One-line failure report, e.g. ``diff: `git diff` exited with status 128: …``."""
+        command = " ".join(self.cmd)
+        if self.error is not None:
+            reason = f"could not be started: {self.error}"
+        elif self.timed_out:
+            reason = f"timed out after {self.elapsed:.1f}s"
+        else:
+            reason = f"exited with status {self.returncode}"
+        stderr = self.stderr.strip().splitlines()
+        detail = f": {stderr[-1]}" if stderr else ""
+        return f"{self.key}: `{command}` {reason}{detail}"
+
+
+class CommandsFailed(subprocess.SubprocessError):
+    """Raised when one or more action commands did not succeed."""
+
+    def __init__(self, failures: Sequence[CommandResult]) -> None:
+        self.failures = list(failures)
+        super().__init__("; ".join(result.describe() for result in self.failures))
+
+
+def _drain(stream, limit: int, sink: list[bytes]) -> None:  # noqa: ANN001
+    """Read *stream* to EOF, keeping only the last *limit* bytes."""
+    size = 0
+    for block in iter(lambda: stream.read(_READ_SIZE), b""):
+        sink.append(block)
+        size += len(block)
+        while size - len(sink[0]) >= limit:
+            size -= len(sink.pop(0))
+
+
+def run_command_capped(
+    key: str,
+    cmd: list[str],
+    *,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_output: int = DEFAULT_MAX_OUTPUT,
+) -> CommandResult:
+    """
+    Run a single command with a timeout and a cap on captured stdout.
+
+    Args:
+        key: Placeholder name the output is substituted for
+        cmd: The command line
+        timeout: Seconds before the process is killed
+        max_output: Maximum number of stdout bytes kept
+
+    Returns:
+        The result; this function never raises for a failing command
+    """
+    result = CommandResult(key, list(cmd))
+    start = time.perf_counter()
+    try:
+        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except (OSError, ValueError) as e:
+        result.error = str(e)
+        return result
+
+    killed = threading.Event()
+
+    def _kill() -> None:
+        killed.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, _kill)
+    timer.daemon = True
+    timer.start()
+
+    stderr: list[bytes] = []
+    stderr_reader = threading.Thread(target=_drain, args=(proc.stderr, _STDERR_TAIL, stderr), daemon=True)
+    stderr_reader.start()
+
+    stdout = bytearray()
+    assert proc.stdout is not None
+    try:
+        while True:
+            block = proc.stdout.read1(_READ_SIZE)  # type: ignore[attr-defined]
+            if not block:
+                break
+            stdout += block
+            if len(stdout) > max_output:
+                result.truncated = True
+                del stdout[max_output:]
+                proc.kill()
+                break
+        result.returncode = proc.wait()
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+        stderr_reader.join()
+        proc.stderr.close()  # type: ignore[union-attr]
+
+    result.elapsed = time.perf_counter() - start
+    result.timed_out = killed.is_set() and not result.truncated
+    if result.truncated:
+        # Stopped on purpose – whatever the process said after that is moot.
+        result.returncode = 0
+    result.stdout = stdout.decode("utf-8", errors="replace")
+    if result.truncated:
+        result.stdout += f"\n[... output truncated at {max_output} bytes]\n"
+    result.stderr = b"".join(stderr)[-_STDERR_TAIL:].decode("utf-8", errors="replace")
+    return result
+
+
+def _run_cached(
+    key: str,
+    cmd: list[str],
+    cache: CommandCache,
+    inputs: Sequence[str],
+    *,
+    timeout: float,
+    max_output: int,
+) -> CommandResult:
+    from .command_cache import fingerprint
+
+    # Taken before the command runs: a concurrent change costs a miss, never a stale hit.
+    state = fingerprint(cmd, inputs)
+    if state is not None:
+        stdout = cache.get_output(cmd, state)
+        if stdout is not None:
+            return CommandResult(key, list(cmd), stdout=stdout, returncode=0, cached=True)
+
+    result = run_command_capped(key, cmd, timeout=timeout, max_output=max_output)
+    if state is not None and result.ok:
+        cache.put_output(cmd, state, result.stdout)
+    return result
+
+
+def run_commands(
+    commands: Mapping[str, list[str]],
+    *,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_output: int = DEFAULT_MAX_OUTPUT,
+    cache: Optional[CommandCache] = None,
+    inputs: Optional[Mapping[str, Sequence[str]]] = None,
+) -> dict[str, CommandResult]:
+    """
+    Run all *commands* concurrently.
+
+    Args:
+        commands: Placeholder name → command line
+        timeout: Per-command timeout in seconds
+        max_output: Per-command stdout cap in bytes
+        cache: Serve and store outputs with an unchanged state fingerprint
+        inputs: Placeholder name → files the command reads, part of its fingerprint
+
+    Returns:
+        Results keyed like *commands*, in the same order
+    """
+
+    def _run(key: str, cmd: list[str]) -> CommandResult:
+        if cache is None:
+            return run_command_capped(key, cmd, timeout=timeout, max_output=max_output)
+        declared = (inputs or {}).get(key, ())
+        return _run_cached(key, cmd, cache, declared, timeout=timeout, max_output=max_output)
+
+    if len(commands) == 1:
+        ((key, cmd),) = commands.items()
+        return {key: _run(key, cmd)}
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(commands))) as pool:
+        futures = {key: pool.submit(_run, key, cmd) for key, cmd in commands.items()}
+        return {key: future.result() for key, future in futures.items()}
@@ -3,84 +3,69 @@ from __future__ import annotations
 import json
 import os
 import uuid
-from collections.abc import Iterator
+from collections.abc import Generator, Iterator, Sequence
 from datetime import datetime, timezone
 UTC = timezone.utc
 from pathlib import Path
-from typing import TypedDict, Optional
-import urllib.parse
+from typing import TYPE_CHECKING, TypedDict, Optional
 import sys
-
-import requests
-from pydantic import BaseModel, Field, ValidationError
-from requests.exceptions import RequestException
+import threading
+import time
 
 from .exception.api_error import APIError
 from .exception.authentication_error import AuthenticationError
+from .exception.circuit_open_error import CircuitOpenError
+from .exception.copilot_client_error import CopilotClientError
+from .exception.prompt_too_large_error import PromptTooLargeError
+from .breaker import CircuitBreaker
+from .cache import ResponseCache
+from .cancel import Cancellation
+from .endpoint import ChatEndpoint, api_chat_url, resolve
+from .hedge import Hedger
+from .pool import ConnectionPool, _env_number, get_default_pool
+from .retry import RetryPolicy, status_of
+from .sse import iter_deltas
+from .token_store import TokenRecord, TokenStore
 
+if TYPE_CHECKING:
+    from requests import Response
 
-class HostsData(BaseModel):
-    github_oauth_token: str
+    from .model import CopilotToken
 
-    @classmethod
-    def from_file(cls, file_path: Path) -> "HostsData":
-        """Extract the OAuth token from a *github-copilot* config file.
 
-        The VS Code / Neovim Copilot extensions keep their authentication
-        state in two JSON files: *hosts.json* and *apps.json*.  The exact
-        structure is **not** documented and differs slightly depending on
-        whether the user is on the public *github.com* instance or on an
-        Enterprise installation (e.g. *github.my-corp.com*).
+def __getattr__(name: str) -> object:
+    # The token models moved to *copilot_cli.model*; keep them importable from
+    # here without loading *pydantic* together with the client.
+    if name in ("CopilotToken", "HostsData"):
+        from . import model
 
-        The previous implementation hard-coded a lookup for keys that
-        contained the substring ``"github.com"``, which prevented users of
-        Copilot Enterprise from authenticating (their host key usually is the
-        enterprise domain without ``github.com``).  The current logic gathers
-        all available tokens and:
+        return getattr(model, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-        1. Returns the GitHub.com (personal) token if present.
-        2. Otherwise returns the first token (Enterprise or otherwise).
 
-        This supports both personal and Enterprise Copilot accounts when both
-        configurations are present.
-        """
+class APIEndpoints:
+    TOKEN = "https://api.github.com/copilot_internal/v2/token"
+    CHAT = "https://api.githubcopilot.com/chat/completions"
 
-        hosts_file = Path(file_path)
-        try:
-            hosts_data = json.loads(hosts_file.read_text())
-        except (FileNotFoundError, json.JSONDecodeError):  # pragma: no cover
-            raise AuthenticationError("GitHub Copilot configuration not found or invalid.")
-
-        tokens: dict[str, str] = {}
-        for host, value in hosts_data.items():
-            # *apps.json* stores each application in a list, *hosts.json* uses
-            # a mapping – support both layouts.
-            if isinstance(value, list):
-                for element in value:
-                    if isinstance(element, dict) and (token := element.get("oauth_token")):
-                        tokens[host] = token
-                        break
-            elif isinstance(value, dict):
-                if (token := value.get("oauth_token")):
-                    tokens[host] = token
-
-        if not tokens:
-            raise AuthenticationError("OAuth token not found in GitHub Copilot configuration.")
-
-        for host, token in tokens.items():
-            try:
-                hostname = urllib.parse.urlparse(host).netloc or urllib.parse.urlparse(host).path
-            except Exception:
-                hostname = host
-            if hostname == "github.com":
-                return cls(github_oauth_token=token)
 
-        return cls(github_oauth_token=next(iter(tokens.values())))
+def default_timeout() -> tuple[float, float]:
+    """Connect and read timeouts, from ``COPILOT_CLI_CONNECT_TIMEOUT`` / ``COPILOT_CLI_READ_TIMEOUT``.
 
+    A short connect timeout fails a stalled handshake quickly, so it can be
+    retried; the read timeout bounds the wait between two received bytes.
+    """
+    return (
+        _env_number("COPILOT_CLI_CONNECT_TIMEOUT", 3.05),
+        _env_number("COPILOT_CLI_READ_TIMEOUT", 10.0),
+    )
 
-class APIEndpoints:
-    TOKEN = "https://api.github.com/copilot_internal/v2/token"
-    CHAT = "https://api.githubcopilot.com/chat/completions"
+
+def _prime(stream: Generator[str, None, None]) -> tuple[Optional[str], Generator[str, None, None]]:
+    """Read the first chunk of *stream*, returning it with the rest of the stream."""
+    try:
+        return next(stream), stream
+    except StopIteration:
+        return None, stream
 
 
 class Headers:
@@ -91,37 +76,6 @@ class Headers:
     }
 
 
-class CopilotToken(BaseModel):
-    """
-    Represents a GitHub Copilot authentication token and its associated metadata.
-    """
-
-    token: str
-    expires_at: int
-    refresh_in: int
-    endpoints: dict[str, str]
-    tracking_id: str
-    sku: str
-
-    annotations_enabled: bool
-    chat_enabled: bool
-    chat_jetbrains_enabled: bool
-    code_quote_enabled: bool
-    codesearch: bool
-    copilotignore_enabled: bool
-    individual: bool
-    prompt_8k: bool
-    snippy_load_test_enabled: bool
-    xcode: bool
-    xcode_chat: bool
-
-    public_suggestions: str
-    telemetry: str
-    enterprise_list: list[int] = Field(default_factory=list)
-
-    code_review_enabled: bool
-
-
 class ChatMessage(TypedDict):
     role: str
     content: str
@@ -164,30 +118,147 @@ class StreamChunk(TypedDict):
     choices: list[StreamChoice]
 
 
+def _request_exception() -> type[Exception]:
+    # *requests* is only imported once a request is actually made (see
+    # *ConnectionPool*); by the time an error is matched it is loaded.
+    from requests.exceptions import RequestException
+
+    return RequestException
+
+
+def _connection_error() -> type[Exception]:
+    from requests.exceptions import ConnectionError as RequestsConnectionError
+
+    return RequestsConnectionError
+
+
+def request_errors() -> tuple[type[Exception], ...]:
+    """Errors a request may end with.
+
+    They surface as *CopilotClientError* – or as the offline echo when the
+    client runs with ``offline_fallback=True``.
+    """
+    from pydantic import ValidationError
+
+    return (_request_exception(), APIError, AuthenticationError, ValidationError)
+
+
+def to_client_error(error: BaseException) -> CopilotClientError:
+    """Convert a low-level request failure into a *CopilotClientError*."""
+    if isinstance(error, CopilotClientError):
+        return error
+    return APIError(f"Copilot request failed: {error}", status_code=status_of(error))
+
+
 class GithubCopilotClient:
     """
     Client for interacting with GitHub Copilot's API.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        pool: Optional[ConnectionPool] = None,
+        cache: Optional[ResponseCache] = None,
+        token_store: Optional[TokenStore] = None,
+        retry: Optional[RetryPolicy] = None,
+        offline_fallback: bool = False,
+        coalesce: bool = True,
+        hedge: Optional[Hedger] = None,
+        timeout: Optional[tuple[float, float]] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        """
+        Args:
+            pool: Connection pool used for token refreshes and chat requests;
+                defaults to the process-wide keep-alive pool
+            cache: Optional response cache consulted before any request
+            token_store: Where the Copilot token is shared between processes;
+                defaults to the per-user token file
+            retry: Backoff policy for transient failures
+            offline_fallback: Answer with a local echo instead of raising
+                when the service cannot be reached (explicit opt-in)
+            coalesce: Merge stream deltas that arrive in the same network
+                read into one chunk
+            hedge: Sends a second copy of chat requests whose first byte is
+                late (see :mod:`copilot_cli.hedge`); no hedging when omitted
+            timeout: ``(connect, read)`` timeouts of every request in seconds;
+                defaults to :func:`default_timeout`
+            breaker: Fails requests to models that keep failing fast and
+                re-routes them along their fallback chain (see
+                :mod:`copilot_cli.breaker`); no circuit breaking when omitted
+        """
+        self._pool: ConnectionPool = pool if pool is not None else get_default_pool()
+        self.cache: Optional[ResponseCache] = cache
+        self.retry: RetryPolicy = retry if retry is not None else RetryPolicy()
+        self.offline_fallback = offline_fallback
+        self.coalesce = coalesce
+        self.hedge = hedge
+        self.timeout: tuple[float, float] = timeout if timeout is not None else default_timeout()
+        self.breaker = breaker
+        # The model that produced the latest answer – differs from the
+        # requested one after a fallback.
+        self.last_model: Optional[str] = None
+        self._token_store: TokenStore = token_store if token_store is not None else TokenStore()
         self._oauth_token: Optional[str] = None
         self._copilot_token: Optional[CopilotToken] = None
+        self._token_fetched_at: float = 0.0
         self._machine_id: str = str(uuid.uuid4())
-        self._session_id: str = ""
+        self._session_id: str = f"{uuid.uuid4()}{int(datetime.now(UTC).timestamp() * 1000)}"
 
-        self._load_cached_token()
+        # Serialises refreshes between threads; *TokenStore* does the same
+        # between processes.
+        self._refresh_lock = threading.Lock()
+        self._background_refresh: Optional[threading.Thread] = None
+        self._token_loaded = False
+        self._load_lock = threading.Lock()
+
+        # Background TLS pre-connect to the chat host (see *warmup*).
+        self._preconnect_lock = threading.Lock()
+        self._preconnect: Optional[threading.Thread] = None
+        self.connect_seconds: Optional[float] = None
+
+        # Chat endpoint of the current token, resolved once (see *chat_endpoint*).
+        self._endpoint: Optional[ChatEndpoint] = None
+        self._endpoint_lock = threading.Lock()
+        self._stored_endpoint: Optional[dict[str, object]] = None
 
     def _load_cached_token(self) -> None:
         """
-        Attempts to load a cached Copilot token.
+        Attempts to load the Copilot token shared through the token store.
+
+        Runs on first use rather than in ``__init__``: a client that answers
+        from the response cache never needs the token (nor *pydantic*).
         """
-        cache_path = Path("/tmp/copilot_token.json")
-        if cache_path.exists():
+        if self._token_loaded:
+            return
+        # A warm-up thread may be loading it right now.
+        with self._load_lock:
+            if self._token_loaded:
+                return
             try:
-                token_data = json.loads(cache_path.read_text())
-                self._copilot_token = CopilotToken(**token_data)
-            except (json.JSONDecodeError, TypeError, ValidationError):
-                cache_path.unlink(missing_ok=True)
+                if self._copilot_token is None:
+                    self._load_token_record()
+            finally:
+                self._token_loaded = True
+
+    def _load_token_record(self) -> None:
+        from pydantic import ValidationError
+
+        record = self._token_store.load()
+        if record is not None:
+            try:
+                self._apply_token_record(record)
+            except (TypeError, ValidationError):
+                self._token_store.path.unlink(missing_ok=True)
+
+    def _apply_token_record(self, record: TokenRecord) -> None:
+        """Makes the token of a store record the current one."""
+        from .model import CopilotToken
+
+        self._copilot_token = CopilotToken(**record["data"])
+        self._token_fetched_at = float(record.get("fetched_at", 0))
+        stored = record.get("endpoint")
+        self._stored_endpoint = stored if isinstance(stored, dict) else None
 
     def _load_oauth_token(self) -> str:
         """Loads the OAuth token from the GitHub Copilot configuration."""
@@ -215,6 +286,8 @@ class GithubCopilotClient:
         for file in files:
             if file.exists():
                 try:
+                    from .model import HostsData
+
                     host_data = HostsData.from_file(file)
                     if host_data and host_data.github_oauth_token:
                         return host_data.github_oauth_token
@@ -253,48 +326,504 @@ class GithubCopilotClient:
         self._oauth_token = self._load_oauth_token()
         return self._oauth_token
 
-    def _refresh_copilot_token(self) -> None:
-        """Refreshes the Copilot token using the OAuth token."""
-        self._session_id = f"{uuid.uuid4()}{int(datetime.now(UTC).timestamp() * 1000)}"
-
+    def _fetch_copilot_token(self) -> dict[str, object]:
+        """Fetches new token data from the token endpoint using the OAuth token."""
         headers = {
             "Authorization": f"token {self._get_oauth_token()}",
             "Accept": "application/json",
             **Headers.AUTH,
         }
 
-        try:
+        def _get() -> Response:
             token_url = os.getenv("GITHUB_COPILOT_TOKEN_URL", APIEndpoints.TOKEN)
-            response = requests.get(token_url, headers=headers, timeout=10)
+            response = self._pool.get(token_url, headers=headers, timeout=self.timeout)
             response.raise_for_status()
-            token_data = response.json()
+            return response
+
+        try:
+            token_data = self.retry.call(_get).json()
+        except (_request_exception(), ValueError) as e:
+            raise APIError(f"Failed to refresh Copilot token: {str(e)}", status_code=status_of(e)) from e
+
+        from pydantic import ValidationError
+
+        from .model import CopilotToken
+
+        try:
+            _ = CopilotToken(**token_data)
+        except ValidationError as e:
+            raise APIError(f"Invalid Copilot token data received: {e}") from e
+
+        return token_data
+
+    @staticmethod
+    def _refresh_deadline(fetched_at: float, expires_at: float, refresh_in: Optional[float]) -> float:
+        """Returns when a token should be replaced; ``refresh_in`` is optional."""
+        if refresh_in and refresh_in > 0:
+            return min(fetched_at + refresh_in, expires_at)
+        return expires_at
+
+    @classmethod
+    def _record_is_usable(cls, record: TokenRecord, rejected: Optional[str] = None) -> bool:
+        """Whether a stored record is neither expired, due for refresh nor rejected."""
+        data = record.get("data", {})
+        try:
+            expires_at = float(data["expires_at"])
+            refresh_at = cls._refresh_deadline(
+                float(record.get("fetched_at", 0)), expires_at, float(data.get("refresh_in") or 0)
+            )
+        except (KeyError, TypeError, ValueError):
+            return False
+        return datetime.now(UTC).timestamp() < refresh_at and data.get("token") != rejected
+
+    def _refresh_copilot_token(self, rejected: Optional[str] = None) -> None:
+        """Refreshes the Copilot token using the OAuth token.
+
+        Only one thread and one process fetch at a time; everybody else
+        picks up the token they stored.
+
+        Args:
+            rejected: A token the API just answered 401 for – it is never
+                reused, even if it looks unexpired
+        """
+        with self._refresh_lock:
+            if self._copilot_token is not None and self._record_is_usable(
+                {"fetched_at": self._token_fetched_at, "data": self._copilot_token.model_dump()},
+                rejected,
+            ):
+                return  # another thread refreshed while we were waiting
+
+            try:
+                record = self._token_store.refresh(
+                    self._fetch_copilot_token,
+                    lambda stored: self._record_is_usable(stored, rejected),
+                )
+            except OSError:
+                # Unwritable cache directory – still hand out a fresh token.
+                record = {"fetched_at": datetime.now(UTC).timestamp(), "data": self._fetch_copilot_token()}
+
+            from pydantic import ValidationError
 
             try:
-                self._copilot_token = CopilotToken(**token_data)
+                self._apply_token_record(record)
             except ValidationError as e:
                 raise APIError(f"Invalid Copilot token data received: {e}") from e
 
-            # Cache the token
-            cache_path = Path("/tmp/copilot_token.json")
-            _ = cache_path.write_text(json.dumps(token_data))
+    def _token_is_valid(self) -> bool:
+        """
+        Returns whether the current Copilot token exists and has not expired.
+        """
+        self._load_cached_token()
+        current_time = int(datetime.now(UTC).timestamp())
+        return self._copilot_token is not None and current_time < self._copilot_token.expires_at
+
+    def _token_refresh_due(self) -> bool:
+        """
+        Returns whether the token service asked for a refresh (``refresh_in``).
+        """
+        if self._copilot_token is None:
+            return True
+        refresh_at = self._refresh_deadline(
+            self._token_fetched_at,
+            self._copilot_token.expires_at,
+            getattr(self._copilot_token, "refresh_in", None),
+        )
+        return datetime.now(UTC).timestamp() >= refresh_at
+
+    def _schedule_proactive_refresh(self) -> None:
+        """
+        Refreshes a still-valid token in the background once ``refresh_in``
+        has elapsed, so requests never wait for the token round trip.
+        """
+        if not self._token_refresh_due():
+            return
+        if self._background_refresh is not None and self._background_refresh.is_alive():
+            return
+
+        def _refresh() -> None:
+            try:
+                self._refresh_copilot_token()
+            except (APIError, AuthenticationError, OSError):
+                pass  # the current token stays in use until it expires
 
-        except RequestException as e:
-            raise APIError(f"Failed to refresh Copilot token: {str(e)}") from e
+        self._background_refresh = threading.Thread(target=_refresh, name="copilot-token-refresh", daemon=True)
+        self._background_refresh.start()
 
     def _ensure_valid_token(self) -> None:
         """
         Ensures a valid Copilot token is available.
-        """
 
-        current_time = int(datetime.now(UTC).timestamp())
+        Only a missing or expired token blocks the caller; a token that is
+        merely due for refresh is used optimistically while a background
+        refresh runs.  While the caller waits for a token, the connection to
+        the chat host – when already known – is opened in the background.
+        """
 
-        if not self._copilot_token or current_time >= self._copilot_token.expires_at:
+        if not self._token_is_valid():
+            # The chat handshake overlaps the token round trip.
+            self._start_preconnect()
             self._refresh_copilot_token()
+        else:
+            self._schedule_proactive_refresh()
 
         if not self._copilot_token:
             raise AuthenticationError("Failed to obtain Copilot token")
 
-    def chat_completion(self, prompt: str, model: str, system_prompt: str) -> str:
+    # ------------------------------------------------------------------
+    # Warm-up – overlap the token round trip and the chat handshake
+    # ------------------------------------------------------------------
+
+    def _start_preconnect(self) -> Optional[threading.Thread]:
+        """
+        Open the chat connection in the background, at most once per client.
+
+        Nothing is opened while the chat host is unknown: before any token
+        has been loaded, as the token may announce another host than the
+        default one.  Pools without ``preconnect`` support are used as they are.
+        """
+        preconnect = getattr(self._pool, "preconnect", None)
+        if preconnect is None:
+            return None
+        if not os.getenv("GITHUB_COPILOT_CHAT_URL"):
+            self._load_cached_token()
+            if self._copilot_token is None:
+                return None
+
+        def _connect() -> None:
+            start = time.perf_counter()
+            if preconnect(self._chat_url()):
+                self.connect_seconds = time.perf_counter() - start
+
+        with self._preconnect_lock:
+            if self._preconnect is None:
+                self._preconnect = threading.Thread(target=_connect, name="copilot-preconnect", daemon=True)
+                self._preconnect.start()
+            return self._preconnect
+
+    def warmup(self) -> None:
+        """
+        Obtain a valid token and open the chat connection – concurrently,
+        unless no token is known yet to announce the chat host.
+
+        Raises:
+            APIError: If the token cannot be refreshed
+            AuthenticationError: If no OAuth token is configured
+        """
+        connect = self._start_preconnect()
+        try:
+            self._ensure_valid_token()
+            if connect is None:
+                # Cold start: the chat host is known only now.
+                connect = self._start_preconnect()
+        finally:
+            if connect is not None:
+                connect.join()
+
+    def start_warmup(self) -> threading.Thread:
+        """
+        Run :meth:`warmup` on a background thread.
+
+        Meant to overlap with building the prompt (running action commands);
+        failures are left for the request itself to report.
+        """
+
+        def _warmup() -> None:
+            try:
+                self.warmup()
+            except (CopilotClientError, OSError):
+                pass
+
+        thread = threading.Thread(target=_warmup, name="copilot-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    # ------------------------------------------------------------------
+    # Request building – shared with *AsyncGithubCopilotClient*
+    # ------------------------------------------------------------------
+
+    def chat_endpoint(self) -> ChatEndpoint:
+        """
+        Where chat requests go.
+
+        ``GITHUB_COPILOT_CHAT_URL`` wins; otherwise the API host the token
+        announces in ``endpoints["api"]``, falling back to the public host.
+        The host is resolved once per token: its addresses are kept in the
+        token record and pinned in the pool, so later invocations skip DNS.
+        """
+        override = os.getenv("GITHUB_COPILOT_CHAT_URL")
+        if override:
+            return ChatEndpoint(override, "environment")
+        self._load_cached_token()
+        token = self._copilot_token
+        if token is None:
+            return ChatEndpoint(APIEndpoints.CHAT, "default")
+        endpoint = self._endpoint
+        if endpoint is not None and endpoint.token == token.token:
+            return endpoint
+        with self._endpoint_lock:
+            if self._endpoint is None or self._endpoint.token != token.token:
+                self._endpoint = self._resolve_endpoint(token)
+            return self._endpoint
+
+    def _resolve_endpoint(self, token: CopilotToken) -> ChatEndpoint:
+        url = api_chat_url(getattr(token, "endpoints", None))
+        endpoint = ChatEndpoint(url or APIEndpoints.CHAT, "token" if url else "default", token=token.token)
+
+        stored = self._stored_endpoint or {}
+        addresses: tuple[str, ...] = ()
+        if stored.get("url") == endpoint.url and isinstance(stored.get("addresses"), list):
+            addresses = tuple(str(address) for address in stored["addresses"])  # type: ignore[union-attr]
+        if not addresses:
+            addresses = resolve(endpoint.host, endpoint.port)
+            if addresses:
+                self._store_addresses(endpoint, addresses)
+
+        pin = getattr(self._pool, "pin", None)
+        if pin is not None and addresses:
+            pin(endpoint.host, addresses[0])
+        return ChatEndpoint(endpoint.url, endpoint.source, addresses, token.token)
+
+    def _store_addresses(self, endpoint: ChatEndpoint, addresses: tuple[str, ...]) -> None:
+        """Keeps the resolved *addresses* in the token record for other processes."""
+        stored = {"url": endpoint.url, "addresses": list(addresses)}
+        self._stored_endpoint = stored
+        if endpoint.token is None:
+            return
+        try:
+            self._token_store.annotate(endpoint.token, "endpoint", stored)
+        except OSError:
+            pass
+
+    def _forget_addresses(self) -> None:
+        """
+        Drops pinned addresses after a failed connect – the host may have
+        moved – so that the retry resolves it afresh.
+        """
+        with self._endpoint_lock:
+            endpoint = self._endpoint
+            if endpoint is None or not endpoint.addresses:
+                return
+            self._endpoint = ChatEndpoint(endpoint.url, endpoint.source, (), endpoint.token)
+        pin = getattr(self._pool, "pin", None)
+        if pin is not None:
+            pin(endpoint.host, None)
+        self._store_addresses(endpoint, ())
+
+    def _chat_url(self) -> str:
+        """Returns the chat completions URL (see :meth:`chat_endpoint`)."""
+        return self.chat_endpoint().url
+
+    def _build_headers(self) -> dict[str, str]:
+        """Builds the headers of a chat request; requires a valid token."""
+        if not self._copilot_token:
+            raise AuthenticationError("Failed to obtain Copilot token")
+
+        org = os.getenv("GITHUB_COPILOT_ORGANIZATION", "github-copilot")
+        return {
+            "Content-Type": "application/json",
+            "x-request-id": str(uuid.uuid4()),
+            "vscode-machineid": self._machine_id,
+            "vscode-sessionid": self._session_id,
+            "Authorization": f"Bearer {self._copilot_token.token}",
+            "Copilot-Integration-Id": "vscode-chat",
+            "openai-organization": org,
+            "openai-intent": "conversation-panel",
+            **Headers.AUTH,
+        }
+
+    @staticmethod
+    def _build_body(prompt: str, model: str, system_prompt: str, *, stream: bool) -> dict[str, object]:
+        """Builds the JSON body of a chat request."""
+        return {
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            "model": model,
+            "stream": stream,
+        }
+
+    def _post_chat(self, body: dict[str, object], *, stream: bool) -> Response:
+        """Posts a chat request, refreshing the token once if it is rejected.
+
+        Requests are sent optimistically with the cached token; only a 401
+        answer puts a token round trip on the critical path.
+        """
+        rejected: Optional[str] = None
+        while True:
+            token = self._copilot_token.token if self._copilot_token else None
+            try:
+                response = self._pool.post(
+                    self._chat_url(),
+                    headers=self._build_headers(),
+                    json=body,
+                    stream=stream,
+                    timeout=self.timeout,
+                )
+            except _connection_error():
+                self._forget_addresses()
+                raise
+            if response.status_code == 401 and rejected is None:
+                response.close()
+                rejected = token
+                self._refresh_copilot_token(rejected=rejected)
+                continue
+
+            try:
+                response.raise_for_status()
+            except _request_exception():
+                response.close()
+                raise
+            return response
+
+    def _request_completion(self, prompt: str, model: str, system_prompt: str) -> str:
+        """Performs a non-streaming chat request, retrying transient errors."""
+        body = self._build_body(prompt, model, system_prompt, stream=False)
+
+        def _attempt() -> str:
+            if self.hedge is not None:
+                return self.hedge.run(model, lambda cancel: self._complete_once(body, cancel))
+            return self._complete_once(body)
+
+        return self.retry.call(_attempt)
+
+    def _complete_once(self, body: dict[str, object], cancel: Optional[Cancellation] = None) -> str:
+        """Sends one non-streaming request; *cancel* aborts it once the headers arrived."""
+        if cancel is None:
+            chat_response: ChatResponse = self._post_chat(body, stream=False).json()
+        else:
+            with self._post_chat(body, stream=True) as response:
+                cancel.attach(response)
+                try:
+                    chat_response = response.json()
+                finally:
+                    cancel.detach(response)
+        return chat_response["choices"][0]["message"]["content"]
+
+    def _stream_once(
+        self, body: dict[str, object], cancel: Optional[Cancellation] = None
+    ) -> Generator[str, None, None]:
+        """Sends one streaming request and yields its deltas."""
+        with self._post_chat(body, stream=True) as response:
+            if cancel is not None:
+                cancel.attach(response)
+            try:
+                yield from iter_deltas(response.iter_content(chunk_size=None), coalesce=self.coalesce)
+            finally:
+                if cancel is not None:
+                    cancel.detach(response)
+
+    def _open_stream(
+        self, body: dict[str, object], model: str, cancel: Optional[Cancellation]
+    ) -> tuple[Optional[str], Generator[str, None, None]]:
+        """Starts a stream up to its first chunk, hedging it when enabled."""
+        if self.hedge is None:
+            return _prime(self._stream_once(body, cancel))
+        return self.hedge.run(
+            f"{model}/stream",
+            lambda attempt: _prime(self._stream_once(body, attempt)),
+            cancel=cancel,
+            discard=lambda opened: opened[1].close(),
+        )
+
+    def _request_stream(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: str,
+        cancel: Optional[Cancellation] = None,
+    ) -> Generator[str, None, None]:
+        """Performs a streaming chat request, retrying transient errors.
+
+        A failed stream is only re-sent while nothing has been yielded yet –
+        once tokens reached the caller, a retry would duplicate output, so the
+        error is raised instead.  A cancelled stream simply ends.
+        """
+        body = self._build_body(prompt, model, system_prompt, stream=True)
+        start = time.monotonic()
+        attempt = 0
+
+        while cancel is None or not cancel.is_set():
+            emitted = False
+            try:
+                first, stream = self._open_stream(body, model, cancel)
+                try:
+                    if first is not None:
+                        emitted = True
+                        yield first
+                        yield from stream
+                finally:
+                    stream.close()
+                return
+            except _request_exception() as e:
+                if cancel is not None and cancel.is_set():
+                    return
+                attempt += 1
+                delay = None if emitted else self.retry.next_delay(attempt, e, time.monotonic() - start)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    @staticmethod
+    def _check_prompt_size(prompt: str, model: str, system_prompt: str) -> None:
+        """Refuse a request the model would reject, before uploading it."""
+        from .limits import measure_prompt
+
+        size = measure_prompt(model, system_prompt, prompt)
+        if not size.too_large:
+            return
+        if not size.registered:
+            # The limits are a guess; let the service decide.
+            import warnings
+
+            warnings.warn(
+                f"~{size.total} prompt tokens may exceed the limit of {model}, which is not in the model registry",
+                stacklevel=2,
+            )
+            return
+        raise PromptTooLargeError(
+            f"Prompt too large for {model}: ~{size.total} tokens, "
+            f"the limit is {size.limits.max_prompt_tokens}",
+            size.total,
+            size.limits.max_prompt_tokens,
+        )
+
+    @staticmethod
+    def _offline_response(prompt: str) -> str:
+        """Deterministic answer used when the Copilot service is unreachable."""
+        return (
+            "[offline mock] Copilot service unavailable. "
+            "Echoing prompt back to you:\n\n" + prompt
+        )
+
+    @staticmethod
+    def _offline_stream_response(prompt: str) -> str:
+        """Streaming counterpart of :meth:`_offline_response`."""
+        return "[offline mock stream] " + prompt
+
+    def _is_outage(self, endpoint: str, model: str, error: BaseException) -> bool:
+        """
+        Whether *error* means the model is unavailable rather than the request
+        being wrong; outages count towards the circuit breaker and move a
+        request on to the next model of its fallback chain.
+        """
+        from .retry import is_retryable
+
+        if not is_retryable(error):
+            return False
+        if self.breaker is not None:
+            self.breaker.record_failure(endpoint, model)
+        return True
+
+    def chat_completion(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: str,
+        *,
+        cache_ttl: Optional[float] = None,
+        fallbacks: Sequence[str] = (),
+    ) -> str:
         """
         Sends a chat completion request to the Copilot API.
 
@@ -302,118 +831,164 @@ class GithubCopilotClient:
             prompt: The user's input prompt
             model: The model to use for completion
             system_prompt: The system prompt to guide the model's behavior
+            cache_ttl: Seconds a fresh response stays cached (``0`` disables
+                caching, ``None`` uses the cache default)
+            fallbacks: Models tried in order when *model* is unavailable –
+                its circuit is open or the request failed with an outage
 
         Returns:
             The model's response as a string
 
         Raises:
-            APIError: If the API request fails
+            APIError: If the API request fails after all retries
+            AuthenticationError: If no usable token can be obtained
+            CircuitOpenError: If the circuits of all models are open
+            PromptTooLargeError: If the prompt exceeds the limit of the last
+                model tried
         """
-        # In sandboxed / offline environments external HTTP requests will
-        # inevitably fail.  Instead of propagating the exception we fall back
-        # to an offline stub response so that the CLI keeps working for local
-        # tests and demonstrations.
 
-        try:
-            self._ensure_valid_token()
-
-            org = os.getenv("GITHUB_COPILOT_ORGANIZATION", "github-copilot")
-            headers = {
-                "Content-Type": "application/json",
-                "x-request-id": str(uuid.uuid4()),
-                "vscode-machineid": self._machine_id,
-                "vscode-sessionid": self._session_id,
-                "Authorization": f"Bearer {self._copilot_token.token}",
-                "Copilot-Integration-Id": "vscode-chat",
-                "openai-organization": org,
-                "openai-intent": "conversation-panel",
-                **Headers.AUTH,
-            }
-
-            body = {
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-                "model": model,
-                "stream": False,
-            }
-
-            chat_url = os.getenv("GITHUB_COPILOT_CHAT_URL", APIEndpoints.CHAT)
-            response = requests.post(chat_url, headers=headers, json=body, timeout=10)
-            response.raise_for_status()
+        failure: Optional[BaseException] = None
+        self.last_model = None
+        for candidate in (model, *fallbacks):
+            if self.cache is not None:
+                cached = self.cache.get(candidate, system_prompt, prompt)
+                if cached is not None:
+                    self.last_model = candidate
+                    return cached
 
-            chat_response: ChatResponse = response.json()
-            return chat_response["choices"][0]["message"]["content"]
-
-        except (RequestException, APIError, AuthenticationError, ValidationError):
-            # Produce a deterministic offline response to keep the CLI usable
-            # without network access.
-            offline_msg = (
-                "[offline mock] Copilot service unavailable. "
-                "Echoing prompt back to you:\n\n" + prompt
-            )
-            return offline_msg
+            try:
+                self._check_prompt_size(prompt, candidate, system_prompt)
+            except PromptTooLargeError as e:
+                # A fallback with a smaller window is skipped, not fatal.
+                failure = e
+                continue
+            try:
+                # After the cache: a cache hit never loads the token.
+                self._ensure_valid_token()
+            except request_errors() as e:
+                failure = e
+                break
+
+            # The token announces the endpoint, so it is resolved only now.
+            endpoint = self._chat_url()
+            try:
+                if self.breaker is not None:
+                    self.breaker.check(endpoint, candidate)
+            except CircuitOpenError as e:
+                failure = failure or e
+                continue
 
-    def stream_chat_completion(self, prompt: str, model: str, system_prompt: str) -> Iterator[str]:
+            try:
+                response = self._request_completion(prompt, candidate, system_prompt)
+            except request_errors() as e:
+                failure = e
+                if self._is_outage(endpoint, candidate, e):
+                    continue
+                break
+
+            if self.breaker is not None:
+                self.breaker.record_success(endpoint, candidate)
+            self.last_model = candidate
+            if self.cache is not None:
+                self.cache.put(candidate, system_prompt, prompt, [response], ttl=cache_ttl)
+            return response
+
+        # In sandboxed / offline environments the caller may opt into a
+        # deterministic echo instead of an error – not for a prompt that is
+        # too large anyway.
+        if self.offline_fallback and not isinstance(failure, PromptTooLargeError):
+            return self._offline_response(prompt)
+        raise to_client_error(failure) from failure
+
+    def stream_chat_completion(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: str,
+        *,
+        cache_ttl: Optional[float] = None,
+        cancel: Optional[Cancellation] = None,
+        fallbacks: Sequence[str] = (),
+    ) -> Iterator[str]:
         """
         Streams a chat completion response from the Copilot API.
 
+        A cached response is replayed chunk by chunk, exactly as it was
+        originally received.  Only streams that ran to completion are cached.
+
         Args:
             prompt: The user's input prompt
             model: The model to use for completion
             system_prompt: The system prompt to guide the model's behavior
+            cache_ttl: Seconds a fresh response stays cached (``0`` disables
+                caching, ``None`` uses the cache default)
+            cancel: Ends the stream early, closing its connection, when
+                cancelled from another thread
+            fallbacks: Models tried in order when *model* is unavailable;
+                a stream that already produced output is never re-routed
 
         Yields:
             Chunks of the model's response as strings
 
         Raises:
-            APIError: If the API request fails
+            APIError: If the API request fails after all retries
+            AuthenticationError: If no usable token can be obtained
+            CircuitOpenError: If the circuits of all models are open
+            PromptTooLargeError: If the prompt exceeds the limit of the last
+                model tried
         """
-        # Identical offline behaviour: provide graceful degradation when
-        # network access is unavailable.
 
-        try:
-            self._ensure_valid_token()
-
-            org = os.getenv("GITHUB_COPILOT_ORGANIZATION", "github-copilot")
-            headers = {
-                "Content-Type": "application/json",
-                "x-request-id": str(uuid.uuid4()),
-                "vscode-machineid": self._machine_id,
-                "vscode-sessionid": self._session_id,
-                "Authorization": f"Bearer {self._copilot_token.token}",
-                "Copilot-Integration-Id": "vscode-chat",
-                "openai-organization": org,
-                "openai-intent": "conversation-panel",
-                **Headers.AUTH,
-            }
-
-            body = {
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-                "model": model,
-                "stream": True,
-            }
-
-            chat_url = os.getenv("GITHUB_COPILOT_CHAT_URL", APIEndpoints.CHAT)
-            with requests.post(chat_url, headers=headers, json=body, stream=True, timeout=10) as response:
-                response.raise_for_status()
+        failure: Optional[BaseException] = None
+        self.last_model = None
+        received: list[str] = []
+        for candidate in (model, *fallbacks):
+            if self.cache is not None:
+                cached_chunks = self.cache.get_chunks(candidate, system_prompt, prompt)
+                if cached_chunks is not None:
+                    self.last_model = candidate
+                    yield from cached_chunks
+                    return
 
-                for line in response.iter_lines():
-                    if line and line.startswith(b"data: "):
-                        json_str = line[6:].decode("utf-8")
-                        if json_str == "[DONE]":
-                            break
+            try:
+                self._check_prompt_size(prompt, candidate, system_prompt)
+            except PromptTooLargeError as e:
+                failure = e
+                continue
+            try:
+                self._ensure_valid_token()
+            except request_errors() as e:
+                failure = e
+                break
 
-                        chunk: StreamChunk = json.loads(json_str)
-                        if chunk["choices"] and "delta" in chunk["choices"][0]:
-                            content = chunk["choices"][0]["delta"].get("content")
-                            if content:
-                                yield content
+            endpoint = self._chat_url()
+            try:
+                if self.breaker is not None:
+                    self.breaker.check(endpoint, candidate)
+            except CircuitOpenError as e:
+                failure = failure or e
+                continue
 
-        except (RequestException, APIError, AuthenticationError, ValidationError):
+            try:
+                for chunk in self._request_stream(prompt, candidate, system_prompt, cancel):
+                    received.append(chunk)
+                    yield chunk
+            except request_errors() as e:
+                failure = e
+                if self._is_outage(endpoint, candidate, e) and not received:
+                    continue
+                break
+
+            if cancel is not None and cancel.is_set():
+                return
+            if self.breaker is not None:
+                self.breaker.record_success(endpoint, candidate)
+            self.last_model = candidate
+            if self.cache is not None:
+                self.cache.put(candidate, system_prompt, prompt, received, ttl=cache_ttl)
+            return
+
+        if self.offline_fallback and not received and not isinstance(failure, PromptTooLargeError):
             # Simple one-shot offline response.
-            yield "[offline mock stream] " + prompt
+            yield self._offline_stream_response(prompt)
+            return
+        raise to_client_error(failure) from failure
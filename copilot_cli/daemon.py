@@ -0,0 +1,600 @@
+"""Optional background daemon that keeps the CLI warm between invocations.
+
+Every ``copilot`` invocation starts Python, imports *requests*, *pydantic*
+and *rich*, reads ``actions.yml`` and the token file and connects to the chat
+host – for an answer that may take less time than all of that.  The daemon
+(``python -m copilot_cli.daemon start``) loads the CLI once and keeps its
+:class:`~copilot_cli.copilot.GithubCopilotClient`, the connection pool and
+the action managers alive, listening on a per-user Unix socket.
+
+The ``copilot`` wrapper calls :func:`forward`, which sends argv, the working
+directory and the environment, relays stdin when the CLI reads it and writes
+stdout and stderr back as they arrive.  When no daemon is running – or it is
+busy with another invocation – :func:`forward` returns ``None`` and the
+wrapper runs the CLI in-process as before.
+
+Invocations are served one at a time: the working directory, environment and
+standard streams are per process, so the daemon switches them for the
+duration of a request – including the threads the request started, which
+are waited for before the state is switched back – and answers concurrent
+requests with "busy".
+
+Both directions use frames of a one-byte kind, a four-byte big-endian length
+and the payload.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import IO, Any, Callable, Collection, Optional
+
+# Frame kinds.
+REQUEST = b"r"  # client -> daemon: JSON request
+STDOUT = b"o"
+STDERR = b"e"
+STDIN = b"i"  # daemon -> client: send stdin; client -> daemon: stdin data, empty at EOF
+EXIT = b"x"  # daemon -> client: exit status
+BUSY = b"b"  # daemon -> client: run the CLI yourself
+
+_FRAME = struct.Struct(">cI")
+
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+_ACCEPT_POLL = 1.0
+# How long a request's background threads may run on after it answered.
+REQUEST_THREAD_GRACE = 10.0
+
+Handler = Callable[[list[str]], Optional[int]]
+
+
+def socket_path() -> Path:
+    """
+    Per-user socket of the daemon.
+
+    ``$COPILOT_CLI_SOCKET`` when set, else ``copilot-cli/daemon.sock`` in
+    ``$XDG_RUNTIME_DIR`` or in a per-user directory under ``$TMPDIR``.
+    """
+    override = os.getenv("COPILOT_CLI_SOCKET")
+    if override:
+        return Path(override)
+    runtime = os.getenv("XDG_RUNTIME_DIR")
+    if runtime:
+        return Path(runtime) / "copilot-cli" / "daemon.sock"
+    return Path(os.getenv("TMPDIR") or "/tmp") / f"copilot-cli-{os.getuid()}" / "daemon.sock"
+
+
+def _send(sock: socket.socket, kind: bytes, payload: bytes = b"") -> None:
+    sock.sendall(_FRAME.pack(kind, len(payload)) + payload)
+
+
+def _read_frame(reader: IO[bytes]) -> tuple[bytes, bytes]:
+    header = reader.read(_FRAME.size)
+    if len(header) < _FRAME.size:
+        raise EOFError("connection closed")
+    kind, size = _FRAME.unpack(header)
+    payload = reader.read(size) if size else b""
+    if len(payload) < size:
+        raise EOFError("connection closed")
+    return kind, payload
+
+
+# ---------------------------------------------------------------------------
+# Client side – standard library only, run by the ``copilot`` wrapper
+# ---------------------------------------------------------------------------
+
+
+def _isatty(stream: Any) -> bool:
+    isatty = getattr(stream, "isatty", None)
+    return bool(isatty and isatty())
+
+
+def _pump_stdin(sock: socket.socket, stdin: Any) -> None:
+    source = getattr(stdin, "buffer", stdin)
+    read = getattr(source, "read1", source.read)
+    try:
+        while True:
+            data = read(65536)
+            if not data:
+                break
+            _send(sock, STDIN, data)
+        _send(sock, STDIN)
+    except (OSError, ValueError):
+        pass
+
+
+def _connect(path: Optional[Path]) -> Optional[socket.socket]:
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = path or socket_path()
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def forward(
+    argv: list[str],
+    *,
+    path: Optional[Path] = None,
+    stdin: Any = None,
+    stdout: Any = None,
+    stderr: Any = None,
+) -> Optional[int]:
+    """
+    Run the CLI with *argv* in the daemon, relaying its input and output.
+
+    Args:
+        argv: Arguments without the program name
+        path: Socket of the daemon, :func:`socket_path` by default
+        stdin, stdout, stderr: Streams to relay, the process streams by default
+
+    Returns:
+        The exit status, or ``None`` when no daemon took the request and the
+        caller should run the CLI itself
+    """
+    sock = _connect(path)
+    if sock is None:
+        return None
+    stdin = sys.stdin if stdin is None else stdin
+    stdout = sys.stdout if stdout is None else stdout
+    stderr = sys.stderr if stderr is None else stderr
+
+    env = dict(os.environ)
+    if _isatty(stdout):
+        import shutil
+
+        size = shutil.get_terminal_size()
+        env.setdefault("COLUMNS", str(size.columns))
+        env.setdefault("LINES", str(size.lines))
+    request = {
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "env": env,
+        "tty": {"stdin": _isatty(stdin), "stdout": _isatty(stdout), "stderr": _isatty(stderr)},
+    }
+
+    with sock:
+        try:
+            _send(sock, REQUEST, json.dumps(request).encode("utf-8"))
+        except OSError:
+            return None
+        reader = sock.makefile("rb")
+        outputs = {STDOUT: getattr(stdout, "buffer", stdout), STDERR: getattr(stderr, "buffer", stderr)}
+        started = False
+        while True:
+            try:
+                kind, payload = _read_frame(reader)
+            except (OSError, EOFError):
+                if not started:
+                    return None
+                print("copilot: lost the connection to the daemon", file=stderr)
+                return 1
+            if kind == BUSY:
+                return None
+            if kind == EXIT:
+                return int(payload or 0)
+            started = True
+            if kind == STDIN:
+                threading.Thread(target=_pump_stdin, args=(sock, stdin), daemon=True).start()
+            elif kind in outputs:
+                outputs[kind].write(payload)
+                outputs[kind].flush()
+
+
+def control(op: str, *, path: Optional[Path] = None) -> Optional[dict[str, Any]]:
+    """
+    Send the ``status`` or ``stop`` command to the daemon.
+
+    Returns:
+        The daemon's reply, or ``None`` when it is not running
+    """
+    sock = _connect(path)
+    if sock is None:
+        return None
+    with sock:
+        try:
+            _send(sock, REQUEST, json.dumps({"op": op}).encode("utf-8"))
+            reader = sock.makefile("rb")
+            reply: dict[str, Any] = {}
+            while True:
+                kind, payload = _read_frame(reader)
+                if kind == STDOUT:
+                    reply = json.loads(payload)
+                elif kind == EXIT:
+                    return reply
+        except (OSError, EOFError, ValueError):
+            return None
+
+
+# ---------------------------------------------------------------------------
+# Daemon side
+# ---------------------------------------------------------------------------
+
+
+class _Connection:
+    """One client connection; frames may be sent from several threads."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.reader = sock.makefile("rb")
+        self._lock = threading.Lock()
+
+    def send(self, kind: bytes, payload: bytes = b"") -> None:
+        with self._lock:
+            _send(self.sock, kind, payload)
+
+    def read(self) -> tuple[bytes, bytes]:
+        return _read_frame(self.reader)
+
+
+class _Output(io.TextIOBase):
+    """Text stream sending what is written to the client, line-buffered."""
+
+    def __init__(self, connection: _Connection, kind: bytes, tty: bool) -> None:
+        super().__init__()
+        self._connection = connection
+        self._kind = kind
+        self._tty = tty
+        self._pending: list[str] = []
+
+    @property
+    def encoding(self) -> str:  # type: ignore[override]
+        return "utf-8"
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return self._tty
+
+    def write(self, text: str) -> int:
+        self._pending.append(text)
+        if "\n" in text:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if self._pending:
+            data = "".join(self._pending)
+            self._pending.clear()
+            self._connection.send(self._kind, data.encode("utf-8", "replace"))
+
+
+class _Input(io.RawIOBase):
+    """Raw stream reading the client's stdin, requested on first read."""
+
+    def __init__(self, connection: _Connection, tty: bool) -> None:
+        super().__init__()
+        self._connection = connection
+        self._tty = tty
+        self._requested = False
+        self._eof = False
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return self._tty
+
+    def readinto(self, buffer: Any) -> int:
+        if not self._pending and not self._eof:
+            if not self._requested:
+                self._requested = True
+                self._connection.send(STDIN)
+            kind, payload = self._connection.read()
+            if kind != STDIN or not payload:
+                self._eof = True
+            self._pending = payload
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _exit_status(code: object) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+class Daemon:
+    """
+    Serve CLI invocations on a Unix socket, one at a time.
+    """
+
+    def __init__(
+        self,
+        handler: Handler,
+        path: Optional[Path] = None,
+        *,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        """
+        Args:
+            handler: Runs the CLI with the given argv; may raise ``SystemExit``
+            path: Socket to listen on, :func:`socket_path` by default
+            idle_timeout: Seconds without a request after which the daemon exits
+        """
+        self.handler = handler
+        self.path = path or socket_path()
+        self.idle_timeout = idle_timeout
+        self.started_at = time.time()
+        self.requests = 0
+        self._busy = threading.Lock()
+        self._settling = threading.Event()  # the running request has answered
+        self._connections: weakref.WeakSet[threading.Thread] = weakref.WeakSet()
+        self._stop = threading.Event()
+        self._last_request = time.monotonic()
+
+    def bind(self) -> socket.socket:
+        """
+        Create the listening socket in a directory only the user can access.
+
+        Raises:
+            RuntimeError: If another daemon is already listening on the socket
+            PermissionError: If the socket directory belongs to another user
+        """
+        directory = self.path.parent
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if directory.stat().st_uid != os.getuid():
+            raise PermissionError(f"{directory} belongs to another user")
+        if self.path.exists():
+            if control("status", path=self.path) is not None:
+                raise RuntimeError(f"A daemon is already listening on {self.path}")
+            self.path.unlink()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(str(self.path))
+        os.chmod(self.path, 0o600)
+        sock.listen(16)
+        return sock
+
+    def serve_forever(self, sock: socket.socket) -> None:
+        """Accept connections until stopped or idle for ``idle_timeout`` seconds."""
+        sock.settimeout(_ACCEPT_POLL)
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn, _ = sock.accept()
+                except socket.timeout:
+                    if not self._busy.locked() and time.monotonic() - self._last_request > self.idle_timeout:
+                        break
+                    continue
+                conn.settimeout(None)
+                thread = threading.Thread(target=self._handle, args=(conn,), daemon=True)
+                self._connections.add(thread)
+                thread.start()
+        finally:
+            sock.close()
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "socket": str(self.path),
+            "uptime": round(time.time() - self.started_at, 1),
+            "requests": self.requests,
+            "busy": self._busy.locked(),
+        }
+
+    def _handle(self, sock: socket.socket) -> None:
+        with sock:
+            connection = _Connection(sock)
+            try:
+                kind, payload = connection.read()
+                request = json.loads(payload) if kind == REQUEST else {}
+                op = request.get("op", "run")
+                if op == "status":
+                    connection.send(STDOUT, json.dumps(self.status()).encode("utf-8"))
+                elif op == "stop":
+                    self.stop()
+                elif not self._acquire():
+                    connection.send(BUSY)
+                    return
+                else:
+                    try:
+                        self.requests += 1
+                        self._run(connection, request)
+                    finally:
+                        self._last_request = time.monotonic()
+                        self._busy.release()
+                    return
+                connection.send(EXIT, b"0")
+            except (OSError, EOFError, ValueError, AttributeError):
+                # The client went away or sent garbage; nothing to answer.
+                pass
+
+    def _acquire(self) -> bool:
+        """Take the daemon for a request, waiting for one that already answered to settle."""
+        if self._busy.acquire(blocking=False):
+            return True
+        return self._settling.is_set() and self._busy.acquire(timeout=REQUEST_THREAD_GRACE + 1)
+
+    def _run(self, connection: _Connection, request: dict[str, Any]) -> int:
+        tty = request.get("tty", {})
+        stdout = _Output(connection, STDOUT, bool(tty.get("stdout")))
+        stderr = _Output(connection, STDERR, bool(tty.get("stderr")))
+        stdin = io.TextIOWrapper(io.BufferedReader(_Input(connection, bool(tty.get("stdin")))), encoding="utf-8")
+        argv = [str(arg) for arg in request.get("argv", [])]
+
+        saved = (os.getcwd(), dict(os.environ), sys.argv, sys.stdin, sys.stdout, sys.stderr)
+        before = set(threading.enumerate())
+        try:
+            os.chdir(request["cwd"])
+            os.environ.clear()
+            os.environ.update(request.get("env", {}))
+            sys.argv = ["copilot", *argv]
+            sys.stdin, sys.stdout, sys.stderr = stdin, stdout, stderr
+            try:
+                status = _exit_status(self.handler(argv))
+            except SystemExit as e:
+                status = _exit_status(e.code)
+            except Exception:
+                import traceback
+
+                traceback.print_exc()
+                status = 1
+            stdout.flush()
+            stderr.flush()
+            # The caller is answered right away; background work the request
+            # started (warmup, losing hedges, chunk workers) still runs with
+            # its cwd, environment and streams until it ends.
+            self._settling.set()
+            connection.send(EXIT, str(status).encode("ascii"))
+            return status
+        finally:
+            # Connections that arrive meanwhile are not the request's own.
+            _join_new_threads(before, REQUEST_THREAD_GRACE, ignore=self._connections)
+            self._settling.clear()
+            cwd, environ, sys.argv, sys.stdin, sys.stdout, sys.stderr = saved
+            os.environ.clear()
+            os.environ.update(environ)
+            os.chdir(cwd)
+
+
+def _join_new_threads(
+    before: set[threading.Thread], timeout: float, *, ignore: Collection[threading.Thread] = ()
+) -> None:
+    """
+    Wait up to ``timeout`` seconds for the threads started since ``before``.
+
+    The working directory, environment and standard streams are process
+    wide, so a thread a request left behind must end before they are
+    switched back – or it would see the next caller's.
+    """
+    deadline = time.monotonic() + timeout
+    current = threading.current_thread()
+    for thread in threading.enumerate():
+        if thread in before or thread in ignore or thread is current:
+            continue
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+
+def cli_handler() -> Handler:
+    """
+    Load the CLI and get it ready for the first request.
+
+    The heavy dependencies are imported, the actions loaded and a client for
+    the default flags is created and warmed up, so even the first forwarded
+    invocation skips all of it.
+    """
+    import importlib
+
+    from . import _load_cli_module
+
+    cli = _load_cli_module()
+    if cli is None:
+        raise RuntimeError("copilot-cli.py not found next to the package directory")
+
+    args = cli.Args(**vars(cli.create_parser().parse_args([])))
+    cli.create_client(args).start_warmup()
+    for module in ("copilot_cli.action.model", "copilot_cli.streamer.markdown", "yaml", "halo"):
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+    try:
+        cli.get_action_manager(".")
+    except Exception:  # a broken actions.yml is reported by the request that uses it
+        pass
+    return cli.main
+
+
+def _start(idle_timeout: float) -> int:
+    import subprocess
+
+    from .utils import user_cache_dir
+
+    if control("status") is not None:
+        print(f"The daemon is already running on {socket_path()}", file=sys.stderr)
+        return 0
+
+    log_dir = user_cache_dir()
+    log_dir.mkdir(parents=True, exist_ok=True)
+    package_root = str(Path(__file__).resolve().parent.parent)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (package_root, os.getenv("PYTHONPATH")))))
+    with open(log_dir / "daemon.log", "ab") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "copilot_cli.daemon", "run", "--idle-timeout", str(idle_timeout)],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            cwd="/",
+            env=env,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        if control("status") is not None:
+            print(f"Daemon listening on {socket_path()}", file=sys.stderr)
+            return 0
+        time.sleep(0.05)
+    print(f"The daemon did not start; see {log_dir / 'daemon.log'}", file=sys.stderr)
+    return 1
+
+
+def _main(argv: Optional[list[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m copilot_cli.daemon",
+        description="Keep Copilot CLI loaded in the background for faster invocations",
+    )
+    _ = parser.add_argument(
+        "command",
+        choices=("start", "stop", "status", "run"),
+        help="start in the background, stop, report status, or run in the foreground",
+    )
+    _ = parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help="Exit after this many seconds without a request",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "start":
+        return _start(args.idle_timeout)
+
+    if args.command == "status":
+        status = control("status")
+        print(json.dumps(status) if status is not None else "not running")
+        return 0 if status is not None else 1
+
+    if args.command == "stop":
+        return 0 if control("stop") is not None else 1
+
+    import signal
+
+    daemon = Daemon(cli_handler(), idle_timeout=args.idle_timeout)
+    sock = daemon.bind()
+    _ = signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    daemon.serve_forever(sock)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover – module execution guard
+    sys.exit(_main())
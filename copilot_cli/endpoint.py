@@ -0,0 +1,152 @@
+"""Chat endpoint resolution and connection diagnostics.
+
+The token service tells every account which API host to use
+(``CopilotToken.endpoints["api"]``, e.g. ``https://api.individual.githubcopilot.com``
+or an Enterprise host).  :class:`~copilot_cli.copilot.GithubCopilotClient`
+sends chat requests there and resolves the host once per token: the
+addresses are stored next to the token in the token store and pinned in the
+connection pool, so later invocations skip the DNS lookup until the token
+is replaced.  :func:`probe` times DNS, TCP connect and TLS handshake of an
+endpoint separately for ``--diagnose``.
+"""
+
+from __future__ import annotations
+
+import socket
+import time
+import urllib.parse
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ChatEndpoint:
+    """Where chat requests go, and why."""
+
+    url: str
+    # "environment" (GITHUB_COPILOT_CHAT_URL), "token" or "default"
+    source: str
+    addresses: tuple[str, ...] = ()
+    # The Copilot token the endpoint was resolved for.
+    token: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def host(self) -> str:
+        return (urllib.parse.urlsplit(self.url).hostname or "").lower()
+
+    @property
+    def port(self) -> int:
+        parsed = urllib.parse.urlsplit(self.url)
+        return parsed.port or (443 if parsed.scheme == "https" else 80)
+
+
+def api_chat_url(endpoints: Optional[Mapping[str, str]]) -> Optional[str]:
+    """
+    The chat completions URL on the token's API host.
+
+    Returns:
+        ``None`` unless ``endpoints["api"]`` is an ``https`` URL – the bearer
+        token is never sent anywhere else
+    """
+    api = (endpoints or {}).get("api")
+    if not isinstance(api, str):
+        return None
+    parsed = urllib.parse.urlsplit(api.strip())
+    if parsed.scheme != "https" or not parsed.hostname:
+        return None
+    return f"https://{parsed.netloc}{parsed.path.rstrip('/')}/chat/completions"
+
+
+def resolve(host: str, port: int) -> tuple[str, ...]:
+    """The addresses of *host* in resolver order; empty when the lookup fails."""
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except OSError:
+        return ()
+    return tuple(dict.fromkeys(str(info[4][0]) for info in infos))
+
+
+@dataclass
+class Probe:
+    """Connection timings of one endpoint, in seconds."""
+
+    host: str
+    address: Optional[str] = None
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+    tls: Optional[float] = None
+    tls_version: Optional[str] = None
+    cipher: Optional[str] = None
+    error: Optional[str] = None
+
+    def describe(self) -> str:
+        """One line, e.g. ``api.githubcopilot.com (140.82.1.1): DNS 12 ms, connect 20 ms, TLS 35 ms (TLSv1.3)``."""
+        parts = []
+        for name, value in (("DNS", self.dns), ("connect", self.connect), ("TLS", self.tls)):
+            if value is not None:
+                parts.append(f"{name} {value * 1000:.0f} ms")
+        if self.tls_version:
+            parts[-1] += f" ({self.tls_version}, {self.cipher})"
+        if self.error:
+            parts.append(self.error)
+        where = f"{self.host} ({self.address})" if self.address else self.host
+        return f"{where}: {', '.join(parts)}"
+
+
+def _tls_context() -> object:
+    import ssl
+
+    try:
+        # The CA bundle *requests* verifies against.
+        import certifi
+
+        return ssl.create_default_context(cafile=certifi.where())
+    except ImportError:
+        return ssl.create_default_context()
+
+
+def probe(url: str, *, address: Optional[str] = None, timeout: float = 5.0) -> Probe:
+    """
+    Time a fresh DNS lookup, TCP connect and TLS handshake to *url*'s host.
+
+    Args:
+        url: Any URL on the endpoint
+        address: Connect here instead of the first resolved address (the
+            address requests are pinned to); DNS is still timed
+        timeout: Limit for each step in seconds
+
+    Returns:
+        The timings; ``error`` names the step that failed
+    """
+    endpoint = ChatEndpoint(url, "probe")
+    result = Probe(endpoint.host)
+
+    start = time.perf_counter()
+    addresses = resolve(endpoint.host, endpoint.port)
+    result.dns = time.perf_counter() - start
+    result.address = address or (addresses[0] if addresses else None)
+    if result.address is None:
+        result.error = "DNS lookup failed"
+        return result
+
+    start = time.perf_counter()
+    try:
+        sock = socket.create_connection((result.address, endpoint.port), timeout)
+    except OSError as e:
+        result.error = f"connect failed: {e}"
+        return result
+    result.connect = time.perf_counter() - start
+
+    with sock:
+        if urllib.parse.urlsplit(url).scheme != "https":
+            return result
+        start = time.perf_counter()
+        try:
+            with _tls_context().wrap_socket(sock, server_hostname=endpoint.host) as tls:  # type: ignore[attr-defined]
+                result.tls = time.perf_counter() - start
+                result.tls_version = tls.version()
+                result.cipher = (tls.cipher() or ("?",))[0]
+        except OSError as e:  # ssl.SSLError included
+            result.error = f"TLS handshake failed: {e}"
+    return result
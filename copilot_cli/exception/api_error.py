@@ -1,5 +1,11 @@
+from typing import Optional
+
 from .copilot_client_error import CopilotClientError
 
 
 class APIError(CopilotClientError):
     """Raised when API calls fail."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
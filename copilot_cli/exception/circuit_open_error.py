@@ -0,0 +1,10 @@
+from .api_error import APIError
+
+
+class CircuitOpenError(APIError):
+    """Raised without sending a request while the model's circuit is open."""
+
+    def __init__(self, message: str, model: str, retry_in: float) -> None:
+        super().__init__(message)
+        self.model = model
+        self.retry_in = retry_in
@@ -0,0 +1,10 @@
+from .copilot_client_error import CopilotClientError
+
+
+class PromptTooLargeError(CopilotClientError):
+    """Raised before sending a request whose prompt exceeds the model's limit."""
+
+    def __init__(self, message: str, tokens: int, limit: int) -> None:
+        super().__init__(message)
+        self.tokens = tokens
+        self.limit = limit
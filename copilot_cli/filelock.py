@@ -0,0 +1,116 @@
+"""Cross-process file locking and atomic file replacement.
+
+Several CLI processes may run at the same time (lazygit, shell loops, batch
+jobs) and share state files under the user cache directory.  This module
+provides the two primitives needed to do that safely without third-party
+packages:
+
+* :class:`FileLock` – an advisory, exclusive lock on a side-car ``.lock``
+  file (``fcntl.flock`` on POSIX, ``msvcrt.locking`` on Windows).  The OS
+  releases it automatically when the holding process dies.
+* :func:`atomic_write_text` / :func:`atomic_write_bytes` – write to a
+  temporary file in the same directory and ``os.replace`` it over the
+  target, so readers only ever see the old or the new content, never a
+  partial write.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import IO, Any, Optional
+
+if sys.platform == "win32":  # pragma: no cover – platform specific
+    import msvcrt
+
+    def _lock(handle: IO[Any]) -> None:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(handle: IO[Any]) -> None:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock(handle: IO[Any]) -> None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(handle: IO[Any]) -> None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+class FileLock:
+    """
+    Exclusive inter-process lock guarding *path* (re-entrancy not supported).
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Args:
+            path: The protected file; the lock itself lives in ``<path>.lock``
+        """
+        self.lock_path = Path(f"{path}.lock")
+        self._handle: Optional[IO[Any]] = None
+
+    def acquire(self) -> None:
+        """Block until the lock is held by this process."""
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(self.lock_path, "a+")
+        try:
+            _lock(handle)
+        except BaseException:
+            handle.close()
+            raise
+        self._handle = handle
+
+    def release(self) -> None:
+        """Release the lock if held."""
+        handle, self._handle = self._handle, None
+        if handle is None:
+            return
+        try:
+            _unlock(handle)
+        finally:
+            handle.close()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.release()
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """
+    Atomically replace *path* with *text*.
+
+    The temporary file is created with mode ``0600`` by :mod:`tempfile`, so
+    the result is only readable by the current user.
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """
+    Atomically replace *path* with *data*; see :func:`atomic_write_text`.
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
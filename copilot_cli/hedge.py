@@ -0,0 +1,273 @@
+"""Hedged requests: cut tail latency by racing a late request against a copy.
+
+When the first byte of an answer (the first streamed token, or the whole
+response of a non-streaming request) has not arrived after a delay taken
+from a high percentile of recent latencies, :class:`Hedger` sends the same
+request again.  Whichever copy answers first is used and the other one is
+cancelled (see :mod:`copilot_cli.cancel`).
+
+Latencies are kept per model, and separately for streams, in a decaying
+log-bucket histogram shared by all processes of the user
+(``<cache dir>/latency.json``).  The histogram also counts requests and
+hedges; a hedge is only sent while hedges stay below ``budget`` times the
+number of requests, which caps the extra load on the service.  Hedging is
+opt-in (``--hedge`` or ``COPILOT_CLI_HEDGE=1``).
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+from .cancel import Cancellation
+from .filelock import FileLock, atomic_write_text
+from .pool import _env_number
+from .utils import user_cache_dir
+
+T = TypeVar("T")
+
+# Bucket *i* holds latencies in [BASE * GROWTH**i, BASE * GROWTH**(i + 1)).
+BASE = 0.01
+GROWTH = 1.2
+# A histogram is halved once it holds more samples than this, so old
+# samples fade out; the request/hedge counters decay the same way.
+WINDOW = 500
+
+
+def bucket_of(seconds: float) -> int:
+    if seconds <= BASE:
+        return 0
+    return int(math.log(seconds / BASE) / math.log(GROWTH))
+
+
+def quantile(counts: dict[str, float], q: float) -> float:
+    """Upper edge of the bucket holding the *q* quantile (0 < q <= 1) of *counts*."""
+    buckets = sorted((int(index), count) for index, count in counts.items())
+    target = q * sum(count for _, count in buckets)
+    seen = 0.0
+    for index, count in buckets:
+        seen += count
+        if seen >= target:
+            return BASE * GROWTH ** (index + 1)
+    return BASE * GROWTH ** (buckets[-1][0] + 1)
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When to hedge and how much extra load to allow."""
+
+    percentile: float = 95.0
+    budget: float = 0.1
+    min_samples: int = 20
+
+    @classmethod
+    def from_env(cls) -> Optional[HedgePolicy]:
+        """
+        Policy from ``COPILOT_CLI_HEDGE_PERCENTILE`` and ``COPILOT_CLI_HEDGE_BUDGET``.
+
+        Returns:
+            ``None`` when hedging is disabled (a percentile or budget of 0)
+        """
+        percentile = _env_number("COPILOT_CLI_HEDGE_PERCENTILE", cls.percentile)
+        budget = _env_number("COPILOT_CLI_HEDGE_BUDGET", cls.budget)
+        if not 0 < percentile < 100 or budget <= 0:
+            return None
+        return cls(percentile=percentile, budget=budget)
+
+
+class LatencyStore:
+    """
+    Per-key latency histograms and hedge counters in one lock-protected file.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        """
+        Args:
+            path: Histogram file; defaults to ``<cache dir>/latency.json``
+        """
+        self.path = Path(path) if path is not None else user_cache_dir() / "latency.json"
+        self._lock = FileLock(self.path)
+
+    def load(self) -> dict[str, Any]:
+        """The stored data, or an empty record when missing or unreadable."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = None
+        if not isinstance(data, dict) or not isinstance(data.get("latency"), dict):
+            return {"requests": 0.0, "hedges": 0.0, "latency": {}}
+        return data
+
+    def record(self, key: str, seconds: Optional[float], *, hedged: bool) -> None:
+        """
+        Count one request, and its latency unless *seconds* is ``None``.
+
+        Failures to write are ignored: statistics must never fail a request.
+        """
+        try:
+            with self._lock:
+                data = self.load()
+                data["requests"] = float(data.get("requests", 0)) + 1
+                data["hedges"] = float(data.get("hedges", 0)) + hedged
+                if data["requests"] > 2 * WINDOW:
+                    data["requests"] /= 2
+                    data["hedges"] /= 2
+                if seconds is not None:
+                    counts = data["latency"].setdefault(key, {})
+                    index = str(bucket_of(seconds))
+                    counts[index] = counts.get(index, 0) + 1
+                    if sum(counts.values()) > WINDOW:
+                        data["latency"][key] = {i: c / 2 for i, c in counts.items() if c >= 0.5}
+                atomic_write_text(self.path, json.dumps(data))
+        except OSError:
+            pass
+
+
+class Hedger:
+    """
+    Runs request attempts, hedging those that are slower than usual.
+    """
+
+    def __init__(self, store: Optional[LatencyStore] = None, policy: Optional[HedgePolicy] = None) -> None:
+        self.store = store if store is not None else LatencyStore()
+        self.policy = policy if policy is not None else HedgePolicy()
+
+    @classmethod
+    def from_env(cls, *, enabled: Optional[bool] = None) -> Optional[Hedger]:
+        """
+        A hedger with the environment's policy, or ``None`` when disabled.
+
+        Hedges are duplicate requests, so hedging is opt-in.
+
+        Args:
+            enabled: Whether to hedge; ``COPILOT_CLI_HEDGE`` decides when omitted
+        """
+        if enabled is None:
+            enabled = os.getenv("COPILOT_CLI_HEDGE", "") not in ("", "0")
+        policy = HedgePolicy.from_env() if enabled else None
+        return cls(policy=policy) if policy is not None else None
+
+    def plan(self, key: str) -> tuple[Optional[float], bool]:
+        """The hedge delay for *key* (``None`` below ``min_samples``) and whether the budget allows a hedge."""
+        data = self.store.load()
+        counts = data["latency"].get(key)
+        if not counts or sum(counts.values()) < self.policy.min_samples:
+            return None, False
+        delay = quantile(counts, self.policy.percentile / 100)
+        allowed = float(data.get("hedges", 0)) < self.policy.budget * float(data.get("requests", 0))
+        return delay, allowed
+
+    def run(
+        self,
+        key: str,
+        attempt: Callable[[Cancellation], T],
+        *,
+        cancel: Optional[Cancellation] = None,
+        discard: Optional[Callable[[T], None]] = None,
+    ) -> T:
+        """
+        Run *attempt*, and a copy of it if the first is late.
+
+        Args:
+            key: Histogram key, e.g. the model name
+            attempt: Performs the request up to its first byte; must stop
+                when the cancellation it is given is cancelled
+            cancel: Cancels every attempt when cancelled
+            discard: Releases the result of an attempt that finished second
+
+        Returns:
+            The result of the first attempt to succeed
+
+        Raises:
+            Exception: The first attempt's error, when no attempt succeeded
+        """
+        delay, allowed = self.plan(key)
+        attempts = _Attempts(attempt, cancel, discard)
+        attempts.start()
+        hedged = False
+        if delay is not None and allowed and not attempts.wait(delay):
+            hedged = True
+            attempts.start()
+        try:
+            return attempts.result()
+        finally:
+            if cancel is None or not cancel.is_set():
+                self.store.record(key, attempts.latency, hedged=hedged)
+
+
+class _Attempts(Generic[T]):
+    """Attempts of one request running on their own threads; the first success wins."""
+
+    def __init__(
+        self,
+        attempt: Callable[[Cancellation], T],
+        cancel: Optional[Cancellation],
+        discard: Optional[Callable[[T], None]],
+    ) -> None:
+        self._attempt = attempt
+        self._parent = cancel
+        self._discard = discard
+        self._cond = threading.Condition()
+        self._cancels: list[Cancellation] = []
+        self._errors: list[BaseException] = []
+        self._finished = 0
+        self._winner: Optional[int] = None
+        self._result: Optional[T] = None
+        self._started = time.perf_counter()
+        # What the caller waited for the winner, measured from the first
+        # attempt: when a hedge wins, the cancelled original took at least
+        # this long, so the slow tail is recorded rather than the hedge's time.
+        self.latency: Optional[float] = None
+
+    def start(self) -> None:
+        cancel = self._parent.child() if self._parent is not None else Cancellation()
+        with self._cond:
+            index = len(self._cancels)
+            self._cancels.append(cancel)
+        thread = threading.Thread(target=self._run, args=(index, cancel), name=f"copilot-attempt-{index}", daemon=True)
+        thread.start()
+
+    def _run(self, index: int, cancel: Cancellation) -> None:
+        try:
+            result = self._attempt(cancel)
+        except Exception as e:  # handed to the caller if no attempt succeeds
+            with self._cond:
+                self._errors.append(e)
+                self._finished += 1
+                self._cond.notify_all()
+            return
+        with self._cond:
+            self._finished += 1
+            # Losers are only cancelled once there is a winner.
+            won = self._winner is None
+            if won:
+                self._winner, self._result = index, result
+                self.latency = time.perf_counter() - self._started
+            self._cond.notify_all()
+        if not won and self._discard is not None:
+            self._discard(result)
+
+    def _settled(self) -> bool:
+        return self._winner is not None or self._finished == len(self._cancels)
+
+    def wait(self, timeout: float) -> bool:
+        """Wait up to *timeout* seconds; whether the outcome is known."""
+        with self._cond:
+            return self._cond.wait_for(self._settled, timeout)
+
+    def result(self) -> T:
+        with self._cond:
+            self._cond.wait_for(self._settled)
+            winner, result = self._winner, self._result
+            losers = [cancel for index, cancel in enumerate(self._cancels) if index != winner]
+        for cancel in losers:
+            cancel.cancel()
+        if winner is None:
+            raise self._errors[0]
+        return result  # type: ignore[return-value]
@@ -0,0 +1,125 @@
+"""Per-model prompt and output limits.
+
+The Copilot API rejects prompts beyond a model's limit only after the whole
+prompt has been uploaded.  The registry below lets requests be measured –
+and shaped or rejected – locally, before any network I/O.  Models missing
+from it are measured against conservative guessed limits, which shape
+prompts but never reject them.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+from .tokens import ERROR_BOUND, estimate_tokens
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    """Token limits the Copilot chat endpoint enforces for a model."""
+
+    max_prompt_tokens: int
+    max_output_tokens: int
+    # Tokenizer family used to estimate prompts for the model.
+    encoding: str = "o200k"
+
+
+MODEL_LIMITS: dict[str, ModelLimits] = {
+    "gpt-4o": ModelLimits(64_000, 4_096),
+    "gpt-4o-mini": ModelLimits(64_000, 4_096),
+    "gpt-4.1": ModelLimits(128_000, 16_384),
+    "gpt-4": ModelLimits(32_768, 4_096, "cl100k"),
+    "gpt-3.5-turbo": ModelLimits(12_288, 4_096, "cl100k"),
+    "o1": ModelLimits(20_000, 100_000),
+    "o3-mini": ModelLimits(64_000, 100_000),
+    "o4-mini": ModelLimits(128_000, 16_384),
+    "gemini-2.0-flash-001": ModelLimits(128_000, 8_192),
+    "gemini-2.5-pro": ModelLimits(128_000, 64_000),
+    "claude-3.5-sonnet": ModelLimits(90_000, 8_192),
+    "claude-3.7-sonnet": ModelLimits(90_000, 8_192),
+    "claude-sonnet-4": ModelLimits(80_000, 16_000),
+}
+# Conservative limits for models missing from the registry.
+DEFAULT_LIMITS = ModelLimits(64_000, 4_096)
+
+
+def registered_limits(model: str) -> Optional[ModelLimits]:
+    """
+    Registered limits of *model*, or ``None`` when the registry does not know it.
+
+    Dated or suffixed variants (``gpt-4o-2024-11-20``) resolve to the longest
+    registered prefix.
+    """
+    limits = MODEL_LIMITS.get(model)
+    if limits is not None:
+        return limits
+    prefixes = [name for name in MODEL_LIMITS if model.startswith(name + "-")]
+    return MODEL_LIMITS[max(prefixes, key=len)] if prefixes else None
+
+
+def model_limits(model: str) -> ModelLimits:
+    """Limits of *model*; unknown models get :data:`DEFAULT_LIMITS`."""
+    limits = registered_limits(model)
+    return limits if limits is not None else DEFAULT_LIMITS
+
+
+def prompt_budget(model: str, system_prompt: str = "", *, limit: Optional[int] = None) -> int:
+    """
+    Estimated tokens available for the user prompt of a request to *model*.
+
+    The limit is shrunk by the estimator's error bound, so a prompt shaped to
+    the budget fits even where the estimate runs low.
+
+    Args:
+        model: Model the request goes to
+        system_prompt: System prompt sent along, counted against the budget
+        limit: Explicit prompt limit overriding the model's
+    """
+    limits = model_limits(model)
+    window = limit if limit is not None else limits.max_prompt_tokens
+    return max(0, int(window / (1 + ERROR_BOUND)) - estimate_tokens(system_prompt, limits.encoding))
+
+
+@dataclass(frozen=True)
+class PromptSize:
+    """Estimated size of a request, measured against the model's limits."""
+
+    model: str
+    limits: ModelLimits
+    system_tokens: int
+    prompt_tokens: int
+    # False when the limits are the guessed DEFAULT_LIMITS of an unknown model.
+    registered: bool = True
+
+    @property
+    def total(self) -> int:
+        return self.system_tokens + self.prompt_tokens
+
+    @property
+    def too_large(self) -> bool:
+        """Whether the request exceeds the limit even allowing for the estimator's error."""
+        return self.total > self.limits.max_prompt_tokens * (1 + ERROR_BOUND)
+
+    def describe(self) -> str:
+        share = self.total * 100 / self.limits.max_prompt_tokens
+        guessed = "" if self.registered else "guessed "
+        return (
+            f"{self.model}: system ~{self.system_tokens} + prompt ~{self.prompt_tokens} = ~{self.total} tokens "
+            f"({share:.0f}% of the {guessed}{self.limits.max_prompt_tokens}-token prompt limit; "
+            f"up to {self.limits.max_output_tokens} output tokens)"
+        )
+
+
+def measure_prompt(model: str, system_prompt: str, prompt: str) -> PromptSize:
+    """Estimate the prompt tokens of a request to *model*."""
+    limits = registered_limits(model)
+    known = limits is not None
+    limits = limits if known else DEFAULT_LIMITS
+    return PromptSize(
+        model,
+        limits,
+        estimate_tokens(system_prompt, limits.encoding),
+        estimate_tokens(prompt, limits.encoding),
+        known,
+    )
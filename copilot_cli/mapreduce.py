@@ -0,0 +1,397 @@
+"""Map-reduce over inputs too large for one prompt.
+
+``translate``, ``correct`` and ``enhance`` used to send a whole document in
+one request: long inputs ran into the model's output limit, and even below
+it the answer took as long as one model needs to write the entire text.
+:func:`split_text` cuts the input into token-bounded chunks on paragraph
+boundaries – lines, then words, when a paragraph alone is too large – and
+:class:`MapReduce` sends the chunks concurrently with bounded parallelism.
+The answers are stitched back together in input order: the answer of the
+first unfinished chunk streams live, later ones are buffered until every
+chunk before them is done.
+
+Actions whose task needs one merged answer (a summary) declare a reduce
+prompt; the stitched answers are then sent with it as a final request.  When
+they do not fit the model's window together, neighbouring answers are first
+reduced in groups that do, and those reductions again, until one request
+merges them all.
+Every chunk is cached separately, so after an edit only the changed chunks
+are asked again.
+"""
+
+from __future__ import annotations
+
+import queue
+import re
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Optional
+
+from .cancel import Cancellation
+from .exception.prompt_too_large_error import PromptTooLargeError
+from .limits import model_limits, prompt_budget
+from .tokens import ERROR_BOUND, estimate_tokens
+
+if TYPE_CHECKING:
+    from .copilot import GithubCopilotClient
+
+# Chunk size when neither the action nor ``--chunk-tokens`` sets one: small
+# enough that several chunks run side by side, large enough to keep context.
+DEFAULT_CHUNK_TOKENS = 1500
+
+_DONE = object()
+# Each match is one piece with the whitespace that follows it.
+_PARAGRAPHS = re.compile(r".*?(?:\n(?:[ \t]*\n)+|\Z)", re.DOTALL)
+_LINES = re.compile(r"[^\n]*\n?")
+_WORDS = re.compile(r"\s*\S+\s*")
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A piece of the input and the whitespace that followed it."""
+
+    text: str
+    separator: str = ""
+    tokens: int = 0
+
+
+def _pieces(text: str, max_tokens: int, estimate: Callable[[str], int]) -> Iterator[tuple[str, int]]:
+    """Split *text* into pieces of at most *max_tokens*, coarsest boundaries first."""
+    for splitter in (_PARAGRAPHS, _LINES, _WORDS):
+        parts = [match.group() for match in splitter.finditer(text) if match.group()]
+        if len(parts) > 1:
+            break
+    else:
+        # A single word beyond the limit: cut it by length.
+        tokens = estimate(text)
+        if tokens <= max_tokens:
+            yield text, tokens
+            return
+        size = max(1, len(text) * max_tokens // tokens)
+        for start in range(0, len(text), size):
+            part = text[start : start + size]
+            yield part, estimate(part)
+        return
+
+    for part in parts:
+        tokens = estimate(part)
+        if tokens <= max_tokens:
+            yield part, tokens
+        else:
+            yield from _pieces(part, max_tokens, estimate)
+
+
+def split_text(text: str, max_tokens: int, estimate: Callable[[str], int] = estimate_tokens) -> list[Chunk]:
+    """
+    Cut *text* into chunks of at most *max_tokens* estimated tokens.
+
+    Chunks end on paragraph boundaries where possible, else on line or word
+    boundaries.  Concatenating ``chunk.text + chunk.separator`` restores the
+    text, apart from leading whitespace.
+
+    Args:
+        text: The input
+        max_tokens: Estimated token limit of a chunk
+        estimate: Token estimator, :func:`~copilot_cli.tokens.estimate_tokens` by default
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+    chunks: list[Chunk] = []
+    current: list[str] = []
+    used = 0
+
+    def close() -> None:
+        nonlocal used
+        body = "".join(current)
+        stripped = body.rstrip()
+        if stripped:
+            chunks.append(Chunk(stripped, body[len(stripped) :], used))
+        current.clear()
+        used = 0
+
+    def add(piece: str, tokens: int) -> None:
+        nonlocal used
+        if current and used + tokens > max_tokens:
+            close()
+        current.append(piece)
+        used += tokens
+
+    for match in _PARAGRAPHS.finditer(text.lstrip("\n")):
+        paragraph = match.group()
+        tokens = estimate(paragraph)
+        if tokens <= max_tokens:
+            add(paragraph, tokens)
+            continue
+        # An oversized paragraph gets chunks of its own.
+        close()
+        for piece, tokens in _pieces(paragraph, max_tokens, estimate):
+            add(piece, tokens)
+        close()
+    close()
+    return chunks
+
+
+def chunk_budget(model: str, system_prompt: str, prompt: str, limit: Optional[int] = None) -> int:
+    """
+    Tokens of input per chunk for requests to *model*.
+
+    Args:
+        model: Model asked for every chunk
+        system_prompt: System prompt sent along
+        prompt: Text put before every chunk
+        limit: Requested chunk size, :data:`DEFAULT_CHUNK_TOKENS` by default;
+            shrunk so a chunk fits the prompt and – as rewriting tasks answer
+            with about as many tokens – the output limit
+    """
+    limits = model_limits(model)
+    room = prompt_budget(model, system_prompt) - estimate_tokens(prompt, limits.encoding)
+    output = int(limits.max_output_tokens / (1 + ERROR_BOUND))
+    return max(1, min(limit or DEFAULT_CHUNK_TOKENS, room, output))
+
+
+def reduce_budget(models: Sequence[str], system_prompt: str, reduce_prompt: str) -> int:
+    """
+    Tokens of answers that one reduce request has room for.
+
+    Args:
+        models: The model and its fallbacks; the smallest window counts
+        system_prompt: System prompt sent along
+        reduce_prompt: Text put before the answers
+    """
+    return min(
+        prompt_budget(model, system_prompt) - estimate_tokens(f"{reduce_prompt}\n", model_limits(model).encoding)
+        for model in models
+    )
+
+
+class _Trim:
+    """Drops leading newlines and holds back trailing whitespace of a stream."""
+
+    def __init__(self) -> None:
+        self._started = False
+        self._pending = ""
+
+    def feed(self, delta: str) -> str:
+        if not self._started:
+            delta = delta.lstrip("\n")
+            if not delta:
+                return ""
+            self._started = True
+        text = self._pending + delta
+        stripped = text.rstrip()
+        self._pending = text[len(stripped) :]
+        return stripped
+
+
+@dataclass
+class ChunkRun:
+    """One chunk's answer and timings."""
+
+    chunk: Chunk
+    chunks: list[str] = field(default_factory=list)
+    elapsed: Optional[float] = None
+    error: Optional[BaseException] = None
+
+
+def _answer(run: ChunkRun) -> str:
+    return "".join(run.chunks).lstrip("\n").rstrip()
+
+
+class MapReduce:
+    """
+    Iterate over the stitched answers of all chunks, in input order.
+
+    At most *concurrency* chunks are in flight; they start in input order so
+    that the head of the output is ready first.  The first failing chunk
+    cancels the others and its error is raised.
+    """
+
+    def __init__(
+        self,
+        client: GithubCopilotClient,
+        chunks: Sequence[Chunk],
+        prompt: str,
+        model: str,
+        system_prompt: str,
+        *,
+        concurrency: int = 4,
+        cache_ttl: Optional[float] = None,
+        fallbacks: Sequence[str] = (),
+        reduce_prompt: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            client: Client shared by the chunk requests
+            chunks: The input, see :func:`split_text`
+            prompt: Put before every chunk – the action prompt and the user's text
+            model: Model asked for every chunk
+            system_prompt: System prompt of every request
+            concurrency: Maximum number of chunk requests in flight
+            cache_ttl: Passed on to every request
+            fallbacks: Passed on to every request
+            reduce_prompt: Put before the stitched answers in a final request
+                whose answer replaces them; skipped for a single chunk
+
+        Raises:
+            PromptTooLargeError: The reduce prompt alone fills the window,
+                before any chunk is sent
+        """
+        if not chunks:
+            raise ValueError("At least one chunk is required")
+        self.client = client
+        self.runs = [ChunkRun(chunk) for chunk in chunks]
+        self.prompt = prompt
+        self.model = model
+        self.system_prompt = system_prompt
+        self.concurrency = max(1, concurrency)
+        self.cache_ttl = cache_ttl
+        self.fallbacks = fallbacks
+        self.reduce_prompt = reduce_prompt if len(chunks) > 1 else None
+        self.reduce_seconds: Optional[float] = None
+        self.reduce_rounds = 0
+        self._encoding = model_limits(model).encoding
+        if self.reduce_prompt is not None:
+            self.reduce_budget = reduce_budget((model, *fallbacks), system_prompt, self.reduce_prompt)
+            if self.reduce_budget <= 0:
+                raise PromptTooLargeError(
+                    f"Reduce prompt too large for {model}: no room is left for the answers",
+                    estimate_tokens(self.reduce_prompt, self._encoding),
+                    model_limits(model).max_prompt_tokens,
+                )
+        self._cancel = Cancellation()
+        self._queue: queue.Queue[tuple[int, object]] = queue.Queue()
+        self._start = time.perf_counter()
+
+    def chunk_prompt(self, chunk: Chunk) -> str:
+        return f"{self.prompt}\n{chunk.text}" if self.prompt else chunk.text
+
+    def _work(self, pending: queue.Queue[int]) -> None:
+        while not self._cancel.is_set():
+            try:
+                index = pending.get_nowait()
+            except queue.Empty:
+                return
+            run = self.runs[index]
+            try:
+                for delta in self.client.stream_chat_completion(
+                    self.chunk_prompt(run.chunk),
+                    self.model,
+                    self.system_prompt,
+                    cache_ttl=self.cache_ttl,
+                    cancel=self._cancel.child(),
+                    fallbacks=self.fallbacks,
+                ):
+                    if delta:
+                        self._queue.put((index, delta))
+            except Exception as e:  # re-raised by the consumer
+                run.error = e
+            finally:
+                run.elapsed = time.perf_counter() - self._start
+                self._queue.put((index, _DONE))
+
+    def _mapped(self) -> Iterator[str]:
+        pending: queue.Queue[int] = queue.Queue()
+        for index in range(len(self.runs)):
+            pending.put(index)
+        for number in range(min(self.concurrency, len(self.runs))):
+            threading.Thread(target=self._work, args=(pending,), name=f"copilot-chunk-{number}", daemon=True).start()
+
+        trims = [_Trim() for _ in self.runs]
+        done = [False] * len(self.runs)
+        head = 0
+        try:
+            while head < len(self.runs):
+                index, item = self._queue.get()
+                run = self.runs[index]
+                if item is _DONE:
+                    if run.error is not None:
+                        raise run.error
+                    done[index] = True
+                else:
+                    run.chunks.append(item)  # type: ignore[arg-type]
+                    if index != head:
+                        continue
+                    text = trims[index].feed(item)  # type: ignore[arg-type]
+                    if text:
+                        yield text
+                # Flush every chunk the head caught up with.
+                while head < len(self.runs) and done[head]:
+                    if head + 1 < len(self.runs):
+                        yield self.runs[head].chunk.separator
+                        text = trims[head + 1].feed("".join(self.runs[head + 1].chunks))
+                        if text:
+                            yield text
+                    head += 1
+        finally:
+            # Stops the remaining chunks when failing or given up early.
+            self._cancel.cancel()
+
+    def _groups(self, answers: list[tuple[str, str]]) -> list[list[tuple[str, str]]]:
+        """Neighbouring answers in groups that fit one reduce request each."""
+        groups: list[list[tuple[str, str]]] = []
+        used = 0
+        for answer in answers:
+            tokens = estimate_tokens("".join(answer), self._encoding)
+            if groups and used + tokens <= self.reduce_budget:
+                groups[-1].append(answer)
+                used += tokens
+            else:
+                groups.append([answer])
+                used = tokens
+        return groups
+
+    def _reduce(self, group: list[tuple[str, str]]) -> Iterator[str]:
+        stitched = "".join(text + separator for text, separator in group[:-1]) + group[-1][0]
+        return self.client.stream_chat_completion(
+            f"{self.reduce_prompt}\n{stitched}",
+            self.model,
+            self.system_prompt,
+            cache_ttl=self.cache_ttl,
+            fallbacks=self.fallbacks,
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        if self.reduce_prompt is None:
+            yield from self._mapped()
+            return
+        for _ in self._mapped():
+            pass
+        answers = [(_answer(run), run.chunk.separator) for run in self.runs]
+        start = time.perf_counter()
+        try:
+            groups = self._groups(answers)
+            while len(groups) > 1:
+                if len(groups) == len(answers):
+                    tokens = sum(estimate_tokens(text, self._encoding) for text, _ in answers[:2])
+                    raise PromptTooLargeError(
+                        f"Answers too large to reduce with {self.model}: two take ~{tokens} tokens, "
+                        f"the room is {self.reduce_budget}",
+                        tokens,
+                        self.reduce_budget,
+                    )
+                with ThreadPoolExecutor(max_workers=min(self.concurrency, len(groups))) as pool:
+                    reduced = list(pool.map(lambda group: "".join(self._reduce(group)).strip(), groups))
+                self.reduce_rounds += 1
+                answers = [(text, "\n\n") for text in reduced]
+                groups = self._groups(answers)
+            self.reduce_rounds += 1
+            yield from self._reduce(groups[0])
+        finally:
+            self.reduce_seconds = time.perf_counter() - start
+
+    def report(self) -> str:
+        """Summary line, e.g. ``7 chunks of up to 1480 tokens, 4 in parallel, done in 6.1 s``."""
+        finished = [run.elapsed for run in self.runs if run.elapsed is not None]
+        parts = [
+            f"{len(self.runs)} chunks of up to {max(run.chunk.tokens for run in self.runs)} tokens",
+            f"{min(self.concurrency, len(self.runs))} in parallel",
+        ]
+        if len(finished) == len(self.runs):
+            parts.append(f"mapped in {max(finished):.1f} s")
+        if self.reduce_seconds is not None:
+            rounds = f" over {self.reduce_rounds} rounds" if self.reduce_rounds > 1 else ""
+            parts.append(f"reduced{rounds} in {self.reduce_seconds:.1f} s")
+        return ", ".join(parts)
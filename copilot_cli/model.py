@@ -0,0 +1,107 @@
+"""Pydantic models of the Copilot authentication data.
+
+Kept apart from :mod:`copilot_cli.copilot` so that building the client – and
+answering from the response cache – does not import *pydantic*; the models
+are loaded the first time a token is read or fetched.
+"""
+
+from __future__ import annotations
+
+import json
+import urllib.parse
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+from .exception.authentication_error import AuthenticationError
+
+
+class HostsData(BaseModel):
+    github_oauth_token: str
+
+    @classmethod
+    def from_file(cls, file_path: Path) -> "HostsData":
+        """Extract the OAuth token from a *github-copilot* config file.
+
+        The VS Code / Neovim Copilot extensions keep their authentication
+        state in two JSON files: *hosts.json* and *apps.json*.  The exact
+        structure is **not** documented and differs slightly depending on
+        whether the user is on the public *github.com* instance or on an
+        Enterprise installation (e.g. *github.my-corp.com*).
+
+        The previous implementation hard-coded a lookup for keys that
+        contained the substring ``"github.com"``, which prevented users of
+        Copilot Enterprise from authenticating (their host key usually is the
+        enterprise domain without ``github.com``).  The current logic gathers
+        all available tokens and:
+
+        1. Returns the GitHub.com (personal) token if present.
+        2. Otherwise returns the first token (Enterprise or otherwise).
+
+        This supports both personal and Enterprise Copilot accounts when both
+        configurations are present.
+        """
+
+        hosts_file = Path(file_path)
+        try:
+            hosts_data = json.loads(hosts_file.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):  # pragma: no cover
+            raise AuthenticationError("GitHub Copilot configuration not found or invalid.")
+
+        tokens: dict[str, str] = {}
+        for host, value in hosts_data.items():
+            # *apps.json* stores each application in a list, *hosts.json* uses
+            # a mapping – support both layouts.
+            if isinstance(value, list):
+                for element in value:
+                    if isinstance(element, dict) and (token := element.get("oauth_token")):
+                        tokens[host] = token
+                        break
+            elif isinstance(value, dict):
+                if (token := value.get("oauth_token")):
+                    tokens[host] = token
+
+        if not tokens:
+            raise AuthenticationError("OAuth token not found in GitHub Copilot configuration.")
+
+        for host, token in tokens.items():
+            try:
+                hostname = urllib.parse.urlparse(host).netloc or urllib.parse.urlparse(host).path
+            except Exception:
+                hostname = host
+            if hostname == "github.com":
+                return cls(github_oauth_token=token)
+
+        return cls(github_oauth_token=next(iter(tokens.values())))
+
+
+
+class CopilotToken(BaseModel):
+    """
+    Represents a GitHub Copilot authentication token and its associated metadata.
+    """
+
+    token: str
+    expires_at: int
+    refresh_in: int
+    endpoints: dict[str, str]
+    tracking_id: str
+    sku: str
+
+    annotations_enabled: bool
+    chat_enabled: bool
+    chat_jetbrains_enabled: bool
+    code_quote_enabled: bool
+    codesearch: bool
+    copilotignore_enabled: bool
+    individual: bool
+    prompt_8k: bool
+    snippy_load_test_enabled: bool
+    xcode: bool
+    xcode_chat: bool
+
+    public_suggestions: str
+    telemetry: str
+    enterprise_list: list[int] = Field(default_factory=list)
+
+    code_review_enabled: bool
@@ -0,0 +1,304 @@
+"""Keep-alive HTTP connection pooling for *GithubCopilotClient*.
+
+Module-level ``requests.get`` / ``requests.post`` build a throw-away
+``Session`` for every call, so each request pays for a fresh TCP (and TLS)
+handshake.  :class:`ConnectionPool` keeps **one** ``requests.Session`` per
+``scheme://host`` alive instead, with bounded per-host connection pools and
+eviction of sessions that have been idle for too long.
+
+The pool is thread-safe: sessions are looked up under a lock, and the
+underlying *urllib3* connection pools already support concurrent use.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+
+def _env_number(name: str, default: float) -> float:
+    """Read a numeric setting from the environment, ignoring bad values."""
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+class ConnectionPool:
+    """
+    Per-host pool of keep-alive ``requests`` sessions.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_maxsize: int = 10,
+        max_hosts: int = 8,
+        idle_timeout: float = 90.0,
+        pool_block: bool = False,
+    ) -> None:
+        """
+        Args:
+            pool_maxsize: Maximum number of connections kept open per host
+            max_hosts: Maximum number of hosts with a live session; the least
+                recently used one is closed when the limit is exceeded
+            idle_timeout: Seconds after which an unused session is closed
+            pool_block: Block instead of opening extra (non-pooled)
+                connections once *pool_maxsize* is reached
+        """
+        self.pool_maxsize = pool_maxsize
+        self.max_hosts = max_hosts
+        self.idle_timeout = idle_timeout
+        self.pool_block = pool_block
+
+        self._lock = threading.Lock()
+        # host key -> (session, last used monotonic timestamp)
+        self._sessions: OrderedDict[str, tuple[requests.Session, float]] = OrderedDict()
+        # host name -> address new connections go to instead of a DNS lookup
+        self._pins: dict[str, str] = {}
+
+    @classmethod
+    def from_env(cls) -> "ConnectionPool":
+        """Create a pool configured through ``COPILOT_CLI_POOL_*`` variables."""
+        return cls(
+            pool_maxsize=int(_env_number("COPILOT_CLI_POOL_SIZE", 10)),
+            max_hosts=int(_env_number("COPILOT_CLI_POOL_MAX_HOSTS", 8)),
+            idle_timeout=_env_number("COPILOT_CLI_POOL_IDLE_TIMEOUT", 90.0),
+        )
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parsed = urllib.parse.urlsplit(url)
+        return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+    def _new_session(self) -> requests.Session:
+        # *requests* is imported on first use: building a pool (or a client
+        # that never reaches the network) stays cheap.
+        import requests
+
+        session = requests.Session()
+        adapter = _pinning_adapter_class()(
+            self._pins,
+            pool_connections=1,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def pin(self, host: str, address: Optional[str]) -> None:
+        """
+        Connect to *host* at *address* from now on instead of resolving it.
+
+        Args:
+            host: Host name as it appears in URLs
+            address: IP address to use; ``None`` removes the pin
+        """
+        if address is None:
+            self._pins.pop(host.lower(), None)
+        else:
+            self._pins[host.lower()] = address
+
+    def pinned(self, host: str) -> Optional[str]:
+        """The address *host* is pinned to, if any."""
+        return self._pins.get(host.lower())
+
+    def _evict_locked(self, now: float) -> list[requests.Session]:
+        """Drop idle and surplus sessions; return them for closing."""
+        evicted: list[requests.Session] = []
+        for key in list(self._sessions):
+            session, last_used = self._sessions[key]
+            if now - last_used > self.idle_timeout:
+                del self._sessions[key]
+                evicted.append(session)
+        while len(self._sessions) > self.max_hosts:
+            _, (session, _) = self._sessions.popitem(last=False)
+            evicted.append(session)
+        return evicted
+
+    def session_for(self, url: str) -> requests.Session:
+        """
+        Return the keep-alive session responsible for the host of *url*.
+
+        Args:
+            url: Any URL on the target host
+
+        Returns:
+            A ``requests.Session`` shared by all requests to that host
+        """
+        key = self._host_key(url)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._sessions.pop(key, None)
+            if entry is not None and now - entry[1] <= self.idle_timeout:
+                session = entry[0]
+                stale = None
+            else:
+                session = self._new_session()
+                stale = entry[0] if entry is not None else None
+
+            # Re-insert at the end to keep LRU order.
+            self._sessions[key] = (session, now)
+            evicted = self._evict_locked(now)
+
+        if stale is not None:
+            evicted.append(stale)
+        for old in evicted:
+            old.close()
+
+        return session
+
+    def preconnect(self, url: str, *, timeout: float = 10.0, verify: Any = None) -> bool:
+        """
+        Open a keep-alive connection (TCP and TLS) to the host of *url* ahead
+        of the first request and park it in the session's connection pool.
+
+        The next request to that host then skips the handshake.  This is an
+        optimisation only: any failure is swallowed and the request simply
+        connects as usual.
+
+        Args:
+            url: Any URL on the target host
+            timeout: Connect timeout in seconds
+            verify: TLS verification as for ``requests``; the session's and
+                environment's setting by default
+
+        Returns:
+            Whether a connection was opened
+        """
+        import requests
+
+        session = self.session_for(url)
+        try:
+            adapter = session.get_adapter(url)
+            # Resolve proxies, CA bundle and client cert exactly as a request
+            # would, or the connection lands in a different urllib3 pool.
+            settings = session.merge_environment_settings(url, {}, None, verify, None)
+            if hasattr(adapter, "get_connection_with_tls_context"):
+                request = requests.Request("GET", url).prepare()
+                conn_pool = adapter.get_connection_with_tls_context(
+                    request, settings["verify"], proxies=settings["proxies"], cert=settings["cert"]
+                )
+            else:  # requests < 2.32
+                conn_pool = adapter.get_connection(url, settings["proxies"])
+            conn = conn_pool._get_conn(timeout=timeout)
+            try:
+                conn.timeout = timeout
+                conn.connect()
+            except BaseException:
+                conn.close()
+                conn_pool._put_conn(None)  # give the pool slot back
+                raise
+            conn_pool._put_conn(conn)
+        except Exception:
+            return False
+        return True
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a request through the pooled session of *url*'s host."""
+        return self.session_for(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def evict_idle(self) -> None:
+        """Close every session that exceeded the idle timeout."""
+        with self._lock:
+            evicted = self._evict_locked(time.monotonic())
+        for session in evicted:
+            session.close()
+
+    def hosts(self) -> list[str]:
+        """Return the hosts that currently hold a live session."""
+        with self._lock:
+            return list(self._sessions)
+
+    def close(self) -> None:
+        """Close all sessions and their pooled connections."""
+        with self._lock:
+            sessions = [session for session, _ in self._sessions.values()]
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def __enter__(self) -> "ConnectionPool":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+
+@functools.lru_cache(maxsize=None)
+def _pinning_adapter_class() -> type:
+    """The ``HTTPAdapter`` of pooled sessions, defined once *requests* is imported."""
+    from requests.adapters import HTTPAdapter
+    from requests.utils import select_proxy
+
+    class PinningAdapter(HTTPAdapter):
+        """
+        Connects pinned hosts to their address, skipping DNS.
+
+        The urllib3 pool is opened for the address, with ``server_hostname``
+        keeping SNI and certificate verification on the host name, and the
+        Host header is set to the host name.  Proxied requests are left alone.
+        Adapters of *requests* < 2.32 never pick a pool through
+        ``get_connection_with_tls_context`` and connect unpinned.
+        """
+
+        def __init__(self, pins: dict[str, str], **kwargs: Any) -> None:
+            self._pins = pins
+            super().__init__(**kwargs)
+
+        def _pinned(self, request: Any, proxies: Any) -> Optional[str]:
+            host = urllib.parse.urlsplit(request.url).hostname
+            if host is None or select_proxy(request.url, proxies):
+                return None
+            return self._pins.get(host)
+
+        def get_connection_with_tls_context(
+            self, request: Any, verify: Any, proxies: Any = None, cert: Any = None
+        ) -> Any:
+            address = self._pinned(request, proxies)
+            if address is None:
+                return super().get_connection_with_tls_context(request, verify, proxies=proxies, cert=cert)
+            host_params, pool_kwargs = self.build_connection_pool_key_attributes(request, verify, cert)
+            return self.poolmanager.connection_from_host(
+                **{**host_params, "host": address},
+                pool_kwargs={**pool_kwargs, "server_hostname": host_params["host"]},
+            )
+
+        def add_headers(self, request: Any, **kwargs: Any) -> None:
+            if self._pinned(request, kwargs.get("proxies")) is not None:
+                netloc = urllib.parse.urlsplit(request.url).netloc
+                request.headers.setdefault("Host", netloc.rpartition("@")[2])
+
+    return PinningAdapter
+
+
+_default_pool: Optional[ConnectionPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> ConnectionPool:
+    """Return the process-wide pool shared by clients created without one."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool.from_env()
+        return _default_pool
@@ -0,0 +1,222 @@
+"""Ask several models at once: race them, or fan out and compare.
+
+``--race gpt-4o,o3-mini`` sends the prompt to every model concurrently and
+streams the answer of whichever produces its first token soonest; the other
+streams are cancelled and their connections closed (see
+:mod:`copilot_cli.cancel`).  ``--fan-out`` waits for every answer and shows
+them side by side.  Both record each model's time to first token.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from .cancel import Cancellation
+
+if TYPE_CHECKING:
+    from .copilot import GithubCopilotClient
+
+_DONE = object()
+
+
+def parse_models(value: str) -> list[str]:
+    """Split a comma-separated model list, dropping blanks and duplicates."""
+    return list(dict.fromkeys(model.strip() for model in value.split(",") if model.strip()))
+
+
+@dataclass
+class ModelRun:
+    """One model's answer and timings within a race or fan-out."""
+
+    model: str
+    chunks: list[str] = field(default_factory=list)
+    ttft: Optional[float] = None
+    elapsed: Optional[float] = None
+    error: Optional[BaseException] = None
+    cancelled: bool = False
+
+    @property
+    def content(self) -> str:
+        return "".join(self.chunks)
+
+    def describe(self) -> str:
+        """Timings and outcome, e.g. ``first token 412 ms, done in 1.9 s``."""
+        parts = []
+        if self.ttft is not None:
+            parts.append(f"first token {self.ttft * 1000:.0f} ms")
+        if self.error is not None:
+            parts.append(f"failed: {self.error}")
+        elif self.cancelled:
+            parts.append("cancelled" if self.ttft is not None else "cancelled before the first token")
+        elif self.elapsed is not None:
+            parts.append(f"done in {self.elapsed:.1f} s")
+        return ", ".join(parts)
+
+
+class _Runner:
+    """Streams the prompt to every model on its own thread, into one queue."""
+
+    def __init__(
+        self,
+        client: GithubCopilotClient,
+        models: list[str],
+        prompt: str,
+        system_prompt: str,
+        cache_ttl: Optional[float],
+    ) -> None:
+        if not models:
+            raise ValueError("At least one model is required")
+        self.runs = [ModelRun(model) for model in models]
+        self._cancels = [Cancellation() for _ in models]
+        self._queue: queue.Queue[tuple[int, object]] = queue.Queue()
+        self._start = time.perf_counter()
+        self._threads = [
+            threading.Thread(
+                target=self._stream,
+                args=(index, client, prompt, system_prompt, cache_ttl),
+                name=f"copilot-{run.model}",
+                daemon=True,
+            )
+            for index, run in enumerate(self.runs)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _stream(
+        self,
+        index: int,
+        client: GithubCopilotClient,
+        prompt: str,
+        system_prompt: str,
+        cache_ttl: Optional[float],
+    ) -> None:
+        run, cancel = self.runs[index], self._cancels[index]
+        try:
+            for chunk in client.stream_chat_completion(
+                prompt, run.model, system_prompt, cache_ttl=cache_ttl, cancel=cancel
+            ):
+                if not chunk:
+                    continue
+                if run.ttft is None:
+                    run.ttft = time.perf_counter() - self._start
+                self._queue.put((index, chunk))
+        except Exception as e:  # reported per model; the caller decides whether it is fatal
+            if not cancel.is_set():
+                run.error = e
+        finally:
+            run.cancelled = cancel.is_set()
+            run.elapsed = time.perf_counter() - self._start
+            self._queue.put((index, _DONE))
+
+    def cancel(self, index: int) -> None:
+        if self.runs[index].elapsed is None:
+            self.runs[index].cancelled = True
+        self._cancels[index].cancel()
+
+    def next(self) -> tuple[int, object]:
+        return self._queue.get()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the model threads, cancelled ones included, to finish."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+
+class Race:
+    """
+    Iterate over the chunks of the first model to produce a token.
+
+    Every model whose first token comes later is cancelled as soon as the
+    winner is known.  Iterating raises the first model's error only when no
+    model produced a token at all.
+    """
+
+    def __init__(
+        self,
+        client: GithubCopilotClient,
+        models: list[str],
+        prompt: str,
+        system_prompt: str,
+        *,
+        cache_ttl: Optional[float] = None,
+    ) -> None:
+        self._runner = _Runner(client, models, prompt, system_prompt, cache_ttl)
+        self.runs = self._runner.runs
+        self.winner: Optional[ModelRun] = None
+
+    def __iter__(self) -> Iterator[str]:
+        runner = self._runner
+        winner: Optional[int] = None
+        pending = len(self.runs)
+        try:
+            while pending:
+                index, item = runner.next()
+                if item is _DONE:
+                    pending -= 1
+                    if index == winner:
+                        return
+                    continue
+                if winner is None:
+                    winner = index
+                    self.winner = self.runs[index]
+                    for other in range(len(self.runs)):
+                        if other != index:
+                            runner.cancel(other)
+                if index == winner:
+                    self.runs[index].chunks.append(item)  # type: ignore[arg-type]
+                    yield item  # type: ignore[misc]
+            errors = [run.error for run in self.runs if run.error is not None]
+            if winner is None and errors:
+                raise errors[0]
+        finally:
+            # Also stops the winner when the consumer gives up early.
+            for index in range(len(self.runs)):
+                runner.cancel(index)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._runner.join(timeout)
+
+    def report(self) -> list[str]:
+        """One line per model, the winner first."""
+        ordered = sorted(self.runs, key=lambda run: run is not self.winner)
+        return [f"{run.model}{' (winner)' if run is self.winner else ''}: {run.describe()}" for run in ordered]
+
+
+def fan_out(
+    client: GithubCopilotClient,
+    models: list[str],
+    prompt: str,
+    system_prompt: str,
+    *,
+    cache_ttl: Optional[float] = None,
+) -> list[ModelRun]:
+    """
+    Ask every model concurrently and wait for all answers.
+
+    Returns:
+        One run per model, in the order given; failed models carry ``error``
+    """
+    runner = _Runner(client, models, prompt, system_prompt, cache_ttl)
+    pending = len(models)
+    while pending:
+        index, item = runner.next()
+        if item is _DONE:
+            pending -= 1
+        else:
+            runner.runs[index].chunks.append(item)  # type: ignore[arg-type]
+    return runner.runs
+
+
+def format_fan_out(runs: list[ModelRun]) -> str:
+    """Markdown with one section per model, headed by its timings."""
+    sections = []
+    for run in runs:
+        header = f"### {run.model}\n_{run.describe()}_\n"
+        sections.append(header if run.error is not None else f"{header}\n{run.content.strip()}\n")
+    return "\n".join(sections)
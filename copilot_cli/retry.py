@@ -0,0 +1,140 @@
+"""Retry policy for Copilot HTTP requests.
+
+Transient failures – connection resets, timeouts, ``429 Too Many Requests``
+and ``5xx`` gateway errors – are retried with exponential backoff and full
+jitter, honouring the server's ``Retry-After`` header.  Everything else
+(bad requests, permission errors, …) is fatal and surfaces immediately.
+
+The total time spent waiting is capped by a retry *budget* so a struggling
+endpoint can never hold a CLI invocation hostage.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+def status_of(error: BaseException) -> Optional[int]:
+    """Return the HTTP status attached to *error*, if any."""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        status = getattr(error, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """
+    Parse the ``Retry-After`` header of the response attached to *error*.
+
+    Returns:
+        Seconds to wait, or ``None`` when the header is absent or invalid
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    from email.utils import parsedate_to_datetime
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Classify *error* as transient (``True``) or fatal (``False``)."""
+    from requests.exceptions import ChunkedEncodingError, ConnectionError, HTTPError, Timeout
+
+    if isinstance(error, HTTPError):
+        return status_of(error) in RETRYABLE_STATUS
+    return isinstance(error, (ConnectionError, Timeout, ChunkedEncodingError))
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter and a total retry budget.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        budget: float = 20.0,
+    ) -> None:
+        """
+        Args:
+            max_attempts: Total number of tries, including the first one
+            base_delay: Backoff ceiling of the first retry, doubled each time
+            max_delay: Upper bound of a single computed backoff
+            budget: Maximum seconds spent across all attempts and waits
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def next_delay(self, attempt: int, error: BaseException, elapsed: float) -> Optional[float]:
+        """
+        Decide whether and when to retry after a failed attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first failure)
+            error: The exception raised by the last attempt
+            elapsed: Seconds since the first attempt started
+
+        Returns:
+            Seconds to sleep before the next attempt, or ``None`` to give up
+        """
+        if attempt >= self.max_attempts or not is_retryable(error):
+            return None
+
+        server_delay = retry_after(error)
+        if server_delay is not None:
+            delay = server_delay
+        else:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+        if elapsed + delay > self.budget:
+            return None
+        return delay
+
+    def call(self, fn: Callable[[], T], *, sleep: Callable[[float], None] = time.sleep) -> T:
+        """
+        Run *fn*, retrying transient failures according to the policy.
+
+        Raises:
+            Exception: The last error once retries are exhausted or fatal
+        """
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return fn()
+            except Exception as e:
+                attempt += 1
+                delay = self.next_delay(attempt, e, time.monotonic() - start)
+                if delay is None:
+                    raise
+                sleep(delay)
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
@@ -0,0 +1,297 @@
+"""Token-budget-aware shaping of command output before it reaches the model.
+
+A staged refactor easily yields a ``$diff`` far beyond the model's context:
+the request then fails, or spends seconds uploading input the model
+truncates anyway.  Diff outputs are trimmed to a token budget in order of
+decreasing expendability, stopping as soon as the prompt fits:
+
+1. lockfiles, generated files and binary patches are replaced by a one-line
+   note,
+2. hunks that only change whitespace are collapsed,
+3. hunks are cut – every file keeps its header, and the remaining budget is
+   shared fairly between files (small files are kept whole, large ones are
+   cut), each cut marked in the text.
+
+Everything that was dropped is recorded in a :class:`ShapeReport` so the
+user learns what the model did *not* see.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import functools
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Callable
+
+from .template import Template
+from .tokens import estimate_tokens
+
+Estimator = Callable[[str], int]
+
+LOCKFILES = frozenset(
+    {
+        "package-lock.json",
+        "npm-shrinkwrap.json",
+        "yarn.lock",
+        "pnpm-lock.yaml",
+        "bun.lockb",
+        "Cargo.lock",
+        "poetry.lock",
+        "Pipfile.lock",
+        "uv.lock",
+        "composer.lock",
+        "Gemfile.lock",
+        "go.sum",
+        "flake.lock",
+        "packages.lock.json",
+    }
+)
+GENERATED_PATTERNS = (
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*_pb2.py",
+    "*_pb2_grpc.py",
+    "*.pb.go",
+    "*.generated.*",
+    "*.g.dart",
+    "dist/*",
+    "build/*",
+    "vendor/*",
+    "node_modules/*",
+    "*/dist/*",
+    "*/vendor/*",
+    "*/node_modules/*",
+)
+# Marker tools put at the top of generated files.
+_GENERATED_MARKER = re.compile(r"@generated|DO NOT EDIT|auto-generated", re.IGNORECASE)
+_DIFF_START = re.compile(r"^diff --git ", re.MULTILINE)
+_DIFF_PATH = re.compile(r"^diff --git a/(.*) b/(.*)$")
+
+
+@dataclass
+class FileDiff:
+    """The part of a ``git diff`` that concerns one file."""
+
+    path: str
+    header: list[str]
+    hunks: list[list[str]]
+
+    @property
+    def binary(self) -> bool:
+        return any(line.startswith(("Binary files ", "GIT binary patch")) for line in self.header)
+
+    def text(self) -> str:
+        return "".join(self.header) + "".join(line for hunk in self.hunks for line in hunk)
+
+
+@dataclass
+class ShapeReport:
+    """What was removed from one command output to fit the budget."""
+
+    key: str
+    budget: int
+    tokens_before: int
+    tokens_after: int = 0
+    dropped: list[tuple[str, str]] = field(default_factory=list)
+    whitespace: list[str] = field(default_factory=list)
+    truncated: list[tuple[str, int]] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.dropped or self.whitespace or self.truncated)
+
+    def summary(self) -> str:
+        """One-line description for the user."""
+        parts = []
+        if self.dropped:
+            parts.append("dropped " + ", ".join(f"{path} ({reason})" for path, reason in self.dropped))
+        if self.whitespace:
+            parts.append(f"collapsed whitespace-only changes in {len(self.whitespace)} file(s)")
+        if self.truncated:
+            lines = sum(count for _, count in self.truncated)
+            parts.append(f"cut {lines} line(s) from {len(self.truncated)} file(s)")
+        return (
+            f"${self.key} trimmed from ~{self.tokens_before} to ~{self.tokens_after} tokens "
+            f"(budget ~{self.budget}): " + "; ".join(parts)
+        )
+
+
+def is_diff(text: str) -> bool:
+    """Whether *text* looks like ``git diff`` output."""
+    return _DIFF_START.search(text) is not None
+
+
+def parse_diff(text: str) -> tuple[str, list[FileDiff]]:
+    """
+    Split ``git diff`` output into files and hunks.
+
+    Returns:
+        Text before the first file (if any) and the per-file diffs
+    """
+    preamble: list[str] = []
+    files: list[FileDiff] = []
+    for line in text.splitlines(keepends=True):
+        if line.startswith("diff --git "):
+            match = _DIFF_PATH.match(line.rstrip("\n"))
+            files.append(FileDiff(match.group(2) if match else line[11:].strip(), [line], []))
+        elif not files:
+            preamble.append(line)
+        elif line.startswith("@@") and not files[-1].binary:
+            files[-1].hunks.append([line])
+        elif files[-1].hunks:
+            files[-1].hunks[-1].append(line)
+        else:
+            files[-1].header.append(line)
+    return "".join(preamble), files
+
+
+def _expendable(diff: FileDiff) -> str:
+    """Why *diff* can be dropped first, or ``""`` if it cannot."""
+    name = diff.path.rsplit("/", 1)[-1]
+    if diff.binary:
+        return "binary"
+    if name in LOCKFILES:
+        return "lockfile"
+    if any(fnmatch.fnmatch(diff.path, pattern) for pattern in GENERATED_PATTERNS):
+        return "generated"
+    head = "".join(diff.hunks[0][:6]) if diff.hunks else ""
+    if _GENERATED_MARKER.search(head):
+        return "generated"
+    return ""
+
+
+def _whitespace_only(hunk: list[str]) -> bool:
+    removed = "".join(line[1:] for line in hunk[1:] if line.startswith("-"))
+    added = "".join(line[1:] for line in hunk[1:] if line.startswith("+"))
+    return bool(removed or added) and "".join(removed.split()) == "".join(added.split())
+
+
+def _cut(diff: FileDiff, share: int, estimate: Estimator) -> int:
+    """Cut the hunks of *diff* to about *share* tokens; return the lines removed."""
+    kept: list[list[str]] = []
+    used = 0
+    omitted = 0
+    for hunk in diff.hunks:
+        if omitted:
+            omitted += len(hunk)
+            continue
+        cost = estimate("".join(hunk))
+        if used + cost <= share:
+            kept.append(hunk)
+            used += cost
+            continue
+        partial: list[str] = []
+        for index, line in enumerate(hunk):
+            line_cost = estimate(line)
+            if used + line_cost > share:
+                omitted += len(hunk) - index
+                break
+            partial.append(line)
+            used += line_cost
+        if partial:
+            kept.append(partial)
+    if omitted:
+        kept.append([f"[... {omitted} more diff line(s) omitted to fit the context ...]\n"])
+        diff.hunks = kept
+    return omitted
+
+
+def shape_diff(key: str, text: str, budget: int, estimate: Estimator = estimate_tokens) -> tuple[str, ShapeReport]:
+    """
+    Trim a ``git diff`` to about *budget* tokens.
+
+    Args:
+        key: Placeholder name, for the report
+        text: The diff
+        budget: Tokens the diff may use
+        estimate: Token estimator
+
+    Returns:
+        The (possibly) shaped diff and a report of what was removed
+    """
+    # Headers and hunks are measured again after every step; count each once.
+    estimate = functools.lru_cache(maxsize=None)(estimate)
+    report = ShapeReport(key, budget, estimate(text))
+    if report.tokens_before <= budget:
+        report.tokens_after = report.tokens_before
+        return text, report
+
+    preamble, files = parse_diff(text)
+
+    def total() -> int:
+        return estimate(preamble) + sum(estimate(diff.text()) for diff in files)
+
+    # 1. Lockfiles, generated and binary files.
+    for diff in files:
+        reason = _expendable(diff)
+        if reason:
+            lines = sum(len(hunk) for hunk in diff.hunks) + len(diff.header) - 1
+            diff.header = [diff.header[0], f"[{reason} file changed, {lines} diff line(s) omitted]\n"]
+            diff.hunks = []
+            report.dropped.append((diff.path, reason))
+
+    # 2. Whitespace-only hunks.
+    if total() > budget:
+        for diff in files:
+            collapsed = False
+            for index, hunk in enumerate(diff.hunks):
+                if len(hunk) > 2 and _whitespace_only(hunk):
+                    diff.hunks[index] = [hunk[0], "[whitespace-only changes omitted]\n"]
+                    collapsed = True
+            if collapsed:
+                report.whitespace.append(diff.path)
+
+    # 3. Cut hunks, sharing the budget fairly and keeping every header.
+    if total() > budget:
+        remaining = budget - estimate(preamble) - sum(estimate("".join(diff.header)) for diff in files)
+        by_size = sorted(files, key=lambda d: sum(estimate("".join(hunk)) for hunk in d.hunks))
+        for position, diff in enumerate(by_size):
+            share = max(0, remaining) // (len(by_size) - position)
+            omitted = _cut(diff, share, estimate)
+            if omitted:
+                report.truncated.append((diff.path, omitted))
+            remaining -= sum(estimate("".join(hunk)) for hunk in diff.hunks)
+
+    shaped = preamble + "".join(diff.text() for diff in files)
+    report.tokens_after = estimate(shaped)
+    return shaped, report
+
+
+def fit_outputs(
+    template: Template,
+    values: Mapping[str, str],
+    budget: int,
+    estimate: Estimator = estimate_tokens,
+) -> tuple[dict[str, str], list[ShapeReport]]:
+    """
+    Shape the diff outputs among *values* so *template* renders within *budget*.
+
+    Text outside the diffs (the prompt itself, other outputs) is counted as
+    fixed; what is left of the budget is split between the diffs in
+    proportion to their size.
+
+    Returns:
+        The values to render with, and one report per shaped diff
+    """
+    diffs = [key for key in template.names if key in values and is_diff(values[key])]
+    if not diffs:
+        return dict(values), []
+
+    fixed = estimate(template.render({**values, **dict.fromkeys(diffs, "")}))
+    sizes = {key: estimate(values[key]) for key in diffs}
+    available = max(0, budget - fixed)
+    if sum(sizes.values()) <= available:
+        return dict(values), []
+
+    shaped = dict(values)
+    reports = []
+    total = sum(sizes.values()) or 1
+    for key in diffs:
+        share = available * sizes[key] // total
+        shaped[key], report = shape_diff(key, values[key], share, estimate)
+        if report.changed:
+            reports.append(report)
+    return shaped, reports
@@ -0,0 +1,216 @@
+"""Incremental Server-Sent Events decoding for streamed chat completions.
+
+``response.iter_lines()`` + ``json.loads`` per ``data:`` line ignores the
+SSE framing rules (multi-line ``data``, ``event:``/``id:`` fields, ``\\r\\n``
+and ``\\r`` line endings) and decodes a full JSON document for every few
+characters of output.  This module replaces it with:
+
+* :class:`SSEDecoder` – a push parser fed with raw byte chunks as they come
+  off the socket.  Lines are cut from a single reusable ``bytearray``; events
+  may be split across reads at any byte.
+* :func:`iter_deltas` – turns the events of a chat completion stream into
+  ``delta.content`` strings.  Payloads in the canonical
+  ``{"choices":[{..."delta":{"content":"..."}`` shape are sliced out without
+  a JSON decode when the text contains no escapes; everything else falls
+  back to :func:`json.loads`.  Optionally all deltas that arrived in the same
+  network read are coalesced into one string.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple, Optional
+
+from .exception.api_error import APIError
+
+
+class SSEEvent(NamedTuple):
+    """A dispatched Server-Sent Event."""
+
+    event: str
+    data: str
+    id: Optional[str]
+
+
+class SSEDecoder:
+    """
+    Push parser for ``text/event-stream`` bodies.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._data: list[bytes] = []
+        self._event = b""
+        self._last_id: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> list[SSEEvent]:
+        """
+        Consume *chunk* and return every event completed by it.
+
+        Args:
+            chunk: The next bytes of the stream, split at arbitrary offsets
+        """
+        return [self._to_event(event, data) for event, data in self.feed_raw(chunk)]
+
+    def flush(self) -> list[SSEEvent]:
+        """Dispatch a trailing event that was not terminated by a blank line."""
+        return [self._to_event(event, data) for event, data in self.flush_raw()]
+
+    def feed_raw(self, chunk: bytes) -> list[tuple[bytes, bytes]]:
+        """Like :meth:`feed`, but return undecoded ``(event, data)`` pairs."""
+        buffer = self._buffer
+        buffer += chunk
+        if b"\r" in buffer:
+            # Normalise CRLF / CR line endings.  A trailing CR may be the
+            # first half of a CRLF pair, so it waits for the next chunk.
+            held = buffer.endswith(b"\r")
+            if held:
+                del buffer[-1]
+            buffer[:] = buffer.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+            if held:
+                buffer += b"\r"
+
+        end = buffer.rfind(b"\n")
+        if end < 0:
+            return []
+        lines = bytes(buffer[:end]).split(b"\n")
+        del buffer[: end + 1]
+
+        events: list[tuple[bytes, bytes]] = []
+        data = self._data
+        for line in lines:
+            if line.startswith(b"data:"):
+                # Hot path: one "data:" line per event.
+                data.append(line[6:] if line[5:6] == b" " else line[5:])
+            elif line:
+                self._process_line(line)
+            elif data:
+                events.append((self._event, data[0] if len(data) == 1 else b"\n".join(data)))
+                data.clear()
+                self._event = b""
+            else:
+                self._event = b""
+        return events
+
+    def flush_raw(self) -> list[tuple[bytes, bytes]]:
+        """Like :meth:`flush`, but return undecoded ``(event, data)`` pairs."""
+        tail = bytes(self._buffer.rstrip(b"\r"))
+        self._buffer.clear()
+        if tail:
+            self.feed_raw(tail + b"\n")
+        if not self._data:
+            return []
+        event = (self._event, b"\n".join(self._data))
+        self._data.clear()
+        self._event = b""
+        return [event]
+
+    def _process_line(self, line: bytes) -> None:
+        if line[0] == 0x3A:  # ":" – comment / keep-alive
+            return
+        name, sep, value = line.partition(b":")
+        if sep and value[:1] == b" ":
+            value = value[1:]
+        if name == b"data":
+            self._data.append(value)
+        elif name == b"event":
+            self._event = value
+        elif name == b"id" and b"\0" not in value:
+            self._last_id = value.decode("utf-8", "replace")
+        # "retry" and unknown fields are ignored.
+
+    def _to_event(self, event: bytes, data: bytes) -> SSEEvent:
+        return SSEEvent(event.decode("utf-8", "replace") or "message", data.decode("utf-8", "replace"), self._last_id)
+
+
+_CANONICAL_START = b'{"choices":[{'
+_FAST_PREFIX = b'"delta":{"content":"'
+_FAST_PREFIX_LEN = len(_FAST_PREFIX)
+
+
+def _fast_content(data: bytes) -> Optional[str]:
+    """Slice ``delta.content`` out of a canonical payload without decoding JSON.
+
+    Returns ``None`` whenever the payload does not match the expected shape
+    exactly or the content contains escape sequences.
+    """
+    if not data.startswith(_CANONICAL_START):
+        return None
+    start = data.find(_FAST_PREFIX)
+    if start < 0:
+        return None
+    start += _FAST_PREFIX_LEN
+    end = data.find(b'"', start)
+    if end < 0:
+        return None
+    content = data[start:end]
+    if b"\\" in content:
+        return None
+    return content.decode("utf-8", "replace")
+
+
+def _decode_content(data: bytes) -> Optional[str]:
+    """Extract ``delta.content`` from a payload via a full JSON decode."""
+    try:
+        chunk = json.loads(data)
+    except json.JSONDecodeError as e:
+        raise APIError(f"Malformed stream payload: {e}") from e
+
+    if isinstance(chunk, dict) and chunk.get("error"):
+        raise APIError(f"Stream error: {chunk['error']}")
+
+    choices = chunk.get("choices") if isinstance(chunk, dict) else None
+    if choices and isinstance(choices[0], dict):
+        delta = choices[0].get("delta") or {}
+        content = delta.get("content")
+        if isinstance(content, str):
+            return content
+    return None
+
+
+def iter_deltas(chunks: Iterable[bytes], *, coalesce: bool = False) -> Iterator[str]:
+    """
+    Decode a chat completion event stream into content deltas.
+
+    Args:
+        chunks: Raw body chunks, e.g. ``response.iter_content(chunk_size=None)``
+        coalesce: Join all deltas completed by one network read into a
+            single string – fewer, larger yields at no extra latency
+
+    Yields:
+        Non-empty ``delta.content`` strings, in order
+
+    Raises:
+        APIError: If the stream carries an error event or malformed JSON
+    """
+    decoder = SSEDecoder()
+
+    def _contents(events: list[tuple[bytes, bytes]]) -> tuple[list[str], bool]:
+        contents: list[str] = []
+        for event, data in events:
+            if event == b"error":
+                raise APIError(f"Stream error: {data.decode('utf-8', 'replace')}")
+            if data == b"[DONE]":
+                return contents, True
+            content = _fast_content(data)
+            if content is None:
+                content = _decode_content(data)
+            if content:
+                contents.append(content)
+        return contents, False
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        contents, done = _contents(decoder.feed_raw(chunk))
+        if contents:
+            if coalesce:
+                yield "".join(contents)
+            else:
+                yield from contents
+        if done:
+            return
+
+    contents, _ = _contents(decoder.flush_raw())
+    yield from contents
@@ -0,0 +1,136 @@
+"""Split streamed markdown into completed top-level blocks.
+
+Re-parsing the whole answer on every chunk makes rendering O(n²).  The
+:class:`BlockSplitter` consumes the stream incrementally and hands back each
+top-level block (paragraph, heading, list, closed code fence, table, …) as
+soon as nothing that follows can change how it renders, so the caller can
+render it once and forget about it.  Only the trailing open block has to be
+re-rendered while the answer is still arriving.
+
+The rules are deliberately conservative – a block is only frozen when
+
+* a closing code fence line is complete,
+* an ATX heading line is complete, or
+* a non-blank line follows a blank line and cannot continue the open block
+  (list items and their indented continuations, indented code), or a new
+  code fence / heading starts.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+_FENCE = re.compile(r" {0,3}(`{3,}|~{3,})")
+_HEADING = re.compile(r" {0,3}#{1,6}(?:[ \t]|$)")
+_LIST_ITEM = re.compile(r" {0,3}(?:[-+*]|\d{1,9}[.)])(?:[ \t]|$)")
+_INDENTED_CODE = re.compile(r"(?: {4}|\t)")
+
+
+def _is_fence_close(line: str, marker: str) -> bool:
+    stripped = line.strip()
+    return len(line) - len(line.lstrip(" ")) < 4 and stripped.startswith(marker) and not stripped.strip(marker[0])
+
+
+class BlockSplitter:
+    """
+    Incrementally cut markdown text into completed top-level blocks.
+    """
+
+    def __init__(self) -> None:
+        self._partial: list[str] = []
+        self._lines: list[str] = []
+        self._fence: Optional[str] = None
+        self._fence_nested = False
+        self._blank = False
+
+    @property
+    def tail(self) -> str:
+        """The open block that may still change, including a partial last line."""
+        return "".join(self._lines) + "".join(self._partial)
+
+    def feed(self, chunk: str) -> list[str]:
+        """
+        Consume *chunk* and return the blocks it completed, in order.
+
+        Args:
+            chunk: The next piece of the markdown stream, split anywhere
+        """
+        if "\n" not in chunk:
+            if chunk:
+                self._partial.append(chunk)
+            return []
+
+        pieces = chunk.split("\n")
+        pieces[0] = "".join(self._partial) + pieces[0]
+        rest = pieces.pop()
+        self._partial = [rest] if rest else []
+
+        frozen: list[str] = []
+        for line in pieces:
+            self._add_line(line + "\n", frozen)
+        return frozen
+
+    def flush(self) -> str:
+        """Return the remaining open block and reset the splitter."""
+        tail = self.tail
+        self._partial = []
+        self._lines = []
+        self._fence = None
+        self._fence_nested = False
+        self._blank = False
+        return tail
+
+    def _freeze(self, frozen: list[str]) -> None:
+        if self._lines:
+            frozen.append("".join(self._lines))
+        self._lines = []
+        self._blank = False
+
+    def _continues_block(self, line: str) -> bool:
+        """Whether *line*, following a blank line, still belongs to the open block."""
+        first = self._lines[0]
+        if _LIST_ITEM.match(first):
+            return line[:1] in (" ", "\t") or bool(_LIST_ITEM.match(line))
+        if _INDENTED_CODE.match(first):
+            return bool(_INDENTED_CODE.match(line))
+        return False
+
+    def _add_line(self, line: str, frozen: list[str]) -> None:
+        if self._fence is not None:
+            self._lines.append(line)
+            if _is_fence_close(line, self._fence):
+                self._fence = None
+                if not self._fence_nested:
+                    self._freeze(frozen)
+            return
+
+        if not line.strip():
+            if self._lines:
+                self._lines.append(line)
+                self._blank = True
+            return
+
+        if self._blank and not self._continues_block(line):
+            self._freeze(frozen)
+        self._blank = False
+
+        # Indented lines inside a list belong to the current item.
+        nested = bool(self._lines) and line[:1] in (" ", "\t") and _LIST_ITEM.match(self._lines[0]) is not None
+
+        fence = _FENCE.match(line)
+        if fence:
+            if not nested:
+                self._freeze(frozen)
+            self._fence = fence.group(1)
+            self._fence_nested = nested
+            self._lines.append(line)
+            return
+
+        if not nested and _HEADING.match(line):
+            self._freeze(frozen)
+            self._lines.append(line)
+            self._freeze(frozen)
+            return
+
+        self._lines.append(line)
@@ -1,21 +1,46 @@
+import threading
+import time
 from collections.abc import Iterator
 from typing import Any, TypeAlias
 
-from rich.console import Console, ConsoleOptions
+from rich.console import Console, ConsoleOptions, Group, RenderableType, RenderResult
 from rich.live import Live
 from rich.markdown import Markdown
+from rich.padding import Padding
+from rich.segment import Segment
 from rich.text import Text
 
+from .blocks import BlockSplitter
+from .scheduler import RenderScheduler
+
 StreamOptions: TypeAlias = dict[str, Any]
 
 
+class _BlockMarkdown(Markdown):
+    """
+    Markdown for a single top-level block.
+
+    Rich starts some elements (lists, tables) with a blank line of their own;
+    the streamer spaces blocks itself, so that line is dropped.
+    """
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        segments = iter(super().__rich_console__(console, options))
+        first = next(segments, None)
+        if first is not None and first != Segment.line():
+            yield first
+        yield from segments
+
+
 class MarkdownStreamer:
     """
     A class to handle streaming markdown content with Rich.
+
+    Completed top-level blocks are rendered once and printed above the live
+    region; only the trailing open block is re-rendered as chunks arrive.
     """
 
     console: Console
-    content: str
 
     def __init__(self, *, color_system: str = "auto", markup: bool = True, highlight: bool = True) -> None:
         """
@@ -27,7 +52,12 @@ class MarkdownStreamer:
             highlight: Whether to enable syntax highlighting
         """
         self.console = Console(color_system=color_system, markup=markup, highlight=highlight)
-        self.content = ""
+        self._chunks: list[str] = []
+
+    @property
+    def content(self) -> str:
+        """The accumulated content as a string."""
+        return "".join(self._chunks)
 
     def get_console_options(self) -> ConsoleOptions:
         """
@@ -51,34 +81,82 @@ class MarkdownStreamer:
         """
         Stream markdown content without screen clearing or flashing.
 
+        Chunks are batched into frames by a :class:`RenderScheduler`; the
+        frame rate drops below *refresh_rate* when rendering gets expensive,
+        and the final state is always rendered.
+
         Args:
             iterator: An iterator yielding markdown content chunks
-            refresh_rate: Number of refreshes per second
+            refresh_rate: Maximum number of refreshes per second
             vertical_overflow: How to handle content that exceeds the terminal height
                              ("visible", "crop", "ellipsis", or "fold")
         """
+        scheduler = RenderScheduler(max_fps=refresh_rate)
+        splitter = BlockSplitter()
+        pending: list[str] = []
+        printed = False
+        dirty = False
+        lock = threading.Lock()
+        stop = threading.Event()
+
         with Live(
             console=self.console,
-            refresh_per_second=refresh_rate,
-            auto_refresh=True,
+            auto_refresh=False,
             vertical_overflow=vertical_overflow,
             transient=False,  # Ensures content remains after streaming ends
         ) as live:
-            live.update(Markdown(""))
-
-            # Stream and update content
-            for chunk in iterator:
-                self.content += chunk
-                try:
-                    md = Markdown(self.content)
-                    live.update(md)
-                except Exception:
-                    # If markdown parsing fails (incomplete markdown), show as plain text
-                    live.update(Text(self.content))
+
+            def draw(tail: str) -> None:
+                nonlocal printed, dirty
+                start = time.perf_counter()
+                blocks = [self._render(block, spaced=printed or i > 0) for i, block in enumerate(pending)]
+                printed = printed or bool(blocks)
+                pending.clear()
+                live.update(self._render(tail, spaced=printed), refresh=not blocks)
+                if blocks:
+                    # Completed blocks are rendered once, above the live
+                    # region, and never again.  Printing also repaints it.
+                    live.console.print(Group(*blocks))
+                dirty = False
+                scheduler.rendered(time.perf_counter() - start, (self.console.width, self.console.height))
+
+            def flush_stalled() -> None:
+                # Render batched chunks when the stream pauses between frames.
+                while not stop.wait(scheduler.interval):
+                    with lock:
+                        if dirty and scheduler.due():
+                            draw(splitter.tail)
+
+            ticker = threading.Thread(target=flush_stalled, daemon=True)
+            ticker.start()
+            try:
+                for chunk in iterator:
+                    with lock:
+                        self._chunks.append(chunk)
+                        pending.extend(splitter.feed(chunk))
+                        dirty = True
+                        if scheduler.due():
+                            draw(splitter.tail)
+            finally:
+                stop.set()
+                ticker.join()
+                draw(splitter.flush())
+
+    @staticmethod
+    def _render(markdown: str, *, spaced: bool) -> RenderableType:
+        """Render one block, separated from the previous one like a single document would be."""
+        if not markdown.strip():
+            return Text("")
+        try:
+            renderable: RenderableType = _BlockMarkdown(markdown)
+        except Exception:
+            # If markdown parsing fails (incomplete markdown), show as plain text
+            renderable = Text(markdown)
+        return Padding(renderable, (1, 0, 0, 0)) if spaced else renderable
 
     def clear_content(self) -> None:
         """Clear the current content buffer."""
-        self.content = ""
+        self._chunks = []
 
     def get_content(self) -> str:
         """
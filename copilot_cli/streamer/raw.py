@@ -0,0 +1,77 @@
+"""Plain-text output backend for pipes and other non-TTY consumers.
+
+Tools like lazygit, editors and shell pipelines want the answer as bytes on
+stdout, not a Rich ``Live`` region full of cursor movement.  The
+:class:`RawStreamer` writes every delta straight to (buffered) stdout and only
+flushes where its flush policy says so.  It deliberately imports nothing but
+the standard library – in particular not ``rich``.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Iterator
+from typing import Any, Optional, TextIO
+
+FLUSH_POLICIES = ("chunk", "line", "end")
+
+
+class RawStreamer:
+    """
+    Write streamed chunks verbatim to a text stream.
+    """
+
+    def __init__(self, file: Optional[TextIO] = None, *, flush: str = "line") -> None:
+        """
+        Args:
+            file: Destination stream, ``sys.stdout`` at the time of streaming by default
+            flush: When to flush – after every ``"chunk"``, after chunks that
+                complete a ``"line"``, or only at the ``"end"`` of the stream
+        """
+        if flush not in FLUSH_POLICIES:
+            raise ValueError(f"Unknown flush policy {flush!r}, expected one of {', '.join(FLUSH_POLICIES)}")
+        self.file = file
+        self.flush = flush
+        self._chunks: list[str] = []
+
+    def set_console_options(self, **_options: Any) -> None:
+        """Accepted for compatibility with :class:`MarkdownStreamer`; raw output has no console."""
+
+    def stream(self, iterator: Iterator[str], **_options: Any) -> None:
+        """
+        Write the chunks of *iterator* as they arrive.
+
+        A trailing newline is added when the answer does not end with one.
+
+        Args:
+            iterator: An iterator yielding content chunks
+        """
+        out = self.file or sys.stdout
+        write = out.write
+        last = ""
+        try:
+            for chunk in iterator:
+                if not chunk:
+                    continue
+                self._chunks.append(chunk)
+                write(chunk)
+                last = chunk
+                if self.flush == "chunk" or (self.flush == "line" and "\n" in chunk):
+                    out.flush()
+        finally:
+            if last and not last.endswith("\n"):
+                write("\n")
+            out.flush()
+
+    def clear_content(self) -> None:
+        """Clear the current content buffer."""
+        self._chunks = []
+
+    def get_content(self) -> str:
+        """
+        Get the current content.
+
+        Returns:
+            The accumulated content as a string
+        """
+        return "".join(self._chunks)
@@ -0,0 +1,72 @@
+"""Frame scheduling for streamed output.
+
+Chunks can arrive far faster than a terminal needs to be repainted.  The
+:class:`RenderScheduler` batches them: the caller asks :meth:`due` after
+every chunk and only renders when a frame is due, then reports how long the
+render took.  The frame interval adapts to that cost so rendering never takes
+more than ``cpu_share`` of the wall-clock time – a slow render (a big live
+region on a large terminal) simply lowers the frame rate.  Render cost
+depends on the terminal size, so the estimate starts over when it changes.
+
+The final state is never subject to the budget; callers always render once
+more when the stream ends.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Optional
+
+
+class RenderScheduler:
+    """
+    Decide when the next frame of a stream should be rendered.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_fps: float = 60.0,
+        min_fps: float = 4.0,
+        cpu_share: float = 0.5,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """
+        Args:
+            max_fps: Upper bound on the frame rate
+            min_fps: Lower bound on the frame rate, however slow rendering is
+            cpu_share: Fraction of wall-clock time rendering may use
+            clock: Monotonic time source in seconds
+        """
+        self.min_interval = 1.0 / max_fps
+        self.max_interval = 1.0 / min_fps
+        self.cpu_share = cpu_share
+        self._clock = clock
+        self._cost = 0.0
+        self._size: Optional[tuple[int, int]] = None
+        self._next_frame = 0.0
+
+    @property
+    def interval(self) -> float:
+        """Current time between frames in seconds."""
+        return min(self.max_interval, max(self.min_interval, self._cost / self.cpu_share))
+
+    def due(self) -> bool:
+        """Whether enough time has passed since the last frame to render another."""
+        return self._clock() >= self._next_frame
+
+    def rendered(self, seconds: float, size: Optional[tuple[int, int]] = None) -> None:
+        """
+        Record a finished frame and schedule the next one.
+
+        Args:
+            seconds: Time the frame took to render
+            size: Terminal ``(width, height)`` the frame was rendered for
+        """
+        if size != self._size:
+            self._size = size
+            self._cost = seconds
+        else:
+            # Exponential moving average smooths out one-off slow frames.
+            self._cost = 0.7 * self._cost + 0.3 * seconds
+        self._next_frame = self._clock() + self.interval
@@ -0,0 +1,102 @@
+"""Compiled ``$placeholder`` templates for action prompts, commands and paths.
+
+Action prompts reference command outputs (``$diff``), command lines and
+``output.to_file`` reference the working path (``$path``).  A chain of
+``str.replace`` calls copies a multi-megabyte prompt once per placeholder and
+happily substitutes a ``$diff`` that appears *inside* another command's
+output.  A :class:`Template` is parsed once into literal text and
+placeholders, and rendered in a single pass into one joined buffer –
+substituted values are never scanned again.
+
+Syntax:
+
+* ``$name`` or ``${name}`` – a placeholder; names are ASCII letters, digits
+  and underscores and do not start with a digit,
+* ``$$`` – a literal ``$``,
+* any other ``$`` is kept as it is.
+
+Placeholders without a value are left in the text verbatim and reported by
+:meth:`Template.unknown`, so a typo shows up instead of silently reaching the
+model.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Mapping
+from functools import lru_cache
+
+_PLACEHOLDER = re.compile(r"\$(?:(\$)|\{([A-Za-z_][A-Za-z0-9_]*)\}|([A-Za-z_][A-Za-z0-9_]*))")
+
+
+class Template:
+    """
+    A parsed template: literal text interleaved with placeholders.
+    """
+
+    __slots__ = ("source", "_literals", "_placeholders")
+
+    def __init__(self, source: str) -> None:
+        """
+        Args:
+            source: The template text
+        """
+        self.source = source
+        literals: list[str] = []
+        # (name, original text) – the text is kept for unknown placeholders.
+        placeholders: list[tuple[str, str]] = []
+        pending: list[str] = []
+        pos = 0
+        for match in _PLACEHOLDER.finditer(source):
+            pending.append(source[pos : match.start()])
+            pos = match.end()
+            if match.group(1):
+                pending.append("$")
+                continue
+            literals.append("".join(pending))
+            pending = []
+            placeholders.append((match.group(2) or match.group(3), match.group(0)))
+        pending.append(source[pos:])
+        literals.append("".join(pending))
+
+        self._literals = tuple(literals)
+        self._placeholders = tuple(placeholders)
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """Distinct placeholder names, in order of first appearance."""
+        return tuple(dict.fromkeys(name for name, _ in self._placeholders))
+
+    def unknown(self, values: Mapping[str, str]) -> list[str]:
+        """Placeholder names *values* has no entry for."""
+        return [name for name in self.names if name not in values]
+
+    def render(self, values: Mapping[str, str]) -> str:
+        """
+        Substitute *values* in one pass.
+
+        Placeholders without a value are kept as written.
+        """
+        if not self._placeholders:
+            return self._literals[0]
+        parts = [self._literals[0]]
+        for (name, text), literal in zip(self._placeholders, self._literals[1:]):
+            value = values.get(name)
+            parts.append(text if value is None else value)
+            parts.append(literal)
+        return "".join(parts)
+
+    def __repr__(self) -> str:
+        return f"Template({self.source!r})"
+
+
+@lru_cache(maxsize=512)
+def compile_template(source: str) -> Template:
+    """
+    Return the compiled template for *source*.
+
+    Templates are cached by their text, so the prompt, command lines and
+    output path of an action are parsed once per process rather than once
+    per use.
+    """
+    return Template(source)
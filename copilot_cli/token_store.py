@@ -0,0 +1,100 @@
+"""Per-user, cross-process store for the Copilot API token.
+
+The token used to live in a world-readable ``/tmp/copilot_token.json`` that
+every process rewrote in place.  When many CLI processes started around the
+expiry time they all hit the token endpoint and could read a half-written
+file.  :class:`TokenStore` fixes both problems:
+
+* the token is kept under the user cache directory (mode ``0600``) and
+  replaced atomically, so readers never see partial JSON;
+* :meth:`TokenStore.refresh` runs under an exclusive file lock and re-reads
+  the file once the lock is held – if another process refreshed in the
+  meantime, its token is reused instead of fetching a new one.
+
+Records are stored as ``{"fetched_at": <unix time>, "data": <token JSON>}``
+so callers can honour the ``refresh_in`` hint of the token service.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .filelock import FileLock, atomic_write_text
+from .utils import user_cache_dir
+
+TokenRecord = dict[str, Any]
+
+
+class TokenStore:
+    """
+    Atomic, lock-protected token file shared by all CLI processes of a user.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        """
+        Args:
+            path: Token file location; defaults to ``<cache dir>/copilot_token.json``
+        """
+        self.path = Path(path) if path is not None else user_cache_dir() / "copilot_token.json"
+        self._lock = FileLock(self.path)
+
+    def load(self) -> Optional[TokenRecord]:
+        """
+        Read the stored record.
+
+        Returns:
+            The record, or ``None`` when it is missing or unreadable
+        """
+        try:
+            record = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(record, dict) or not isinstance(record.get("data"), dict):
+            return None
+        return record
+
+    def save(self, data: dict[str, Any]) -> TokenRecord:
+        """Atomically store freshly fetched token *data* and return its record."""
+        record: TokenRecord = {"fetched_at": time.time(), "data": data}
+        atomic_write_text(self.path, json.dumps(record))
+        return record
+
+    def refresh(
+        self,
+        fetch: Callable[[], dict[str, Any]],
+        is_usable: Callable[[TokenRecord], bool],
+    ) -> TokenRecord:
+        """
+        Refresh the token with at most one fetch across all processes.
+
+        Args:
+            fetch: Retrieves new token data from the token endpoint
+            is_usable: Decides whether a stored record can be reused instead
+                of fetching – called after the lock is acquired, so it sees
+                refreshes done by other processes while we were waiting
+
+        Returns:
+            The record now in the store
+        """
+        with self._lock:
+            current = self.load()
+            if current is not None and is_usable(current):
+                return current
+            return self.save(fetch())
+
+    def annotate(self, token: str, key: str, value: Any) -> None:
+        """
+        Store *value* under *key* in the record of *token*.
+
+        Used for state that lives exactly as long as the token (the resolved
+        chat endpoint); a no-op once the token has been replaced.
+        """
+        with self._lock:
+            record = self.load()
+            if record is None or record["data"].get("token") != token:
+                return
+            record[key] = value
+            atomic_write_text(self.path, json.dumps(record))
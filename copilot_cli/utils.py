@@ -12,6 +12,8 @@ goal is to
 
 from __future__ import annotations
 
+import os
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:  # pragma: no cover – import heavy modules lazily at runtime
@@ -67,3 +69,15 @@ def should_enable_spinner(cli_args: "Args", action_obj: "Action | None") -> bool
         action_pref = True
 
     return spinner_allowed_globally and action_pref
+
+
+def user_cache_dir() -> Path:
+    """Return the per-user cache directory of *copilot-cli*.
+
+    Follows the XDG base directory specification: ``$XDG_CACHE_HOME`` when
+    set, ``~/.cache`` otherwise, with a ``copilot-cli`` sub-directory.  The
+    directory is **not** created – callers do so lazily before writing.
+    """
+
+    base = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "copilot-cli"
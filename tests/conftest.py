@@ -0,0 +1,5 @@
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "tiktoken: compares the token estimate with tiktoken; needs tiktoken and its downloaded vocabularies",
+    )
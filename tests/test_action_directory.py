@@ -0,0 +1,88 @@
+import pytest
+
+pytest.importorskip("pydantic")
+
+from copilot_cli.action import action_manager as am
+
+BASE = """actions:
+  hello:
+    description: Say hello
+    prompt: Say hello
+    system_prompt: You are friendly
+    model: gpt-4o
+"""
+
+
+def action_file(description: str, prompt: str) -> str:
+    return f"description: {description}\nprompt: {prompt}\nsystem_prompt: Be brief\nmodel: gpt-4o\n"
+
+
+@pytest.fixture
+def layers(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    base = tmp_path / "actions.yml"
+    base.write_text(BASE)
+    user = tmp_path / "user" / "actions.d"
+    project = tmp_path / "project" / "actions.d"
+    user.mkdir(parents=True)
+    project.mkdir(parents=True)
+    (user / "review.yml").write_text(action_file("User review", "Review it"))
+    (user / "hello.yml").write_text(action_file("User hello", "Hi there"))
+    (project / "review.yaml").write_text(action_file("Project review", "Review strictly"))
+    (project / "broken.yml").write_text("prompt: [unterminated\n")
+    return base, user, project
+
+
+def test_layers_override_in_order(layers):
+    base, user, project = layers
+    manager = am.ActionManager(str(base), [user, project])
+
+    assert sorted(manager.get_actions_list()) == ["hello", "review"]
+    assert manager.get_description("review") == "Project review"
+    assert manager.get_action("review").prompt == "Review strictly"
+    assert manager.get_action("hello").prompt == "Hi there"
+
+
+def test_index_lists_without_parsing(layers, monkeypatch):
+    base, user, project = layers
+    am.ActionManager(str(base), [user, project])
+
+    def _no_parse(_text):
+        raise AssertionError("action file parsed again")
+
+    monkeypatch.setattr(am, "_safe_load_yaml", _no_parse)
+    manager = am.ActionManager(str(base), [user, project])
+
+    assert manager.get_description("hello") == "User hello"
+    assert manager.get_action("review").system_prompt == "Be brief"
+
+
+def test_only_changed_file_is_parsed(layers, monkeypatch):
+    base, user, project = layers
+    am.ActionManager(str(base), [user, project])
+    (user / "fresh.yml").write_text(action_file("Fresh", "New action"))
+
+    parsed = []
+    original = am._safe_load_yaml
+
+    def _spy(text):
+        parsed.append(text)
+        return original(text)
+
+    monkeypatch.setattr(am, "_safe_load_yaml", _spy)
+    manager = am.ActionManager(str(base), [user, project])
+
+    assert len(parsed) == 1 and "Fresh" in parsed[0]
+    assert manager.get_action("fresh").prompt == "New action"
+
+
+def test_default_action_dirs(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    user = tmp_path / "config" / "copilot-cli" / "actions.d"
+    project = tmp_path / "repo" / ".copilot-cli" / "actions.d"
+    nested = tmp_path / "repo" / "src" / "pkg"
+    for directory in (user, project, nested):
+        directory.mkdir(parents=True)
+
+    assert am.default_action_dirs(nested) == [user, project.resolve()]
+    assert am.default_action_dirs(tmp_path) == [user]
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from copilot_cli.action import action_manager as am
+from copilot_cli.action.compiled import compiled_path
+
+ACTIONS = """actions:
+  hello:
+    description: Say hello
+    prompt: Say hello
+    system_prompt: You are friendly
+    model: gpt-4o
+    options:
+      stream: false
+"""
+
+
+@pytest.fixture
+def actions_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path = tmp_path / "actions.yml"
+    path.write_text(ACTIONS)
+    return path
+
+
+def test_compiled_actions_skip_parsing(actions_file, monkeypatch):
+    first = am.ActionManager(str(actions_file)).get_action("hello")
+    assert compiled_path(actions_file).exists()
+
+    def _no_parse(_text):
+        raise AssertionError("actions.yml parsed again")
+
+    monkeypatch.setattr(am, "_safe_load_yaml", _no_parse)
+    action = am.ActionManager(str(actions_file)).get_action("hello")
+
+    assert action == first
+    assert (action.prompt, action.model, action.commands) == ("Say hello", "gpt-4o", None)
+    assert action.options.stream is False and action.options.spinner is True
+    assert action.output.to_stdout is True
+
+
+def test_changed_file_is_recompiled(actions_file):
+    assert am.ActionManager(str(actions_file)).get_actions_list() == ["hello"]
+
+    actions_file.write_text(ACTIONS.replace("hello", "bye"))
+    stat = actions_file.stat()
+    os.utime(actions_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert am.ActionManager(str(actions_file)).get_actions_list() == ["bye"]
+
+
+def test_corrupt_blob_is_ignored(actions_file):
+    am.ActionManager(str(actions_file))
+    compiled_path(actions_file).write_bytes(b"not marshal")
+
+    assert am.ActionManager(str(actions_file)).get_actions_list() == ["hello"]
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("pydantic")
+
+from copilot_cli.async_client import AsyncGithubCopilotClient
+from copilot_cli.copilot import CopilotToken, GithubCopilotClient
+
+
+class FakeClient(GithubCopilotClient):
+    def __init__(self):
+        super().__init__()
+        self._copilot_token = None
+        self.refreshes = 0
+        self.in_flight = 0
+        self.peak = 0
+        self._counter_lock = threading.Lock()
+
+    def _refresh_copilot_token(self):
+        time.sleep(0.05)
+        self.refreshes += 1
+        self._copilot_token = CopilotToken.model_construct(token="t", expires_at=int(time.time()) + 600)
+
+    def _request_completion(self, prompt, model, system_prompt):
+        with self._counter_lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.02)
+        with self._counter_lock:
+            self.in_flight -= 1
+        return f"{model}:{prompt}"
+
+    def _request_stream(self, prompt, model, system_prompt, cancel=None):
+        yield from prompt.split()
+
+
+def test_concurrent_completions_share_one_refresh():
+    fake = FakeClient()
+    client = AsyncGithubCopilotClient(fake, max_concurrency=3)
+
+    async def run():
+        return await asyncio.gather(*(client.chat_completion(str(i), "gpt-4o", "") for i in range(12)))
+
+    results = asyncio.run(run())
+
+    assert results == [f"gpt-4o:{i}" for i in range(12)]
+    assert fake.refreshes == 1
+    assert fake.peak <= 3
+
+
+def test_stream_yields_chunks_in_order():
+    client = AsyncGithubCopilotClient(FakeClient())
+
+    async def run():
+        return [chunk async for chunk in client.stream_chat_completion("a b c", "gpt-4o", "")]
+
+    assert asyncio.run(run()) == ["a", "b", "c"]
+
+
+def test_stream_failing_after_output_is_not_echoed_offline():
+    import requests
+
+    from copilot_cli.exception.copilot_client_error import CopilotClientError
+
+    class Broken(FakeClient):
+        def _request_stream(self, prompt, model, system_prompt, cancel=None):
+            yield "partial"
+            raise requests.ConnectionError("reset")
+
+    fake = Broken()
+    fake.offline_fallback = True
+    client = AsyncGithubCopilotClient(fake)
+    received = []
+
+    async def run():
+        async for chunk in client.stream_chat_completion("a b c", "gpt-4o", ""):
+            received.append(chunk)
+
+    with pytest.raises(CopilotClientError):
+        asyncio.run(run())
+    assert received == ["partial"]
+
+
+def test_concurrency_is_not_capped_by_the_default_executor():
+    from concurrent.futures import ThreadPoolExecutor
+
+    fake = FakeClient()
+    client = AsyncGithubCopilotClient(fake, max_concurrency=6)
+
+    async def run():
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+        return await asyncio.gather(*(client.chat_completion(str(i), "gpt-4o", "") for i in range(6)))
+
+    try:
+        assert len(asyncio.run(run())) == 6
+    finally:
+        client.close()
+    assert fake.peak == 6
@@ -0,0 +1,87 @@
+import asyncio
+import io
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("pydantic")
+
+from copilot_cli.batch import run_batch
+
+
+class FakeAsyncClient:
+    async def chat_completion(self, prompt, model, system_prompt, fallbacks=()):
+        await asyncio.sleep(float(prompt))
+        if model == "broken":
+            raise RuntimeError("boom")
+        return f"{model}:{prompt}"
+
+
+def _resolve(request):
+    return str(request["prompt"]), request.get("model", "gpt-4o"), "", ()
+
+
+def test_results_are_streamed_in_completion_order():
+    lines = [
+        json.dumps({"prompt": 0.05, "id": "slow"}),
+        "",
+        json.dumps({"prompt": 0.0, "id": "fast"}),
+        "{not json",
+        json.dumps({"prompt": 0.01, "model": "broken"}),
+    ]
+    output = io.StringIO()
+
+    failures = run_batch(FakeAsyncClient(), lines, _resolve, output, concurrency=4)
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert failures == 2
+    assert [r["index"] for r in results] == [3, 2, 4, 0]
+    assert results[1]["response"] == "gpt-4o:0.0"
+    assert results[2]["error"] == "RuntimeError: boom"
+    assert results[3]["id"] == "slow"
+    assert all("latency_ms" in r for r in results)
+
+
+def test_cli_rejects_zero_concurrency_and_fails_on_failed_lines(tmp_path, monkeypatch):
+    from copilot_cli.daemon import cli_handler
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    main = cli_handler()
+    batch = tmp_path / "batch.jsonl"
+    batch.write_text("{not json\n")
+
+    with pytest.raises(SystemExit) as excinfo:
+        main(["--batch", str(batch), "--concurrency", "0"])
+    assert excinfo.value.code == 2
+
+    with pytest.raises(SystemExit) as excinfo:
+        main(["--batch", str(batch), "--no-cache"])
+    assert excinfo.value.code == 1
+
+
+def test_input_is_read_as_requests_are_taken_up():
+    written = threading.Event()
+    ahead = []
+
+    class Output(io.StringIO):
+        def write(self, text):
+            written.set()
+            return super().write(text)
+
+    output = Output()
+
+    def lines():
+        # The second line only comes once the first has been answered, as
+        # from a producer that waits for results.
+        yield json.dumps({"prompt": 0.0})
+        assert written.wait(5)
+        for n in range(20):
+            ahead.append(n + 2 - output.getvalue().count("\n"))  # read, not yet answered
+            yield json.dumps({"prompt": 0.01})
+
+    assert run_batch(FakeAsyncClient(), lines(), _resolve, output, concurrency=2) == 0
+    assert output.getvalue().count("\n") == 21
+    # Two lines in flight, two waiting for a worker and the one being read.
+    assert max(ahead) <= 5
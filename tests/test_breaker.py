@@ -0,0 +1,185 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from copilot_cli.breaker import CircuitBreaker
+from copilot_cli.exception.circuit_open_error import CircuitOpenError
+
+URL = "https://api.example.com/chat/completions"
+
+
+def test_circuit_opens_probes_and_closes_across_processes(tmp_path):
+    path = tmp_path / "circuits.json"
+    # Two breakers on one file stand in for two CLI processes.
+    first = CircuitBreaker(path, threshold=3, cooldown=0.2)
+    second = CircuitBreaker(path, threshold=3, cooldown=0.2)
+
+    for _ in range(2):
+        first.record_failure(URL, "o3-mini")
+    second.check(URL, "o3-mini")
+    first.record_failure(URL, "o3-mini")
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        second.check(URL, "o3-mini")
+    assert excinfo.value.model == "o3-mini" and 0 < excinfo.value.retry_in <= 0.2
+    second.check(URL, "gpt-4o")  # other models are not affected
+    second.check("https://other.example.com/chat", "o3-mini")
+
+    time.sleep(0.25)
+    first.check(URL, "o3-mini")  # the probe
+    with pytest.raises(CircuitOpenError):
+        second.check(URL, "o3-mini")
+
+    # A failed probe re-opens the circuit with a longer cool-down.
+    first.record_failure(URL, "o3-mini")
+    entry = json.loads(path.read_text())[f"{URL} o3-mini"]
+    assert entry["cooldown"] == pytest.approx(0.4)
+
+    time.sleep(0.45)
+    second.check(URL, "o3-mini")
+    second.record_success(URL, "o3-mini")
+    first.check(URL, "o3-mini")
+    assert json.loads(path.read_text()) == {}
+
+
+@pytest.fixture
+def server():
+    """Chat stub: model "down" answers 503, any other model answers its name."""
+    pytest.importorskip("requests")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_args):
+            pass
+
+        def do_POST(self):  # noqa: N802
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            self.server.models.append(body["model"])
+            if body["model"] == "down":
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if body["stream"]:
+                delta = json.dumps({"choices": [{"delta": {"content": body["model"]}}]})
+                payload = f"data: {delta}\n\ndata: [DONE]\n\n".encode()
+            else:
+                payload = json.dumps({"choices": [{"message": {"content": body["model"]}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    httpd.models = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def make_client(server, tmp_path, monkeypatch):
+    from copilot_cli.copilot import GithubCopilotClient
+    from copilot_cli.pool import ConnectionPool
+    from copilot_cli.retry import RetryPolicy
+    from copilot_cli.token_store import TokenStore
+
+    monkeypatch.setenv("GITHUB_COPILOT_CHAT_URL", f"http://127.0.0.1:{server.server_address[1]}/chat")
+    pools = []
+
+    def _make(**kwargs):
+        pools.append(ConnectionPool())
+        client = GithubCopilotClient(
+            pool=pools[-1],
+            token_store=TokenStore(tmp_path / "token.json"),
+            retry=RetryPolicy(max_attempts=1),
+            breaker=CircuitBreaker(tmp_path / "circuits.json", threshold=2),
+            **kwargs,
+        )
+        client._copilot_token = SimpleNamespace(token="t", expires_at=4102444800)
+        monkeypatch.setattr(client, "_ensure_valid_token", lambda: None)
+        return client
+
+    yield _make
+    for pool in pools:
+        pool.close()
+
+
+async def _ask_async(client, fallbacks, stream):
+    from copilot_cli.async_client import AsyncGithubCopilotClient
+
+    async_client = AsyncGithubCopilotClient(client)
+    if stream:
+        chunks = async_client.stream_chat_completion("hi", "down", "sys", fallbacks=fallbacks)
+        return "".join([chunk async for chunk in chunks])
+    return await async_client.chat_completion("hi", "down", "sys", fallbacks=fallbacks)
+
+
+@pytest.mark.parametrize("stream", [True, False])
+@pytest.mark.parametrize("use_async", [False, True])
+def test_client_reroutes_along_the_fallback_chain(make_client, server, stream, use_async):
+    def ask(client, fallbacks):
+        if use_async:
+            return asyncio.run(_ask_async(client, fallbacks, stream))
+        if stream:
+            return "".join(client.stream_chat_completion("hi", "down", "sys", fallbacks=fallbacks))
+        return client.chat_completion("hi", "down", "sys", fallbacks=fallbacks)
+
+    client = make_client()
+    assert ask(client, ["down-too", "up"]) == "down-too"
+    assert client.last_model == "down-too"
+    assert ask(client, ["up"]) == "up"
+    assert server.models == ["down", "down-too", "down", "up"]
+
+    # The circuit of "down" is open now, also for a new client (process).
+    server.models.clear()
+    other = make_client()
+    assert ask(other, ["up"]) == "up"
+    assert server.models == ["up"]
+    with pytest.raises(CircuitOpenError):
+        ask(other, [])
+    assert server.models == ["up"]
+
+    assert ask(make_client(offline_fallback=True), []).startswith("[offline mock")
+
+
+def test_action_model_accepts_a_fallback_chain():
+    pytest.importorskip("pydantic")
+    from copilot_cli.action.model import Action
+
+    action = Action(description="d", prompt="p", system_prompt="s", model=["o3-mini", "gpt-4o"])
+    assert action.model == ["o3-mini", "gpt-4o"]
+    assert Action(description="d", prompt="p", system_prompt="s", model="gpt-4o").model == "gpt-4o"
+
+
+def test_fallback_yaml_parser_reads_flow_lists():
+    from copilot_cli.action.action_manager import _parse_yaml_subset
+
+    parsed = _parse_yaml_subset('actions:\n  a:\n    model: ["o3-mini", gpt-4o]\n')
+    assert parsed["actions"]["a"]["model"] == ["o3-mini", "gpt-4o"]
+
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_fallback_too_small_for_the_prompt_is_skipped(make_client, server, stream):
+    from copilot_cli.exception.prompt_too_large_error import PromptTooLargeError
+
+    def ask(client, fallbacks):
+        if stream:
+            return "".join(client.stream_chat_completion(prompt, "down", "sys", fallbacks=fallbacks))
+        return client.chat_completion(prompt, "down", "sys", fallbacks=fallbacks)
+
+    prompt = "word " * 20_000  # beyond the 12k window of gpt-3.5-turbo
+    assert ask(make_client(), ["gpt-3.5-turbo", "up"]) == "up"
+    assert server.models == ["down", "up"]
+
+    with pytest.raises(PromptTooLargeError):
+        ask(make_client(offline_fallback=True), ["gpt-3.5-turbo"])
@@ -0,0 +1,75 @@
+import os
+import time
+
+import pytest
+
+from copilot_cli.cache import ResponseCache
+
+
+def test_round_trip_keeps_chunk_boundaries(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put("gpt-4o", "sys", "hello", ["a", "b", "c"])
+
+    assert cache.get_chunks("gpt-4o", "sys", "hello") == ["a", "b", "c"]
+    assert cache.get("gpt-4o", "sys", "hello") == "abc"
+    assert cache.get("o3-mini", "sys", "hello") is None
+
+
+def test_expired_and_disabled_entries(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path)
+    cache.put("m", "s", "short", ["x"], ttl=10)
+    cache.put("m", "s", "never", ["x"], ttl=0)
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+
+    assert cache.get("m", "s", "short") is None
+    assert cache.get("m", "s", "never") is None
+
+
+def test_refresh_mode_skips_reads(tmp_path):
+    ResponseCache(tmp_path).put("m", "s", "p", ["old"])
+    refreshing = ResponseCache(tmp_path, read=False)
+
+    assert refreshing.get("m", "s", "p") is None
+    refreshing.put("m", "s", "p", ["new"])
+    assert ResponseCache(tmp_path).get("m", "s", "p") == "new"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=10_000)
+    for i in range(3):
+        cache.put("m", "s", str(i), ["x" * 2_000])
+        path = cache._entry_path(cache.make_key("m", "s", str(i)))
+        os.utime(path, (1_000 + i, 1_000 + i))
+
+    cache.get("m", "s", "0")  # refresh entry 0
+    cache.max_bytes = 5_000
+    cache.evict()
+
+    assert cache.get("m", "s", "0") is not None
+    assert cache.get("m", "s", "1") is None
+
+
+def test_client_replays_cached_stream(tmp_path):
+    pytest.importorskip("requests")
+    pytest.importorskip("pydantic")
+    from copilot_cli.copilot import GithubCopilotClient
+
+    class FakeClient(GithubCopilotClient):
+        calls = 0
+
+        def _ensure_valid_token(self):
+            pass
+
+        def _request_stream(self, prompt, model, system_prompt, cancel=None):
+            FakeClient.calls += 1
+            yield from ["# Title\n", "body"]
+
+    client = FakeClient(cache=ResponseCache(tmp_path))
+    first = list(client.stream_chat_completion("p", "gpt-4o", "s"))
+    second = list(client.stream_chat_completion("p", "gpt-4o", "s"))
+
+    assert first == second == ["# Title\n", "body"]
+    assert FakeClient.calls == 1
+    assert client.chat_completion("p", "gpt-4o", "s") == "# Title\nbody"
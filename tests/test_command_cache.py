@@ -0,0 +1,108 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from copilot_cli.command_cache import CommandCache, fingerprint
+from copilot_cli.commands import run_commands
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+def git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    git(repo, "config", "user.email", "dev@example.com")
+    git(repo, "config", "user.name", "Dev")
+    (repo / "a.txt").write_text("one\n")
+    git(repo, "add", "a.txt")
+    git(repo, "commit", "-q", "-m", "initial")
+    return repo
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CommandCache(tmp_path / "cache")
+
+
+def staged_diff(repo):
+    return {"diff": ["git", "-C", str(repo), "diff", "--cached"], "logs": ["git", "-C", str(repo), "log", "--oneline"]}
+
+
+def test_unchanged_repo_skips_the_commands(repo, cache):
+    (repo / "a.txt").write_text("two\n")
+    git(repo, "add", "a.txt")
+
+    first = run_commands(staged_diff(repo), cache=cache)
+    second = run_commands(staged_diff(repo), cache=cache)
+
+    assert not any(r.cached for r in first.values())
+    assert all(r.cached for r in second.values())
+    assert {k: r.stdout for k, r in first.items()} == {k: r.stdout for k, r in second.items()}
+    assert "+two" in second["diff"].stdout
+
+
+def test_staging_or_committing_invalidates(repo, cache):
+    run_commands(staged_diff(repo), cache=cache)
+
+    (repo / "a.txt").write_text("three\n")
+    git(repo, "add", "a.txt")
+    staged = run_commands(staged_diff(repo), cache=cache)
+    assert not staged["diff"].cached and "+three" in staged["diff"].stdout
+
+    git(repo, "commit", "-q", "-m", "second")
+    committed = run_commands(staged_diff(repo), cache=cache)
+    assert not committed["logs"].cached and "second" in committed["logs"].stdout
+    assert committed["diff"].stdout == ""
+
+
+def test_new_tags_and_remote_branches_invalidate(repo):
+    describe = ["git", "-C", str(repo), "describe", "--tags", "--always"]
+    before = fingerprint(describe)
+    git(repo, "tag", "v1")
+    tagged = fingerprint(describe)
+    assert tagged != before
+
+    git(repo, "update-ref", "refs/remotes/origin/main", "HEAD")
+    assert fingerprint(["git", "-C", str(repo), "log", "origin/main"]) != tagged
+
+
+def test_work_tree_commands_are_not_cached(repo):
+    assert fingerprint(["git", "-C", str(repo), "diff"]) is None
+    assert fingerprint(["git", "-C", str(repo), "status"]) is None
+    assert fingerprint(["git", "-C", str(repo), "ls-files", "--others"]) is None
+    assert fingerprint(["git", "-C", str(repo), "ls-files"]) is not None
+    assert fingerprint([sys.executable, "-c", "print(1)"]) is None
+
+
+def test_declared_inputs(tmp_path, cache):
+    source = tmp_path / "notes.txt"
+    source.write_text("first")
+    cmd = {"notes": [sys.executable, "-c", f"print(open({str(source)!r}).read())"]}
+    inputs = {"notes": [str(source)]}
+
+    assert run_commands(cmd, cache=cache, inputs=inputs)["notes"].stdout == "first\n"
+    assert run_commands(cmd, cache=cache, inputs=inputs)["notes"].cached
+
+    source.write_text("second")
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    result = run_commands(cmd, cache=cache, inputs=inputs)["notes"]
+    assert not result.cached and result.stdout == "second\n"
+
+
+def test_failed_commands_are_not_cached(tmp_path, cache):
+    cmd = {"bad": [sys.executable, "-c", "import sys; sys.exit(1)"]}
+    inputs = {"bad": [str(tmp_path)]}
+
+    run_commands(cmd, cache=cache, inputs=inputs)
+
+    assert not run_commands(cmd, cache=cache, inputs=inputs)["bad"].cached
@@ -0,0 +1,52 @@
+import sys
+import time
+
+from copilot_cli.commands import CommandsFailed, run_command_capped, run_commands
+
+
+def py(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+def test_commands_run_concurrently():
+    commands = {key: py(f"import time; time.sleep(0.4); print('{key}')") for key in ("diff", "log", "status")}
+
+    start = time.perf_counter()
+    results = run_commands(commands)
+    elapsed = time.perf_counter() - start
+
+    assert list(results) == ["diff", "log", "status"]
+    assert [r.stdout for r in results.values()] == ["diff\n", "log\n", "status\n"]
+    assert all(r.ok for r in results.values())
+    assert elapsed < 1.0
+
+
+def test_timeout_kills_the_command():
+    result = run_command_capped("slow", py("import time; time.sleep(10)"), timeout=0.3)
+
+    assert result.timed_out and not result.ok
+    assert result.elapsed < 5
+    assert "timed out after" in result.describe()
+
+
+def test_stdout_is_capped():
+    result = run_command_capped("big", py("import sys; sys.stdout.write('x' * 1_000_000)"), max_output=1000)
+
+    assert result.ok and result.truncated
+    assert result.stdout.startswith("x" * 1000 + "\n[... output truncated at 1000 bytes]")
+
+
+def test_failure_report_includes_status_and_stderr():
+    results = run_commands(
+        {
+            "ok": py("print('fine')"),
+            "bad": py("import sys; sys.stderr.write('fatal: not a git repository\\n'); sys.exit(128)"),
+            "missing": ["definitely-not-a-real-command-xyz"],
+        }
+    )
+    failures = [r for r in results.values() if not r.ok]
+    error = CommandsFailed(failures)
+
+    assert [r.key for r in error.failures] == ["bad", "missing"]
+    assert "exited with status 128: fatal: not a git repository" in str(error)
+    assert "missing: `definitely-not-a-real-command-xyz` could not be started" in str(error)
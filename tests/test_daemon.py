@@ -0,0 +1,174 @@
+import io
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from copilot_cli.daemon import Daemon, control, forward
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def serve():
+    """Run a daemon with the given handler on a short socket path."""
+    running = []
+
+    def _serve(handler):
+        # Unix socket paths are limited to ~100 bytes, tmp_path may be longer.
+        path = Path(tempfile.mkdtemp(prefix="cc-", dir="/tmp")) / "d.sock"
+        daemon = Daemon(handler, path, idle_timeout=60)
+        sock = daemon.bind()
+        thread = threading.Thread(target=daemon.serve_forever, args=(sock,), daemon=True)
+        thread.start()
+        running.append((daemon, thread))
+        return path
+
+    yield _serve
+    for daemon, thread in running:
+        daemon.stop()
+        thread.join(5)
+        shutil.rmtree(daemon.path.parent, ignore_errors=True)
+
+
+def test_forward_relays_argv_cwd_streams_and_status(serve, tmp_path, monkeypatch):
+    def handler(argv):
+        data = sys.stdin.read()
+        print(f"argv={argv} cwd={os.getcwd()} env={os.environ.get('COPILOT_TEST_VAR')}")
+        print(f"stdin={data!r}", file=sys.stderr)
+        sys.exit(3)
+
+    path = serve(handler)
+    cwd = os.getcwd()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("COPILOT_TEST_VAR", "forwarded")
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+
+    status = forward(["--prompt", "hi"], path=path, stdin=io.BytesIO(b"piped input"), stdout=stdout, stderr=stderr)
+
+    assert status == 3
+    assert stdout.getvalue().decode() == f"argv=['--prompt', 'hi'] cwd={tmp_path} env=forwarded\n"
+    assert stderr.getvalue().decode() == "stdin='piped input'\n"
+    # The daemon's own working directory and environment are restored.
+    monkeypatch.chdir(cwd)
+    assert control("status", path=path)["requests"] == 1
+
+
+def test_busy_daemon_and_missing_daemon_fall_back(serve, tmp_path):
+    release = threading.Event()
+    entered = threading.Event()
+
+    def handler(argv):
+        entered.set()
+        release.wait(5)
+
+    path = serve(handler)
+    first = threading.Thread(target=forward, args=([],), kwargs={"path": path, "stdout": io.BytesIO()})
+    first.start()
+    assert entered.wait(5)
+
+    assert forward([], path=path, stdout=io.BytesIO()) is None
+    release.set()
+    first.join(5)
+
+    assert forward([], path=tmp_path / "missing.sock") is None
+    stale = path.parent / "stale.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(str(stale))  # bound but never listening, like a crashed daemon
+    assert forward([], path=stale) is None
+
+
+def test_cli_output_matches_in_process_run(serve, capsys):
+    from copilot_cli.daemon import cli_handler
+
+    main = cli_handler()
+    main(["--list"])
+    expected = capsys.readouterr().out
+
+    path = serve(main)
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+    assert forward(["--list"], path=path, stdout=stdout, stderr=stderr) == 0
+    assert stdout.getvalue().decode() == expected
+
+    assert forward(["--action", "no-such-action"], path=path, stdout=stdout, stderr=stderr) == 2
+    assert "invalid choice: 'no-such-action'" in stderr.getvalue().decode()
+
+
+def test_client_follows_the_callers_environment(tmp_path, monkeypatch):
+    pytest.importorskip("requests")
+    pytest.importorskip("pydantic")
+    from copilot_cli import _load_cli_module
+
+    cli = _load_cli_module()
+    args = cli.Args(**vars(cli.create_parser().parse_args([])))
+    for name in ("GITHUB_COPILOT_OAUTH_TOKEN", "COPILOT_OAUTH_TOKEN"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "a"))
+    first = cli.create_client(args)
+    assert cli.create_client(args) is first
+
+    monkeypatch.setenv("GITHUB_TOKEN", "another-user")
+    second = cli.create_client(args)
+    assert second is not first and second._get_oauth_token() == "another-user"
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "b"))
+    assert cli.create_client(args) is not second
+
+
+def test_request_threads_finish_before_the_state_is_restored(serve, tmp_path, monkeypatch):
+    seen = []
+    answered = threading.Event()
+
+    def handler(argv):
+        stdout = sys.stdout
+
+        def background():
+            answered.wait(5)  # still running after the caller got its answer
+            seen.append((os.getcwd(), os.environ.get("COPILOT_TEST_VAR"), sys.stdout is stdout))
+
+        threading.Thread(target=background, daemon=True).start()
+
+    path = serve(handler)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("COPILOT_TEST_VAR", "caller")
+
+    assert forward([], path=path, stdout=io.BytesIO()) == 0
+    answered.set()
+    # The next invocation waits for the previous one to settle instead of
+    # being turned away as busy.
+    assert forward([], path=path, stdout=io.BytesIO()) == 0
+
+    assert seen[0] == (str(tmp_path), "caller", True)
+
+
+def test_spinner_does_not_leave_exit_handlers_behind(monkeypatch):
+    import atexit
+
+    from copilot_cli import _load_cli_module
+
+    cli = _load_cli_module()
+    registered, unregistered = [], []
+
+    class Halo:
+        def __init__(self, **kwargs):
+            atexit.register(self.stop)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+
+        def stop(self):
+            pass
+
+    monkeypatch.setattr(atexit, "register", registered.append)
+    monkeypatch.setattr(atexit, "unregister", unregistered.append)
+    with cli._halo_spinner(Halo, "Working"):
+        assert len(registered) == 1
+    assert unregistered == registered
@@ -0,0 +1,199 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from copilot_cli.endpoint import api_chat_url, probe
+
+
+def test_api_chat_url_only_accepts_https_hosts():
+    assert (
+        api_chat_url({"api": "https://api.individual.githubcopilot.com/"})
+        == "https://api.individual.githubcopilot.com/chat/completions"
+    )
+    assert (
+        api_chat_url({"api": "https://ghe.example.com:8443/copilot"})
+        == "https://ghe.example.com:8443/copilot/chat/completions"
+    )
+    assert api_chat_url({"api": "http://api.example.com"}) is None
+    assert api_chat_url({"proxy": "https://proxy.example.com"}) is None
+    assert api_chat_url(None) is None
+
+
+@pytest.fixture
+def server():
+    """Echoes the Host header it received."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_args):
+            pass
+
+        def do_GET(self):  # noqa: N802
+            payload = self.headers["Host"].encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_pinned_host_skips_dns_but_keeps_its_name(server):
+    pytest.importorskip("requests")
+    from copilot_cli.pool import ConnectionPool
+
+    url = f"http://copilot.invalid:{server.server_address[1]}/"
+    with ConnectionPool() as pool:
+        pool.pin("copilot.invalid", "127.0.0.1")
+        assert pool.pinned("copilot.invalid") == "127.0.0.1"
+        assert pool.get(url, timeout=5).text == f"copilot.invalid:{server.server_address[1]}"
+
+        pool.pin("copilot.invalid", None)
+        assert pool.pinned("copilot.invalid") is None
+
+
+def test_probe_times_each_step(server):
+    result = probe(f"http://localhost:{server.server_address[1]}/", address="127.0.0.1")
+    assert result.error is None and result.address == "127.0.0.1"
+    assert result.dns is not None and result.connect is not None and result.tls is None
+    assert "connect" in result.describe()
+
+    closed = probe("http://127.0.0.1:9/")
+    assert closed.error.startswith("connect failed")
+
+
+TOKEN = {
+    "token": "t",
+    "expires_at": 4102444800,
+    "refresh_in": 1500,
+    "endpoints": {"api": "https://api.business.githubcopilot.com"},
+    "tracking_id": "t",
+    "sku": "s",
+    "annotations_enabled": False,
+    "chat_enabled": True,
+    "chat_jetbrains_enabled": False,
+    "code_quote_enabled": False,
+    "codesearch": False,
+    "copilotignore_enabled": False,
+    "individual": False,
+    "prompt_8k": False,
+    "snippy_load_test_enabled": False,
+    "xcode": False,
+    "xcode_chat": False,
+    "public_suggestions": "disabled",
+    "telemetry": "disabled",
+    "code_review_enabled": False,
+}
+
+
+class FakePool:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.urls = []
+        self.pins = {}
+
+    def pin(self, host, address):
+        self.pins[host] = address
+
+    def post(self, url, **_kwargs):
+        self.urls.append(url)
+        if self.fail:
+            import requests
+
+            raise requests.ConnectionError("connect failed")
+        return SimpleNamespace(
+            status_code=200,
+            raise_for_status=lambda: None,
+            json=lambda: {"choices": [{"message": {"content": "ok"}}]},
+        )
+
+
+def test_client_routes_to_the_token_endpoint_and_caches_its_addresses(tmp_path, monkeypatch):
+    pytest.importorskip("requests")
+    pytest.importorskip("pydantic")
+    from copilot_cli.copilot import GithubCopilotClient
+    from copilot_cli.exception.copilot_client_error import CopilotClientError
+    from copilot_cli.retry import RetryPolicy
+    from copilot_cli.token_store import TokenStore
+
+    monkeypatch.delenv("GITHUB_COPILOT_CHAT_URL", raising=False)
+    lookups = []
+
+    def fake_resolve(host, port):
+        lookups.append((host, port))
+        return ("192.0.2.7", "192.0.2.8")
+
+    monkeypatch.setattr("copilot_cli.copilot.resolve", fake_resolve)
+    store = TokenStore(tmp_path / "token.json")
+    _ = store.save(TOKEN)
+
+    def ask(pool):
+        client = GithubCopilotClient(pool=pool, token_store=store, retry=RetryPolicy(max_attempts=1))
+        monkeypatch.setattr(client, "_ensure_valid_token", lambda: None)
+        return client, client.chat_completion("hi", "gpt-4o", "sys")
+
+    url = "https://api.business.githubcopilot.com/chat/completions"
+    pool = FakePool()
+    client, answer = ask(pool)
+    assert answer == "ok" and pool.urls == [url]
+    assert client.chat_endpoint().source == "token"
+    assert pool.pins == {"api.business.githubcopilot.com": "192.0.2.7"}
+    assert lookups == [("api.business.githubcopilot.com", 443)]
+    assert store.load()["endpoint"] == {"url": url, "addresses": ["192.0.2.7", "192.0.2.8"]}
+
+    # Another process reuses the addresses stored with the token.
+    pool = FakePool()
+    _, answer = ask(pool)
+    assert answer == "ok" and pool.pins and len(lookups) == 1
+
+    # A failed connect drops them, so the next attempt resolves afresh.
+    pool = FakePool(fail=True)
+    with pytest.raises(CopilotClientError):
+        ask(pool)
+    assert pool.pins == {"api.business.githubcopilot.com": None}
+    assert store.load()["endpoint"]["addresses"] == []
+
+    # A new token starts without addresses.
+    _ = store.save({**TOKEN, "token": "t2"})
+    _, answer = ask(FakePool())
+    assert len(lookups) == 2
+
+
+def test_cold_start_counts_failures_against_the_token_endpoint(tmp_path, monkeypatch):
+    pytest.importorskip("requests")
+    pytest.importorskip("pydantic")
+    from copilot_cli.breaker import CircuitBreaker
+    from copilot_cli.copilot import GithubCopilotClient
+    from copilot_cli.exception.copilot_client_error import CopilotClientError
+    from copilot_cli.retry import RetryPolicy
+    from copilot_cli.token_store import TokenStore
+
+    monkeypatch.delenv("GITHUB_COPILOT_CHAT_URL", raising=False)
+    monkeypatch.setattr("copilot_cli.copilot.resolve", lambda host, port: ())
+    breaker = CircuitBreaker(tmp_path / "circuits.json")
+    client = GithubCopilotClient(
+        pool=FakePool(fail=True),
+        token_store=TokenStore(tmp_path / "token.json"),
+        retry=RetryPolicy(max_attempts=1),
+        breaker=breaker,
+    )
+    # No token is stored: the first request fetches it.
+    monkeypatch.setattr(
+        client, "_ensure_valid_token", lambda: client._apply_token_record({"fetched_at": 0, "data": TOKEN})
+    )
+
+    with pytest.raises(CopilotClientError):
+        client.chat_completion("hi", "gpt-4o", "sys")
+    assert list(json.loads((tmp_path / "circuits.json").read_text())) == [
+        "https://api.business.githubcopilot.com/chat/completions gpt-4o"
+    ]
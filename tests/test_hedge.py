@@ -0,0 +1,178 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from copilot_cli.hedge import WINDOW, Hedger, HedgePolicy, LatencyStore, bucket_of, quantile
+
+
+def _seed(store, key, seconds, count):
+    for _ in range(count):
+        store.record(key, seconds, hedged=False)
+
+
+def test_histogram_quantiles_and_decay(tmp_path):
+    store = LatencyStore(tmp_path / "latency.json")
+    _seed(store, "gpt-4o", 0.1, 90)
+    _seed(store, "gpt-4o", 2.0, 10)
+
+    counts = store.load()["latency"]["gpt-4o"]
+    assert 0.1 <= quantile(counts, 0.5) <= 0.12
+    assert 2.0 <= quantile(counts, 0.95) <= 2.4
+    assert bucket_of(0.001) == 0
+
+    _seed(store, "gpt-4o", 0.1, WINDOW)
+    data = store.load()
+    assert sum(data["latency"]["gpt-4o"].values()) <= WINDOW
+    assert data["requests"] == 100 + WINDOW
+
+
+def test_slow_attempt_is_hedged_and_cancelled(tmp_path):
+    store = LatencyStore(tmp_path / "latency.json")
+    _seed(store, "m", 0.02, 30)
+    hedger = Hedger(store, HedgePolicy(percentile=90, budget=0.5))
+    calls = []
+
+    def attempt(cancel):
+        calls.append(cancel)
+        if len(calls) == 1:
+            while not cancel.is_set():
+                time.sleep(0.01)
+            raise ConnectionError("aborted")
+        return "second"
+
+    start = time.perf_counter()
+    assert hedger.run("m", attempt) == "second"
+    assert time.perf_counter() - start < 1
+    assert len(calls) == 2 and calls[0].is_set() and not calls[1].is_set()
+    assert store.load()["hedges"] == 1
+
+
+def test_hedge_budget_caps_duplicates(tmp_path):
+    store = LatencyStore(tmp_path / "latency.json")
+    _seed(store, "m", 0.02, 30)
+    hedger = Hedger(store, HedgePolicy(percentile=90, budget=0.03))
+    calls = []
+
+    def attempt(cancel):
+        calls.append(cancel)
+        index = len(calls)
+        time.sleep(0.1)
+        return index
+
+    assert hedger.run("m", attempt) == 1  # 0 hedges < 3% of 30 requests
+    assert len(calls) == 2
+    calls.clear()
+    assert hedger.run("m", attempt) == 1  # 1 hedge already used the budget
+    assert len(calls) == 1
+
+
+def test_hedging_disabled_from_env(monkeypatch):
+    monkeypatch.delenv("COPILOT_CLI_HEDGE", raising=False)
+    assert Hedger.from_env() is None
+    monkeypatch.setenv("COPILOT_CLI_HEDGE", "1")
+    assert Hedger.from_env() is not None
+    assert Hedger.from_env(enabled=False) is None
+    monkeypatch.setenv("COPILOT_CLI_HEDGE_PERCENTILE", "0")
+    assert Hedger.from_env() is None
+    monkeypatch.setenv("COPILOT_CLI_HEDGE_PERCENTILE", "99")
+    monkeypatch.setenv("COPILOT_CLI_HEDGE_BUDGET", "0.02")
+    assert Hedger.from_env().policy == HedgePolicy(percentile=99, budget=0.02)
+
+
+@pytest.fixture
+def server():
+    """Chat stub whose first request stalls for two seconds."""
+    pytest.importorskip("requests")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_args):
+            pass
+
+        def do_POST(self):  # noqa: N802
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with self.server.lock:
+                self.server.requests += 1
+                first = self.server.requests == 1
+            if first:
+                time.sleep(2)
+            if body["stream"]:
+                payload = b'data: {"choices":[{"delta":{"content":"fast answer"}}]}\n\ndata: [DONE]\n\n'
+                content_type = "text/event-stream"
+            else:
+                payload = json.dumps({"choices": [{"message": {"content": "fast answer"}}]}).encode()
+                content_type = "application/json"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            try:
+                self.wfile.write(payload)
+            except OSError:
+                pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.requests = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_client_hedges_a_stalled_request(server, tmp_path, monkeypatch, stream):
+    from copilot_cli.copilot import GithubCopilotClient
+    from copilot_cli.pool import ConnectionPool
+    from copilot_cli.token_store import TokenStore
+
+    monkeypatch.setenv("GITHUB_COPILOT_CHAT_URL", f"http://127.0.0.1:{server.server_address[1]}/chat")
+    store = LatencyStore(tmp_path / "latency.json")
+    _seed(store, "gpt-4o/stream" if stream else "gpt-4o", 0.05, 30)
+    with ConnectionPool() as pool:
+        client = GithubCopilotClient(
+            pool=pool,
+            token_store=TokenStore(tmp_path / "token.json"),
+            hedge=Hedger(store, HedgePolicy(percentile=95, budget=0.1)),
+        )
+        client._copilot_token = SimpleNamespace(token="t")
+        monkeypatch.setattr(client, "_ensure_valid_token", lambda: None)
+
+        start = time.perf_counter()
+        if stream:
+            answer = "".join(client.stream_chat_completion("hi", "gpt-4o", "sys"))
+        else:
+            answer = client.chat_completion("hi", "gpt-4o", "sys")
+
+    assert answer == "fast answer"
+    assert time.perf_counter() - start < 1.5
+    assert server.requests == 2
+    assert store.load()["hedges"] == 1
+
+
+def test_hedge_win_records_the_time_the_caller_waited(tmp_path):
+    store = LatencyStore(tmp_path / "latency.json")
+    _seed(store, "m", 0.05, 30)
+    hedger = Hedger(store, HedgePolicy(percentile=90, budget=0.5))
+    calls = []
+
+    def attempt(cancel):
+        calls.append(cancel)
+        if len(calls) == 1:
+            while not cancel.is_set():
+                time.sleep(0.01)
+            raise ConnectionError("aborted")
+        return "hedge"
+
+    assert hedger.run("m", attempt) == "hedge"
+    counts = store.load()["latency"]["m"]
+    # The fast hedge would land in the 0.01 s bucket; the caller waited the hedge delay.
+    assert max(int(index) for index in counts) >= bucket_of(0.05)
+    assert str(bucket_of(0.01)) not in counts
@@ -0,0 +1,148 @@
+import threading
+import time
+
+import pytest
+
+from copilot_cli.exception.prompt_too_large_error import PromptTooLargeError
+from copilot_cli.limits import MODEL_LIMITS, ModelLimits
+from copilot_cli.mapreduce import MapReduce, chunk_budget, split_text
+
+
+def words(text):
+    return len(text.split())
+
+
+def test_split_text_respects_the_budget_and_boundaries():
+    paragraphs = [" ".join(f"p{n}w{i}" for i in range(size)) for n, size in enumerate((3, 4, 12, 2))]
+    text = "\n\n".join(paragraphs) + "\n"
+
+    chunks = split_text(text, 8, words)
+    assert all(chunk.tokens <= 8 for chunk in chunks)
+    assert "".join(chunk.text + chunk.separator for chunk in chunks) == text
+    # Whole paragraphs are kept together; only the oversized one is cut.
+    assert chunks[0].text == f"{paragraphs[0]}\n\n{paragraphs[1]}"
+    assert chunks[0].separator == "\n\n"
+    assert [len(chunk.text.split()) for chunk in chunks[1:]] == [8, 4, 2]
+
+    lines = "\n".join(f"line {n}" for n in range(6))
+    assert [chunk.text for chunk in split_text(lines, 4, words)] == [
+        "line 0\nline 1",
+        "line 2\nline 3",
+        "line 4\nline 5",
+    ]
+    assert len(split_text("x" * 100, 1, lambda piece: len(piece) // 10)) == 10
+
+
+def test_chunk_budget_fits_the_model_limits():
+    assert chunk_budget("gpt-4o", "sys", "Translate:") == 1500
+    assert chunk_budget("gpt-4o", "sys", "Translate:", 10_000) < 4096
+    assert chunk_budget("gpt-4o", "sys", "Translate:", 100) == 100
+
+
+class FakeClient:
+    """Answers a chunk with its text upper-cased, after a per-chunk delay."""
+
+    def __init__(self, delays, fail=None):
+        self.delays = delays
+        self.fail = fail
+        self.prompts = []
+        self.cancelled = []
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def stream_chat_completion(self, prompt, model, system_prompt, *, cache_ttl=None, cancel=None, fallbacks=()):
+        text = prompt.split("\n", 1)[-1]
+        self.prompts.append(prompt)
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            deadline = time.monotonic() + self.delays.get(text, 0)
+            while time.monotonic() < deadline:
+                if cancel is not None and cancel.is_set():
+                    self.cancelled.append(text)
+                    return
+                time.sleep(0.005)
+            if text == self.fail:
+                raise RuntimeError(f"{text} failed")
+            yield "\n"
+            for word in text.upper().split(" "):
+                yield word + " "
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_chunks_run_concurrently_and_are_stitched_in_order():
+    chunks = split_text("one a\n\ntwo b\n\nthree c\n\nfour d", 2, words)
+    client = FakeClient({"one a": 0.3, "two b": 0.05, "three c": 0.05, "four d": 0.05})
+    job = MapReduce(client, chunks, "Upper:", "m", "sys", concurrency=2)
+
+    start = time.perf_counter()
+    received = []
+    for piece in job:
+        received.append((time.perf_counter() - start, piece))
+
+    assert "".join(piece for _, piece in received) == "ONE A\n\nTWO B\n\nTHREE C\n\nFOUR D"
+    assert client.peak == 2
+    assert client.prompts[0] == "Upper:\none a"
+    # Later chunks were done long before the first; they follow it at once.
+    assert received[-1][0] - received[0][0] < 0.1
+    assert "4 chunks" in job.report()
+
+
+def test_failing_chunk_cancels_the_rest():
+    chunks = split_text("one\n\ntwo\n\nthree", 1, words)
+    client = FakeClient({"one": 0.05, "three": 2}, fail="one")
+    with pytest.raises(RuntimeError, match="one failed"):
+        "".join(MapReduce(client, chunks, "", "m", "sys", concurrency=3))
+    time.sleep(0.05)
+    assert "three" in client.cancelled
+
+
+def test_reduce_prompt_merges_the_answers():
+    chunks = split_text("one\n\ntwo", 1, words)
+    client = FakeClient({})
+    answer = "".join(MapReduce(client, chunks, "Sum:", "m", "sys", reduce_prompt="Merge:"))
+    assert client.prompts[-1] == "Merge:\nONE\n\nTWO"
+    assert answer == "\nONE\n\nTWO "
+
+    # A single chunk is already the merged answer.
+    client = FakeClient({})
+    assert "".join(MapReduce(client, chunks[:1], "Sum:", "m", "sys", reduce_prompt="Merge:")) == "ONE"
+    assert len(client.prompts) == 1
+
+
+class MergingClient(FakeClient):
+    """Answers a reduce request with the number of answers it merged."""
+
+    def stream_chat_completion(self, prompt, model, system_prompt, **kwargs):
+        if not prompt.startswith("Merge:"):
+            return super().stream_chat_completion(prompt, model, system_prompt, **kwargs)
+        self.prompts.append(prompt)
+        return iter([f"merged {prompt.count(chr(10) * 2) + 1}"])
+
+
+def test_answers_beyond_the_window_are_reduced_in_rounds(monkeypatch):
+    # Room for two of the ~126-token answers per reduce request.
+    monkeypatch.setitem(MODEL_LIMITS, "tiny", ModelLimits(300, 100))
+    paragraph = " ".join(f"w{i}" for i in range(50))
+    chunks = split_text("\n\n".join([paragraph] * 6), 60, words)
+    client = MergingClient({})
+    job = MapReduce(client, chunks, "Sum:", "tiny", "sys", reduce_prompt="Merge:")
+
+    assert "".join(job) == "merged 3"
+    merges = [prompt for prompt in client.prompts if prompt.startswith("Merge:")]
+    assert len(merges) == 4
+    assert merges[-1] == "Merge:\nmerged 2\n\nmerged 2\n\nmerged 2"
+    assert "reduced over 2 rounds" in job.report()
+
+
+def test_reduce_prompt_beyond_the_window_fails_before_mapping(monkeypatch):
+    monkeypatch.setitem(MODEL_LIMITS, "tiny", ModelLimits(300, 100))
+    chunks = split_text("one\n\ntwo", 1, words)
+    client = FakeClient({})
+    with pytest.raises(PromptTooLargeError):
+        MapReduce(client, chunks, "Sum:", "m", "sys", fallbacks=["tiny"], reduce_prompt="Merge: " + "x " * 400)
+    assert client.prompts == []
@@ -0,0 +1,95 @@
+import io
+import random
+
+import pytest
+
+from copilot_cli.streamer.blocks import BlockSplitter
+
+DOC = """# Title
+
+Para one
+line two.
+
+- a
+- b
+
+  continued item
+
+```py
+x = 1
+
+y = 2
+```
+Text right after fence.
+
+| a | b |
+|---|---|
+| 1 | 2 |
+
+    indented
+
+    code
+## Sub
+Last para."""
+
+
+def _chunks(text, seed=0):
+    rng = random.Random(seed)
+    out, i = [], 0
+    while i < len(text):
+        n = rng.randint(1, 7)
+        out.append(text[i : i + n])
+        i += n
+    return out
+
+
+def test_splitter_freezes_completed_blocks():
+    splitter = BlockSplitter()
+    blocks = []
+    for chunk in _chunks(DOC):
+        blocks += splitter.feed(chunk)
+
+    assert blocks == [
+        "# Title\n",
+        "Para one\nline two.\n\n",
+        "- a\n- b\n\n  continued item\n\n",
+        "```py\nx = 1\n\ny = 2\n```\n",
+        "Text right after fence.\n\n",
+        "| a | b |\n|---|---|\n| 1 | 2 |\n\n",
+        "    indented\n\n    code\n",
+        "## Sub\n",
+    ]
+    assert splitter.flush() == "Last para."
+    assert splitter.tail == ""
+
+
+def test_splitter_keeps_open_fence_and_nested_fence_in_tail():
+    splitter = BlockSplitter()
+
+    assert splitter.feed("```\ncode\n\n# not a heading\n") == []
+    assert splitter.tail == "```\ncode\n\n# not a heading\n"
+    assert splitter.feed("```\n- item\n\n  ```\n\n  ```\n") == ["```\ncode\n\n# not a heading\n```\n"]
+    assert splitter.tail == "- item\n\n  ```\n\n  ```\n"
+
+
+def test_stream_matches_single_render():
+    pytest.importorskip("rich")
+    from rich.console import Console
+    from rich.markdown import Markdown
+
+    from copilot_cli.streamer.markdown import MarkdownStreamer
+
+    reference = Console(file=io.StringIO(), width=60, color_system=None)
+    reference.print(Markdown(DOC))
+
+    streamer = MarkdownStreamer(color_system=None)
+    streamer.console = Console(file=io.StringIO(), width=60, color_system=None)
+    streamer.stream(iter(_chunks(DOC)))
+
+    def lines(text):
+        return [line.rstrip() for line in text.rstrip().splitlines()]
+
+    assert lines(streamer.console.file.getvalue()) == lines(reference.file.getvalue())
+    assert streamer.get_content() == DOC
+    streamer.clear_content()
+    assert streamer.get_content() == ""
@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip("requests")
+
+from copilot_cli.pool import ConnectionPool
+
+
+def test_one_session_per_host():
+    with ConnectionPool() as pool:
+        first = pool.session_for("https://api.githubcopilot.com/chat/completions")
+        second = pool.session_for("https://API.githubcopilot.com/other")
+        other = pool.session_for("https://api.github.com/copilot_internal/v2/token")
+
+        assert first is second
+        assert first is not other
+        assert len(pool.hosts()) == 2
+
+
+def test_idle_sessions_are_replaced():
+    with ConnectionPool(idle_timeout=0.0) as pool:
+        first = pool.session_for("https://example.com")
+        pool.evict_idle()
+        assert pool.hosts() == []
+        assert pool.session_for("https://example.com") is not first
+
+
+def test_least_recently_used_host_is_evicted():
+    with ConnectionPool(max_hosts=2) as pool:
+        pool.session_for("https://a.example")
+        pool.session_for("https://b.example")
+        pool.session_for("https://a.example")
+        pool.session_for("https://c.example")
+
+        assert pool.hosts() == ["https://a.example", "https://c.example"]
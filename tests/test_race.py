@@ -0,0 +1,122 @@
+import json
+import select
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("requests")
+
+from copilot_cli.copilot import GithubCopilotClient
+from copilot_cli.exception.api_error import APIError
+from copilot_cli.pool import ConnectionPool
+from copilot_cli.race import Race, fan_out, format_fan_out, parse_models
+from copilot_cli.retry import RetryPolicy
+from copilot_cli.token_store import TokenStore
+
+# Seconds before each model's first token; negative fails the request.
+DELAYS = {"fast": 0.3, "slow": 3.0, "medium": 0.6, "broken": -1}
+
+
+@pytest.fixture
+def server():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_args):
+            pass
+
+        def do_POST(self):  # noqa: N802
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            model = body["model"]
+            if DELAYS[model] < 0:
+                self.send_response(400)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.flush()
+
+            deadline = time.monotonic() + DELAYS[model]
+            while time.monotonic() < deadline:
+                readable, _, _ = select.select([self.connection], [], [], 0.02)
+                if readable and not self.connection.recv(1, socket.MSG_PEEK):
+                    self.server.hung_up.append(model)
+                    return
+            for piece in (f"answer from {model}", " – done"):
+                delta = json.dumps({"choices": [{"delta": {"content": piece}}]})
+                self.wfile.write(f"data: {delta}\n\n".encode())
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    httpd.hung_up = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(server, tmp_path, monkeypatch):
+    monkeypatch.setenv("GITHUB_COPILOT_CHAT_URL", f"http://127.0.0.1:{server.server_address[1]}/chat")
+    with ConnectionPool() as pool:
+        client = GithubCopilotClient(
+            pool=pool, token_store=TokenStore(tmp_path / "token.json"), retry=RetryPolicy(max_attempts=1)
+        )
+        client._copilot_token = SimpleNamespace(token="t")
+        monkeypatch.setattr(client, "_ensure_valid_token", lambda: None)
+        yield client
+
+
+def test_parse_models():
+    assert parse_models(" gpt-4o, o3-mini,,gpt-4o ") == ["gpt-4o", "o3-mini"]
+
+
+def test_race_streams_the_first_model_and_cancels_the_rest(client, server):
+    race = Race(client, ["slow", "fast", "broken"], "hi", "sys")
+
+    start = time.perf_counter()
+    answer = "".join(race)
+    elapsed = time.perf_counter() - start
+
+    assert answer == "answer from fast – done"
+    assert elapsed < 1.5
+    assert race.winner.model == "fast"
+
+    race.join(2)
+    slow = race.runs[0]
+    assert slow.cancelled and slow.ttft is None
+    assert isinstance(race.runs[2].error, APIError)
+    # The slow request's connection was shut down, not left open.
+    deadline = time.monotonic() + 2
+    while "slow" not in server.hung_up and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert server.hung_up == ["slow"]
+
+    report = race.report()
+    assert report[0].startswith("fast (winner): first token")
+    assert "slow: cancelled before the first token" in report
+
+
+def test_race_raises_when_every_model_fails(client):
+    with pytest.raises(APIError):
+        "".join(Race(client, ["broken", "broken"], "hi", "sys"))
+
+
+def test_fan_out_collects_every_answer(client):
+    runs = fan_out(client, ["medium", "fast", "broken"], "hi", "sys")
+
+    assert [run.content for run in runs] == ["answer from medium – done", "answer from fast – done", ""]
+    assert runs[1].ttft < runs[0].ttft
+    text = format_fan_out(runs)
+    assert text.index("### medium") < text.index("### fast") < text.index("### broken")
+    assert "_failed: " in text
@@ -0,0 +1,56 @@
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from copilot_cli.streamer.raw import RawStreamer
+
+
+class CountingFile(io.StringIO):
+    def __init__(self, tty=False):
+        super().__init__()
+        self.flushes = 0
+        self.tty = tty
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+    def isatty(self):
+        return self.tty
+
+
+@pytest.mark.parametrize(("policy", "flushes"), [("chunk", 5), ("line", 2), ("end", 1)])
+def test_raw_streamer_writes_verbatim_with_flush_policy(policy, flushes):
+    out = CountingFile()
+    streamer = RawStreamer(out, flush=policy)
+
+    streamer.stream(iter(["# Ti", "tle\n", "", "body", " text"]))
+
+    assert out.getvalue() == "# Title\nbody text\n"
+    assert streamer.get_content() == "# Title\nbody text"
+    assert out.flushes == flushes
+
+
+def test_output_mode_selection():
+    import copilot_cli
+
+    assert copilot_cli.use_raw_output("auto", CountingFile(tty=False))
+    assert not copilot_cli.use_raw_output("auto", CountingFile(tty=True))
+    assert copilot_cli.use_raw_output("raw", CountingFile(tty=True))
+    assert not copilot_cli.use_raw_output("markdown", CountingFile(tty=False))
+
+
+def test_raw_output_does_not_import_rich():
+    code = (
+        "import sys; import copilot_cli; "
+        "s = copilot_cli.create_streamer(output='raw'); s.stream(iter(['a', 'b'])); "
+        "assert 'rich' not in sys.modules, 'rich imported'"
+    )
+    root = Path(__file__).resolve().parent.parent
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "ab\n"
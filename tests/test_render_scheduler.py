@@ -0,0 +1,33 @@
+from copilot_cli.streamer.scheduler import RenderScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_frames_are_batched_within_the_interval():
+    clock = FakeClock()
+    scheduler = RenderScheduler(max_fps=50, clock=clock)
+
+    assert scheduler.due()
+    scheduler.rendered(0.001, (80, 24))
+    clock.now = 0.01
+    assert not scheduler.due()
+    clock.now = 0.021
+    assert scheduler.due()
+
+
+def test_interval_adapts_to_render_cost_and_terminal_size():
+    clock = FakeClock()
+    scheduler = RenderScheduler(max_fps=60, min_fps=4, cpu_share=0.5, clock=clock)
+
+    scheduler.rendered(0.05, (200, 60))
+    assert scheduler.interval == 0.1  # rendering may use at most half the time
+    scheduler.rendered(1.0, (200, 60))
+    assert scheduler.interval == 0.25  # never below min_fps
+    scheduler.rendered(0.001, (80, 24))
+    assert scheduler.interval == 1 / 60  # re-measured after a resize
@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("requests")
+
+from requests import Response
+from requests.exceptions import ConnectionError, HTTPError
+
+from copilot_cli.retry import RetryPolicy, is_retryable, retry_after
+
+
+def _http_error(status, headers=None):
+    response = Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return HTTPError(response=response)
+
+
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    [
+        (_http_error(429), True),
+        (_http_error(502), True),
+        (_http_error(400), False),
+        (_http_error(403), False),
+        (ConnectionError(), True),
+        (ValueError(), False),
+    ],
+)
+def test_is_retryable(error, expected):
+    assert is_retryable(error) == expected
+
+
+def test_retry_after_seconds_and_date():
+    assert retry_after(_http_error(429, {"Retry-After": "3"})) == 3.0
+    assert retry_after(_http_error(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert retry_after(_http_error(429)) is None
+
+
+def test_call_retries_transient_errors_then_succeeds():
+    errors = [_http_error(503), _http_error(429, {"Retry-After": "1.5"})]
+    sleeps = []
+
+    def flaky():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert RetryPolicy(base_delay=0.1).call(flaky, sleep=sleeps.append) == "ok"
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 0.1
+    assert sleeps[1] == 1.5
+
+
+def test_fatal_errors_and_budget_stop_retries():
+    policy = RetryPolicy(budget=5)
+
+    assert policy.next_delay(1, _http_error(404), 0) is None
+    assert policy.next_delay(1, _http_error(429, {"Retry-After": "10"}), 0) is None
+    assert policy.next_delay(4, _http_error(503), 0) is None
@@ -0,0 +1,98 @@
+from copilot_cli.shaping import fit_outputs, parse_diff, shape_diff
+from copilot_cli.template import Template
+from copilot_cli.tokens import estimate_tokens
+
+
+def file_diff(path: str, removed: list[str], added: list[str]) -> str:
+    lines = [
+        f"diff --git a/{path} b/{path}\n",
+        "index 1111111..2222222 100644\n",
+        f"--- a/{path}\n",
+        f"+++ b/{path}\n",
+        f"@@ -1,{len(removed)} +1,{len(added)} @@\n",
+    ]
+    lines += [f"-{line}\n" for line in removed] + [f"+{line}\n" for line in added]
+    return "".join(lines)
+
+
+SOURCE = file_diff("src/app.py", [], [f"value_{i} = compute({i})" for i in range(200)])
+SMALL = file_diff("README.md", ["old title"], ["new title"])
+LOCK = file_diff("package-lock.json", [], [f'"dep-{i}": "1.0.{i}",' for i in range(400)])
+WHITESPACE = file_diff("src/style.py", [f"x = {i}" for i in range(100)], [f"x  =  {i}" for i in range(100)])
+BINARY = "diff --git a/logo.png b/logo.png\nindex 1..2 100644\nBinary files a/logo.png and b/logo.png differ\n"
+
+
+def test_small_diff_is_untouched():
+    text, report = shape_diff("diff", SMALL, budget=1000)
+
+    assert text == SMALL and not report.changed
+
+
+def test_lockfiles_go_first():
+    diff = SOURCE + LOCK + BINARY
+    budget = estimate_tokens(SOURCE) + 100
+
+    text, report = shape_diff("diff", diff, budget)
+
+    assert text.startswith(SOURCE)
+    assert "diff --git a/package-lock.json b/package-lock.json\n[lockfile file changed" in text
+    assert report.dropped == [("package-lock.json", "lockfile"), ("logo.png", "binary")]
+    assert not report.truncated
+    assert report.tokens_after <= budget
+
+
+def test_whitespace_only_hunks_collapse_before_cutting():
+    diff = SOURCE + WHITESPACE
+    budget = estimate_tokens(SOURCE) + 100
+
+    text, report = shape_diff("diff", diff, budget)
+
+    assert report.whitespace == ["src/style.py"] and not report.truncated
+    assert "[whitespace-only changes omitted]" in text
+    assert SOURCE in text
+
+
+def test_cut_keeps_every_header_and_small_files():
+    diff = SOURCE + SMALL + file_diff("src/other.py", [], [f"other_{i} = {i}" for i in range(200)])
+
+    text, report = shape_diff("diff", diff, budget=600)
+
+    _, files = parse_diff(text)
+    assert [f.path for f in files] == ["src/app.py", "README.md", "src/other.py"]
+    assert all(f.header[0].startswith("diff --git") for f in files)
+    assert SMALL in text
+    assert {path for path, _ in report.truncated} == {"src/app.py", "src/other.py"}
+    assert "more diff line(s) omitted to fit the context" in text
+    assert report.tokens_after <= 600 * 1.1
+    assert "cut" in report.summary() and "$diff" in report.summary()
+
+
+def test_fit_outputs_counts_the_prompt_and_leaves_other_outputs():
+    template = Template("Write a commit message.\n$diff\nRecent: $logs")
+    values = {"diff": SOURCE + LOCK, "logs": "fix: something\n", "path": "/repo"}
+
+    shaped, reports = fit_outputs(template, values, budget=estimate_tokens(SOURCE) + 120)
+
+    assert shaped["logs"] == values["logs"]
+    assert [r.key for r in reports] == ["diff"]
+    assert "package-lock.json" in shaped["diff"] and '"dep-1"' not in shaped["diff"]
+
+    assert fit_outputs(template, values, budget=10**6) == (values, [])
+
+
+def test_action_prompt_is_shaped_for_the_smallest_window_of_its_chain(monkeypatch):
+    from types import SimpleNamespace
+
+    from copilot_cli import _load_cli_module
+    from copilot_cli.limits import prompt_budget
+
+    cli = _load_cli_module()
+    action = SimpleNamespace(model=["gemini-2.0-flash-001", "gpt-4o"], prompt="p", system_prompt="s", options=None)
+    monkeypatch.setattr(cli, "get_action_manager", lambda path: SimpleNamespace(get_action=lambda name: action))
+    budgets = []
+    monkeypatch.setattr(cli, "process_action_commands", lambda *args: budgets.append(args[-1]) or "shaped")
+
+    _, prompt, model, _ = cli.prepare_request("a", None, ".", "gpt-4o", "", None)
+
+    assert (prompt, model) == ("shaped", "gemini-2.0-flash-001")
+    assert budgets == [prompt_budget("gpt-4o", "s")]
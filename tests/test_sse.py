@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from copilot_cli.exception.api_error import APIError
+from copilot_cli.sse import SSEDecoder, iter_deltas
+
+
+def _event(content):
+    return ("data: " + json.dumps({"choices": [{"delta": {"content": content}}]}, separators=(",", ":")) + "\n\n").encode()
+
+
+STREAM = (
+    b": keep-alive\n\n"
+    + _event("Hello")
+    + b'data: {"choices":[{"delta":{"role":"assistant","content":""}}]}\n\n'
+    + _event(' "quoted"\n')
+    + _event("café")
+    + b"data: [DONE]\n\n"
+    + _event("ignored")
+)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(STREAM)])
+def test_deltas_survive_arbitrary_splits(size):
+    chunks = [STREAM[i : i + size] for i in range(0, len(STREAM), size)]
+
+    assert list(iter_deltas(chunks)) == ["Hello", ' "quoted"\n', "café"]
+
+
+def test_coalesce_joins_deltas_of_one_read():
+    assert list(iter_deltas([STREAM], coalesce=True)) == ['Hello "quoted"\ncafé']
+
+
+def test_decoder_handles_fields_and_line_endings():
+    decoder = SSEDecoder()
+    events = decoder.feed(b"event: update\r\nid: 7\r\ndata: a\r")
+    events += decoder.feed(b"\ndata: b\r\n\r\n: ping\rdata:c\r")
+    events += decoder.flush()
+
+    assert [(e.event, e.data, e.id) for e in events] == [("update", "a\nb", "7"), ("message", "c", "7")]
+
+
+def test_error_events_raise():
+    with pytest.raises(APIError):
+        list(iter_deltas([b'data: {"error": {"message": "overloaded"}}\n\n']))
+    with pytest.raises(APIError):
+        list(iter_deltas([b"event: error\ndata: boom\n\n"]))
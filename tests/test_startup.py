@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ("requests", "pydantic", "yaml", "rich", "halo", "pyperclip")
+
+PROBE = """
+import runpy, sys
+sys.argv = ["copilot-cli.py", *sys.argv[1:]]
+try:
+    runpy.run_path("copilot-cli.py", run_name="__main__")
+except SystemExit:
+    pass
+print("loaded:" + ",".join(m for m in {heavy!r} if m in sys.modules), file=sys.stderr)
+"""
+
+
+def _heavy_imports(*argv, env=None):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(heavy=HEAVY), *argv],
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+    )
+    loaded = result.stderr.rsplit("loaded:", 1)[1].strip()
+    return loaded.split(",") if loaded else []
+
+
+def test_help_imports_no_heavy_modules():
+    assert _heavy_imports("--help") == []
+
+
+def test_cached_answer_imports_no_heavy_modules(tmp_path):
+    from copilot_cli.cache import ResponseCache
+    from copilot_cli.constants import DEFAULT_SYSTEM_PROMPT
+
+    ResponseCache(tmp_path / "copilot-cli" / "responses").put("gpt-4o", DEFAULT_SYSTEM_PROMPT, "hi", ["cached"])
+
+    assert _heavy_imports("--prompt", "hi", "--no-stream", env={"XDG_CACHE_HOME": str(tmp_path)}) == []
+
+
+def test_lazy_package_exports():
+    pytest.importorskip("requests")
+    import copilot_cli
+
+    assert callable(copilot_cli.create_parser)
+    with pytest.raises(AttributeError):
+        _ = copilot_cli.not_a_helper
+
+
+def test_list_from_compiled_actions_imports_no_heavy_modules(tmp_path):
+    env = {"XDG_CACHE_HOME": str(tmp_path)}
+    _heavy_imports("--list", env=env)  # compiles actions.yml
+
+    assert _heavy_imports("--list", env=env) == []
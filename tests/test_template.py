@@ -0,0 +1,53 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from copilot_cli.template import Template, compile_template
+
+
+def test_single_pass_substitution():
+    values = {"diff": "uses $logs literally", "diff_stat": "1 file changed", "logs": "abc123"}
+
+    rendered = Template("$diff | $diff_stat | ${logs}s | $unknown").render(values)
+
+    assert rendered == "uses $logs literally | 1 file changed | abc123s | $unknown"
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        ("costs $$5", "costs $5"),
+        ("$$path stays", "$path stays"),
+        ("a lone $ sign, $1 and $", "a lone $ sign, $1 and $"),
+        ("${path}/.gitignore", "/repo/.gitignore"),
+        ("plain prompt", "plain prompt"),
+    ],
+)
+def test_escaping_and_literals(source, expected):
+    assert Template(source).render({"path": "/repo"}) == expected
+
+
+def test_unknown_placeholders_are_reported():
+    template = Template("$diff $logs ${diff} $$escaped $missing")
+
+    assert template.names == ("diff", "logs", "missing")
+    assert template.unknown({"diff": "", "logs": ""}) == ["missing"]
+
+
+def test_templates_are_compiled_once():
+    assert compile_template("Summarise $diff") is compile_template("Summarise $diff")
+
+
+def test_action_prompt_rendering(capsys):
+    from copilot_cli import process_action_commands
+
+    action = SimpleNamespace(
+        commands={"diff": [sys.executable, "-c", "print('+ price: $logs')"], "logs": [sys.executable, "-c", "print('fix')"]},
+        options=SimpleNamespace(),
+    )
+
+    prompt = process_action_commands(action, "$diff|$logs|$path|$typo|$$diff", "/repo")
+
+    assert prompt == "+ price: $logs\n|fix\n|/repo|$typo|$diff"
+    assert "Unknown placeholder $typo in prompt" in capsys.readouterr().err
@@ -0,0 +1,104 @@
+import multiprocessing
+import time
+
+import pytest
+
+from copilot_cli.token_store import TokenStore
+
+
+def _refresh_in_process(path, counter):
+    def fetch():
+        with open(counter, "a") as f:
+            f.write("x")
+        time.sleep(0.2)
+        return {"token": "fresh"}
+
+    TokenStore(path).refresh(fetch, lambda record: record["data"].get("token") == "fresh")
+
+
+def test_concurrent_processes_fetch_once(tmp_path):
+    path = tmp_path / "token.json"
+    counter = tmp_path / "fetches"
+    counter.write_text("")
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_refresh_in_process, args=(path, counter)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(timeout=30)
+
+    assert counter.read_text() == "x"
+    assert TokenStore(path).load()["data"] == {"token": "fresh"}
+
+
+def test_unreadable_file_is_ignored(tmp_path):
+    path = tmp_path / "token.json"
+    path.write_text('{"fetched_at": 1, "da')
+
+    assert TokenStore(path).load() is None
+
+
+def test_client_refreshes_once_on_401(tmp_path):
+    pytest.importorskip("requests")
+    pytest.importorskip("pydantic")
+    from copilot_cli.copilot import GithubCopilotClient
+
+    base = {
+        "expires_at": int(time.time()) + 3600,
+        "refresh_in": 1500,
+        "endpoints": {},
+        "tracking_id": "t",
+        "sku": "s",
+        "annotations_enabled": False,
+        "chat_enabled": True,
+        "chat_jetbrains_enabled": False,
+        "code_quote_enabled": False,
+        "codesearch": False,
+        "copilotignore_enabled": False,
+        "individual": True,
+        "prompt_8k": False,
+        "snippy_load_test_enabled": False,
+        "xcode": False,
+        "xcode_chat": False,
+        "public_suggestions": "disabled",
+        "telemetry": "disabled",
+        "code_review_enabled": False,
+    }
+    store = TokenStore(tmp_path / "token.json")
+    store.save({**base, "token": "stale"})
+
+    class FakeResponse:
+        def __init__(self, status, content=None):
+            self.status_code = status
+            self._content = content
+
+        def raise_for_status(self):
+            assert self.status_code == 200
+
+        def json(self):
+            return self._content
+
+        def close(self):
+            pass
+
+    class FakePool:
+        def __init__(self):
+            self.auth_headers = []
+
+        def get(self, url, **kwargs):
+            return FakeResponse(200, {**base, "token": "fresh"})
+
+        def post(self, url, headers, **kwargs):
+            self.auth_headers.append(headers["Authorization"])
+            if headers["Authorization"] == "Bearer stale":
+                return FakeResponse(401)
+            return FakeResponse(200, {"choices": [{"message": {"content": "ok"}}]})
+
+    pool = FakePool()
+    client = GithubCopilotClient(pool=pool, token_store=store)
+    client._oauth_token = "oauth"
+
+    assert client.chat_completion("p", "gpt-4o", "s") == "ok"
+    assert pool.auth_headers == ["Bearer stale", "Bearer fresh"]
+    assert store.load()["data"]["token"] == "fresh"
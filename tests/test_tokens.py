@@ -0,0 +1,109 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from copilot_cli.exception.prompt_too_large_error import PromptTooLargeError
+from copilot_cli.limits import DEFAULT_LIMITS, MODEL_LIMITS, measure_prompt, model_limits, prompt_budget
+from copilot_cli.tokens import ERROR_BOUND, estimate_tokens
+
+CORPUS = Path(__file__).resolve().parent / "data" / "token_corpus.txt"
+CHUNK = 8000
+
+MULTILINGUAL = [
+    "Die schnelle braune Füchsin springt über den faulen Hund. Änderungen an der Konfiguration werden beim "
+    "nächsten Start übernommen, sofern die Datei gültig ist.",
+    "Le renard brun rapide saute par-dessus le chien paresseux. Les modifications de la configuration seront "
+    "appliquées au prochain démarrage, à condition que le fichier soit valide.",
+    "Быстрая коричневая лиса прыгает через ленивую собаку. Изменения конфигурации будут применены при "
+    "следующем запуске, если файл корректен.",
+    "敏捷的棕色狐狸跳过了懒狗。配置的更改将在下次启动时生效，前提是文件有效。较大的修改需要在合并之前由团队审核。",
+    "素早い茶色の狐が怠け者の犬を飛び越える。設定の変更は、ファイルが有効であれば次回の起動時に適用されます。",
+    "빠른 갈색 여우가 게으른 개를 뛰어넘는다. 구성 변경 사항은 파일이 유효한 경우 다음 시작 시 적용됩니다.",
+]
+
+
+def corpus() -> list[str]:
+    """8 KB chunks of a fixed sample of Python sources, Markdown and ``git log -p`` output."""
+    text = CORPUS.read_text(encoding="utf-8")
+    return [text[i : i + CHUNK] for i in range(0, len(text) - CHUNK // 2, CHUNK)]
+
+
+@pytest.mark.tiktoken
+@pytest.mark.parametrize(("name", "encoding"), [("o200k_base", "o200k"), ("cl100k_base", "cl100k")])
+def test_estimate_tracks_bpe(name, encoding):
+    tiktoken = pytest.importorskip("tiktoken")
+    try:
+        bpe = tiktoken.get_encoding(name)
+    except Exception as e:  # the vocabulary is downloaded on first use
+        pytest.skip(f"{name} unavailable: {e}")
+
+    chunks = corpus()
+    real = [len(bpe.encode(chunk)) for chunk in chunks]
+    estimated = [estimate_tokens(chunk, encoding) for chunk in chunks]
+    errors = sorted(abs(e - r) / r for e, r in zip(estimated, real))
+
+    assert errors[int(len(errors) * 0.95)] <= ERROR_BOUND
+    assert abs(sum(estimated) - sum(real)) / sum(real) <= 0.03
+    for sample in MULTILINGUAL:
+        assert abs(estimate_tokens(sample, encoding) - len(bpe.encode(sample))) <= 0.15 * len(bpe.encode(sample))
+
+
+def test_estimate_is_fast_on_large_input():
+    text = CORPUS.read_text(encoding="utf-8")
+    text = text * (5_000_000 // len(text))
+
+    start = time.perf_counter()
+    tokens = estimate_tokens(text)
+    elapsed = time.perf_counter() - start
+
+    assert len(text) / 6 < tokens < len(text) / 2.5
+    assert elapsed < 2.0
+    assert estimate_tokens("") == 0
+
+
+def test_model_limits_registry():
+    assert model_limits("gpt-4o") is MODEL_LIMITS["gpt-4o"]
+    assert model_limits("gpt-4o-2024-11-20") is MODEL_LIMITS["gpt-4o"]
+    assert model_limits("gpt-4o-mini-2024-07-18") is MODEL_LIMITS["gpt-4o-mini"]
+    assert model_limits("some-future-model") is DEFAULT_LIMITS
+
+    assert prompt_budget("gpt-4o") < MODEL_LIMITS["gpt-4o"].max_prompt_tokens
+    assert prompt_budget("gpt-4o", "x " * 1000, limit=500) == 0
+
+
+def test_oversized_prompt_is_rejected_before_any_request(tmp_path, monkeypatch):
+    pytest.importorskip("requests")
+    from copilot_cli.copilot import GithubCopilotClient
+    from copilot_cli.token_store import TokenStore
+
+    client = GithubCopilotClient(token_store=TokenStore(tmp_path / "token.json"), offline_fallback=True)
+    monkeypatch.setattr(client, "_ensure_valid_token", lambda: pytest.fail("token requested for an oversized prompt"))
+
+    prompt = "word " * 100_000
+    assert measure_prompt("gpt-4o", "", prompt).too_large
+
+    with pytest.raises(PromptTooLargeError, match="Prompt too large for gpt-4o") as info:
+        client.chat_completion(prompt, "gpt-4o", "")
+    assert info.value.limit == 64_000
+    with pytest.raises(PromptTooLargeError):
+        next(iter(client.stream_chat_completion(prompt, "gpt-4o", "")))
+
+
+def test_unknown_model_is_warned_about_not_rejected(tmp_path, monkeypatch, capsys):
+    pytest.importorskip("requests")
+    from copilot_cli.copilot import GithubCopilotClient
+    from copilot_cli.token_store import TokenStore
+
+    client = GithubCopilotClient(token_store=TokenStore(tmp_path / "token.json"))
+    monkeypatch.setattr(client, "_ensure_valid_token", lambda: None)
+    monkeypatch.setattr(client, "_request_completion", lambda prompt, model, system_prompt: "answer")
+
+    prompt = "word " * 100_000
+    size = measure_prompt("gpt-5", "", prompt)
+    assert size.too_large and not size.registered
+    assert measure_prompt("gpt-4o-2024-11-20", "", prompt).registered
+
+    with pytest.warns(UserWarning, match="not in the model registry"):
+        assert client.chat_completion(prompt, "gpt-5", "") == "answer"
+    assert capsys.readouterr().err == ""
@@ -0,0 +1,153 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("pydantic")
+
+from copilot_cli.copilot import GithubCopilotClient
+from copilot_cli.pool import ConnectionPool
+from copilot_cli.token_store import TokenStore
+
+TOKEN = {
+    "token": "fresh",
+    "expires_at": 4102444800,
+    "refresh_in": 1500,
+    "endpoints": {},
+    "tracking_id": "t",
+    "sku": "s",
+    "annotations_enabled": False,
+    "chat_enabled": True,
+    "chat_jetbrains_enabled": False,
+    "code_quote_enabled": False,
+    "codesearch": False,
+    "copilotignore_enabled": False,
+    "individual": True,
+    "prompt_8k": False,
+    "snippy_load_test_enabled": False,
+    "xcode": False,
+    "xcode_chat": False,
+    "public_suggestions": "disabled",
+    "telemetry": "disabled",
+    "code_review_enabled": False,
+}
+
+
+@pytest.fixture
+def server():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_args):
+            pass
+
+        def setup(self):
+            super().setup()
+            self.server.connections += 1
+
+        def do_GET(self):  # noqa: N802
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    httpd.connections = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_preconnected_connection_is_reused(server):
+    url = f"http://127.0.0.1:{server.server_address[1]}/chat"
+    with ConnectionPool() as pool:
+        assert pool.preconnect(url)
+        assert pool.get(url, timeout=5).text == "ok"
+        assert pool.get(url, timeout=5).text == "ok"
+
+    assert server.connections == 1
+
+
+def test_preconnect_failure_is_reported_not_raised():
+    with ConnectionPool() as pool:
+        assert pool.preconnect("http://127.0.0.1:9/chat", timeout=1) is False
+
+
+class SlowPool:
+    """Token fetch and pre-connect both take *delay* seconds."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.preconnected = []
+
+    def preconnect(self, url):
+        time.sleep(self.delay)
+        self.preconnected.append(url)
+        return True
+
+    def get(self, url, **kwargs):
+        time.sleep(self.delay)
+        return FakeResponse(TOKEN)
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def test_warmup_overlaps_token_and_connect(tmp_path, monkeypatch):
+    monkeypatch.setenv("GITHUB_COPILOT_CHAT_URL", "https://chat.example/chat/completions")
+    pool = SlowPool(0.3)
+    client = GithubCopilotClient(pool=pool, token_store=TokenStore(tmp_path / "token.json"))
+    client._oauth_token = "oauth"
+
+    start = time.perf_counter()
+    client.warmup()
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.55
+    assert client._copilot_token.token == "fresh"
+    assert pool.preconnected == ["https://chat.example/chat/completions"]
+    assert client.connect_seconds is not None
+
+    # A second warm-up neither connects nor fetches again.
+    client.warmup()
+    assert len(pool.preconnected) == 1
+
+
+def test_background_warmup_swallows_errors(tmp_path, monkeypatch):
+    for name in ("GITHUB_COPILOT_OAUTH_TOKEN", "COPILOT_OAUTH_TOKEN", "GITHUB_TOKEN", "GH_TOKEN"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.setenv("HOME", str(tmp_path))
+    client = GithubCopilotClient(pool=SlowPool(0), token_store=TokenStore(tmp_path / "token.json"))
+
+    client.start_warmup().join(5)
+
+    assert client._copilot_token is None
+
+
+def test_cold_warmup_connects_to_the_host_the_token_announces(tmp_path, monkeypatch):
+    monkeypatch.delenv("GITHUB_COPILOT_CHAT_URL", raising=False)
+    monkeypatch.setattr("copilot_cli.copilot.resolve", lambda host, port: ())
+    pool = SlowPool(0)
+    pool.get = lambda url, **kwargs: FakeResponse({**TOKEN, "endpoints": {"api": "https://api.example.com"}})
+    client = GithubCopilotClient(pool=pool, token_store=TokenStore(tmp_path / "token.json"))
+    client._oauth_token = "oauth"
+
+    client.warmup()
+
+    assert pool.preconnected == ["https://api.example.com/chat/completions"]